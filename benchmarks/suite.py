@@ -0,0 +1,271 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from config import PHYSICS_UPDATE_RATE
+from physics.engine import EnginePhysics
+from physics.torque import get_torque_model
+from physics.safety_systems import SafetySystems, ALL_SYSTEMS
+from physics.simulator import VehicleSimulator, VehicleInputs
+from physics.input_queue import InputCoalescer
+from physics.scenario import Scenario, run_scenario
+from gui.gauges import SpeedGauge, RPMGauge
+from gui.strip_chart import StripChart
+from telemetry.recorder import TelemetryRing
+from benchmarks.stub_canvas import StubCanvas
+
+# Timings only compare on the machine that measured them, so no baseline is
+# shipped: create one with --save-baseline before making changes.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_TOLERANCE = 0.15
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    """Register a benchmark
+
+    The decorated function does the setup and returns a callable performing
+    one operation, which is what gets timed.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+@benchmark('physics_step')
+def bench_physics_step():
+    simulator = VehicleSimulator()
+    simulator.safety_systems.abs_enabled = True
+    simulator.safety_systems.esp_enabled = True
+    inputs = VehicleInputs(gas=60.0, brake=0.0, steering_angle=250.0, gear=3)
+    return lambda: simulator.step(inputs, PHYSICS_UPDATE_RATE)
+
+@benchmark('safety_chain')
+def bench_safety_chain():
+    safety = SafetySystems()
+    safety.abs_enabled = safety.esp_enabled = safety.acc_enabled = True
+    safety.ods_enabled = safety.spd_enabled = True
+
+    def run():
+        safety.apply_abs(0.9)
+        gas = safety.apply_esp(0.8, 250.0)
+        gas = safety.apply_acc(gas, 80.0)
+        safety.apply_ods(gas)
+        safety.apply_speed_limiter(130.0)
+    return run
+
+@benchmark('safety_pipeline')
+def bench_safety_pipeline():
+    safety = SafetySystems()
+    safety.mask = ALL_SYSTEMS
+    pipeline, speed_limit = safety.compiled
+    return lambda: pipeline(0.9, 0.8, 250.0, 80.0)
+
+@benchmark('input_post')
+def bench_input_post():
+    queue = InputCoalescer(VehicleInputs())
+    return lambda: queue.post('gas', '42.0')
+
+@benchmark('calculate_rpm')
+def bench_calculate_rpm():
+    engine = EnginePhysics()
+    return lambda: engine.calculate_rpm(85.0, 4)
+
+@benchmark('calculate_acceleration')
+def bench_calculate_acceleration():
+    engine = EnginePhysics()
+    return lambda: engine.calculate_acceleration(0.6, 3, 0.0)
+
+@benchmark('torque_acceleration')
+def bench_torque_acceleration():
+    engine = EnginePhysics(torque_model=get_torque_model())
+    return lambda: engine.calculate_acceleration(0.6, 3, 0.0, 85.0)
+
+@benchmark('scenario_tick')
+def bench_scenario_tick():
+    scenario = Scenario("gear 1; gas 80% for 3s; shift 2 at 6000 rpm; shift 3 at 5500 rpm\n"
+                        "gas 0; brake 100% until 0 km/h")
+    simulator = VehicleSimulator()
+
+    def run():
+        simulator.reset()
+        run_scenario(scenario, simulator)
+    run()
+    return run, simulator.ticks
+
+@benchmark('speed_gauge_draw_needle')
+def bench_speed_gauge():
+    gauge = SpeedGauge(StubCanvas())
+    gauge.draw_gauge_face()
+    speeds = [42.0, 43.0]
+    state = {'index': 0}
+
+    def run():
+        state['index'] ^= 1
+        gauge.draw_needle(speeds[state['index']])
+    return run
+
+@benchmark('rpm_gauge_draw_needle')
+def bench_rpm_gauge():
+    gauge = RPMGauge(StubCanvas())
+    gauge.draw_gauge_face()
+    rpms = [3100.0, 7200.0]
+    state = {'index': 0}
+
+    def run():
+        state['index'] ^= 1
+        gauge.draw_needle(rpms[state['index']], 1234.5)
+    return run
+
+@benchmark('speed_gauge_face')
+def bench_speed_gauge_face():
+    return lambda: SpeedGauge(StubCanvas()).draw_gauge_face()
+
+@benchmark('strip_chart_update')
+def bench_strip_chart():
+    ring = TelemetryRing()
+    chart = StripChart(StubCanvas(), ring)
+    row = (0.0, 0.0, 80.0, 3000.0, 40.0, 0.0, 0.0, 0.0, 3, 3)
+    for _ in range(ring.size):
+        ring.append(row)
+    chart.layout(650, 150)
+
+    def run():
+        ring.append(row)
+        chart.update()
+    return run
+
+@benchmark('fleet_step_per_vehicle')
+def bench_fleet_step():
+    try:
+        from physics.fleet import FleetSimulator
+    except ImportError:
+        return None
+    size = 10000
+    fleet = FleetSimulator(size)
+    inputs = VehicleInputs(gas=60.0, gear=3)
+    return lambda: fleet.step(inputs, PHYSICS_UPDATE_RATE), size
+
+def measure(operation, number, repeat, ops_per_call=1):
+    """Time an operation and count its allocations
+
+    Returns best-of-repeat nanoseconds per op, throughput, the peak bytes
+    allocated by one op and the memory blocks it leaves behind.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        operation()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            for _ in range(number):
+                operation()
+            timings.append((time.perf_counter_ns() - started) / (number * ops_per_call))
+
+        blocks_before = sys.getallocatedblocks()
+        for _ in range(number):
+            operation()
+        retained_blocks = (sys.getallocatedblocks() - blocks_before) / (number * ops_per_call)
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    ns_per_op = min(timings)
+    return {
+        'ns_per_op': ns_per_op,
+        'ops_per_sec': 1e9 / ns_per_op if ns_per_op else 0.0,
+        'alloc_bytes_per_op': (peak - baseline) / ops_per_call,
+        'retained_blocks_per_op': retained_blocks,
+    }
+
+def run_suite(names=None, number=2000, repeat=5):
+    """Run the selected benchmarks and return {name: result}"""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        operation = setup()
+        if operation is None:
+            continue
+        ops_per_call = 1
+        if isinstance(operation, tuple):
+            operation, ops_per_call = operation
+            calls = max(1, number // 100)
+        else:
+            calls = number
+        results[name] = measure(operation, calls, repeat, ops_per_call)
+    return results
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return the names of benchmarks slower than baseline by more than tolerance"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference and result['ns_per_op'] > reference['ns_per_op'] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+def format_results(results, baseline=None):
+    lines = [f"{'benchmark':<26}{'ns/op':>12}{'ops/s':>14}{'alloc B/op':>12}{'blocks/op':>11}{'vs base':>10}"]
+    for name, result in results.items():
+        change = ''
+        if baseline and name in baseline:
+            change = f"{result['ns_per_op'] / baseline[name]['ns_per_op'] - 1:+.1%}"
+        lines.append(
+            f"{name:<26}{result['ns_per_op']:>12.1f}{result['ops_per_sec']:>14,.0f}"
+            f"{result['alloc_bytes_per_op']:>12.1f}{result['retained_blocks_per_op']:>11.2f}{change:>10}"
+        )
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="pyConsole hot-path benchmarks",
+        epilog="Run once with --save-baseline to store a baseline on this machine; "
+               "later runs compare against it and exit 1 on a regression."
+    )
+    parser.add_argument('names', nargs='*', help="benchmarks to run (default: all)")
+    parser.add_argument('--number', type=int, default=2000, help="operations per timing run")
+    parser.add_argument('--repeat', type=int, default=5, help="timing runs, best is reported")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = run_suite(args.names, args.number, args.repeat)
+    print(format_results(results, baseline))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, nothing compared. "
+              f"Run with --save-baseline to create one.")
+        return 0
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"Not in the baseline, not compared: {', '.join(missing)}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"REGRESSION ({args.tolerance:.0%} tolerance): {', '.join(regressions)}")
+        return 1
+    return 0
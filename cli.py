@@ -0,0 +1,199 @@
+import argparse
+import sys
+
+# Headless commands, run as `python main.py simulate ...` or `python cli.py
+# simulate ...`. They never import tkinter, and everything beyond argparse is
+# imported inside the command that needs it so the CLI starts fast.
+
+COMMANDS = ('simulate', 'analyze')
+
+def _script_ticks(script, dt):
+    """Yield (inputs, safety mask) per tick of a driving script"""
+    for duration, inputs in script:
+        for _ in range(int(round(duration / dt))):
+            yield inputs, None
+
+def _recorded_ticks(reader, simulator):
+    """Yield (inputs, safety mask) per tick of a telemetry recording
+
+    The simulator is reset before the ticks at which the recording was.
+    """
+    from telemetry.recorder import SAFETY_FLAG_SHIFT, ALL_SYSTEMS
+    from telemetry.replay import row_inputs, session_starts
+    starts = session_starts(reader)
+    for tick, row in enumerate(reader.iter_rows()):
+        if tick in starts:
+            simulator.reset()
+        yield row_inputs(row), (row.flags >> SAFETY_FLAG_SHIFT) & ALL_SYSTEMS
+
+def _system_mask(names):
+    """Parse a comma separated list of safety systems into a mask"""
+    from physics.safety_systems import SYSTEM_BITS
+    mask = 0
+    for name in names.split(','):
+        if name not in SYSTEM_BITS:
+            if name:
+                sys.exit(f"unknown safety system: {name}")
+            continue
+        mask |= SYSTEM_BITS[name]
+    return mask
+
+def drive(simulator, ticks, dt, recorder=None):
+    """Step the simulator through (inputs, mask) ticks and return summary stats
+
+    A mask of None keeps the current safety systems.
+    """
+    safety = simulator.safety_systems
+    zero_to_100 = None
+    top_speed = 0.0
+    for inputs, mask in ticks:
+        if mask is not None and mask != safety.mask:
+            safety.mask = mask
+        simulator.step(inputs, dt)
+        speed = simulator.speed
+        if speed > top_speed:
+            top_speed = speed
+        if zero_to_100 is None and speed >= 100:
+            zero_to_100 = simulator.time
+        if recorder is not None:
+            recorder.record(inputs, simulator.snapshot(), safety)
+    state = simulator.snapshot()
+    summary = {
+        'ticks': simulator.ticks,
+        'time': simulator.time,
+        'zero_to_100': zero_to_100,
+        'top_speed': top_speed,
+        'distance': simulator.engine.odometer,
+        'final_speed': state.speed,
+        'final_rpm': state.rpm,
+    }
+    for name, count in simulator.interventions.items():
+        summary[f'{name}_interventions'] = count
+    return summary
+
+def simulate(args):
+    import time
+    from config import PHYSICS_UPDATE_RATE, TORQUE_MODEL_ENABLED
+    from physics.simulator import VehicleSimulator
+
+    simulator = VehicleSimulator(torque=args.torque or TORQUE_MODEL_ENABLED)
+    simulator.safety_systems.mask = _system_mask(args.enable)
+
+    reader = None
+    if args.replay:
+        from telemetry.recorder import TelemetryReader
+        reader = TelemetryReader(args.replay)
+        dt = reader.dt
+        ticks = _recorded_ticks(reader, simulator)
+    elif args.scenario:
+        from physics.scenario import Scenario
+        dt = args.dt if args.dt is not None else PHYSICS_UPDATE_RATE
+        try:
+            scenario = Scenario.load(args.scenario, dt)
+        except ValueError as e:
+            sys.exit(str(e))
+        ticks = scenario.ticks(simulator)
+    else:
+        from tools.sweep import DEFAULT_SCRIPT, load_script
+        dt = args.dt if args.dt is not None else PHYSICS_UPDATE_RATE
+        script = load_script(args.script) if args.script else DEFAULT_SCRIPT
+        ticks = _script_ticks(script, dt)
+
+    recorder = None
+    if args.telemetry:
+        from telemetry.recorder import TelemetryRecorder
+        recorder = TelemetryRecorder(args.telemetry, dt)
+
+    started = time.perf_counter()
+    try:
+        summary = drive(simulator, ticks, dt, recorder)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if reader is not None:
+            reader.close()
+    summary['wall_time'] = time.perf_counter() - started
+
+    if args.json:
+        import json
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        for name, value in summary.items():
+            if isinstance(value, float):
+                value = f"{value:.3f}"
+            print(f"{name:<20}{value}")
+    return 0
+
+def analyze(args):
+    from config import ANALYTICS_BRAKING_G
+    from telemetry.analytics import query
+
+    min_g = args.braking_g if args.braking_g is not None else ANALYTICS_BRAKING_G
+    systems = _system_mask(args.systems)
+    summaries = {}
+    for path in args.trips:
+        try:
+            summaries[path] = query(path, 'summary', min_g, systems)
+        except (OSError, ValueError) as e:
+            sys.exit(f"{path}: {e}")
+
+    if args.json:
+        import json
+        json.dump(summaries, sys.stdout, indent=2)
+        print()
+        return 0
+    for path, summary in summaries.items():
+        print(path)
+        for name, value in summary.items():
+            if isinstance(value, float):
+                value = f"{value:.3f}"
+            elif isinstance(value, dict):
+                value = ' '.join(f"{key}={item:.1f}" if isinstance(item, float) else f"{key}={item}"
+                                 for key, item in value.items())
+            elif isinstance(value, list):
+                value = ' '.join(f"{item:.3f}" for item in value)
+            print(f"  {name:<20}{value}")
+    if len(summaries) > 1:
+        print(f"{len(summaries)} trips, "
+              f"{sum(summary['duration'] for summary in summaries.values()):.1f} s, "
+              f"{sum(summary['distance'] for summary in summaries.values()):.3f} km, "
+              f"{sum(summary['braking_events'] for summary in summaries.values())} braking events")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pyConsole', description="Headless pyConsole tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_simulate = commands.add_parser('simulate', help="run the physics without a display")
+    source = parser_simulate.add_mutually_exclusive_group()
+    source.add_argument('--script', help="JSON driving script (default: built-in launch)")
+    source.add_argument('--scenario', metavar='FILE',
+                        help="scenario file, e.g. 'gear 1; gas 80% for 3s; shift 2 at 6000rpm'")
+    source.add_argument('--replay', metavar='TELEMETRY',
+                        help="drive with the inputs and safety switches of a recording")
+    parser_simulate.add_argument('--enable', default='', metavar='abs,esp,...',
+                                 help="safety systems switched on at the start")
+    parser_simulate.add_argument('--dt', type=float, help="physics step in seconds (not for replays)")
+    parser_simulate.add_argument('--torque', action='store_true',
+                                 help="use the torque-curve engine model")
+    parser_simulate.add_argument('--telemetry', metavar='PATH', help="record every tick to PATH")
+    parser_simulate.add_argument('--json', action='store_true', help="print the summary as JSON")
+    parser_simulate.set_defaults(handler=simulate)
+
+    parser_analyze = commands.add_parser('analyze', help="summarize recorded trips")
+    parser_analyze.add_argument('trips', nargs='+', metavar='TELEMETRY', help="telemetry files")
+    parser_analyze.add_argument('--braking-g', type=float, metavar='G',
+                                help="deceleration that counts as a braking event")
+    parser_analyze.add_argument('--with', dest='systems', default='', metavar='abs,esp,...',
+                                help="only count braking events with these systems enabled")
+    parser_analyze.add_argument('--json', action='store_true', help="print the summaries as JSON")
+    parser_analyze.set_defaults(handler=analyze)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
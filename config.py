@@ -16,7 +16,31 @@ REVERSE_GEAR_RATIO = 3.9
 
 # Animation settings
 PHYSICS_UPDATE_RATE = 0.05  # 20 Hz
-GUI_UPDATE_RATE = 50        # 20 Hz
+PHYSICS_MAX_CATCH_UP = 5    # Most steps run back to back after falling behind
+PHYSICS_JITTER_SAMPLES = 1000  # Tick intervals kept for jitter statistics
+PHYSICS_PROCESS_ENABLED = False  # Run the physics in its own process, sharing memory with the GUI
+PHYSICS_PROCESS_RATE = 500   # Hz of the physics process
+GUI_MAX_FPS = 60            # Needle smoothing is time based, any rate feels the same
+GUI_IDLE_UPDATE_RATE = 250  # ms between frames while the needles are at rest
+GUI_IDLE_FRAMES = 10        # Frames at rest before dropping to the idle rate
+GUI_RESIZE_DEBOUNCE = 100   # ms a canvas must keep its size before the gauges are redrawn
+STRIP_CHART_WINDOW = 300    # s of history in the strip chart (at most TELEMETRY_RING_SIZE ticks less a margin)
+STRIP_CHART_HEIGHT = 150    # Initial strip chart height in pixels
+
+# Torque engine model (opt-in; the default model uses fixed per-gear factors)
+TORQUE_MODEL_ENABLED = False  # Also drives reverse when enabled
+TORQUE_CURVE_STEP = 500       # RPM between points of TORQUE_CURVE
+TORQUE_CURVE = (              # Full-throttle engine torque in Nm at 0, 500, ... 9000 RPM
+    100, 120, 150, 180, 210, 235, 250, 260, 265, 265,
+    260, 255, 245, 235, 220, 200, 180, 160, 140,
+)
+VEHICLE_MASS = 1400           # kg
+DRAG_COEFFICIENT = 0.40       # Aerodynamic drag in N per (m/s)^2 (0.5 * rho * Cd * A)
+ROLLING_RESISTANCE = 0.012    # Rolling resistance coefficient
+DRIVETRAIN_EFFICIENCY = 0.9
+
+# Scenarios
+SCENARIO_MAX_WAIT = 600      # s an 'until' condition may take before the scenario moves on
 
 # Safety system limits
 ABS_MAX_BRAKE = 0.7
@@ -25,3 +49,27 @@ ESP_POWER_REDUCTION = 0.7
 ACC_TARGET_SPEED = 100
 SPD_MAX_SPEED = 120
 ODS_POWER_REDUCTION = 0.85
+
+# Telemetry recording
+TELEMETRY_PATH = None          # Record every physics tick to this file when set
+TELEMETRY_BLOCK_ROWS = 65536   # Rows per memory-mapped block of the telemetry file
+TELEMETRY_RING_SIZE = 6000     # Rows kept in memory for the live view (5 min at 20 Hz)
+
+# Replay
+REPLAY_KEYFRAME_INTERVAL = 1200  # Ticks between replay keyframes (1 min at 20 Hz)
+
+# Trip analytics
+ANALYTICS_REDLINE_RPM = 7000   # RPM from which a tick counts as redline (the gauge's red zone)
+ANALYTICS_BRAKING_G = 0.7      # Deceleration in g from which braking counts as an event
+ANALYTICS_CACHE_SIZE = 32      # Trips whose indexes stay loaded between queries
+ANALYTICS_RESULT_CACHE_SIZE = 1024  # Query results kept, the least recently used dropped first
+
+# Profiling
+PROFILING_ENABLED = False            # Record frame, draw, tick and input latency timings
+PROFILE_DUMP_PATH = 'dashboard_profile.json'  # Written on close when profiling
+PROFILE_OVERLAY_INTERVAL = 10        # Frames between overlay refreshes
+
+# Simulation server
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_PUBLISH_RATE = 20       # State updates per second sent to each client
@@ -3,38 +3,81 @@ from tkinter import messagebox
 import threading
 import time
 from gui.gauges import SpeedGauge, RPMGauge
+from gui.strip_chart import StripChart
 from gui.controls import DashboardControls
-from physics.engine import EnginePhysics
-from physics.safety_systems import SafetySystems
+from gui.frame_scheduler import FrameScheduler
+from gui.interpolation import StateInterpolator, smooth
+from gui.profiling import DashboardProfiler
+from physics.simulator import VehicleSimulator, VehicleInputs
+from physics.input_queue import InputCoalescer
+from physics.snapshot import SnapshotBuffer
+from physics.scheduler import FixedStepScheduler
+from telemetry.recorder import TelemetryRecorder, TelemetryRing, telemetry_row
+from network.client import SimulationClient
+from physics.process import PhysicsProcess
 from config import *
-from utils.constants import BUTTON_COLOR, ACTIVE_COLOR
+from utils.constants import (
+    BUTTON_COLOR, ACTIVE_COLOR, GAUGE_SIZE, SPEED_SMOOTHING_TIME, RPM_SMOOTHING_TIME,
+    SPEED_SNAP, RPM_SNAP
+)
 
 class CarDashboard:
-    def __init__(self, root):
+    def __init__(self, root, telemetry_path=TELEMETRY_PATH, profiling=PROFILING_ENABLED,
+                 remote=None, physics_process=PHYSICS_PROCESS_ENABLED):
         self.root = root
         self.setup_window()
         
         # Initialize components
-        self.engine = EnginePhysics()
-        self.safety_systems = SafetySystems()
+        self.simulator = VehicleSimulator()
+        self.engine = self.simulator.engine
+        self.safety_systems = self.simulator.safety_systems
+        self.recorder = TelemetryRecorder(telemetry_path) if telemetry_path else None
+        # Recent ticks for the strip chart, kept by the recorder when there is one
+        self.history = self.recorder.ring if self.recorder is not None else TelemetryRing()
+        # Simulated seconds between history rows: one per physics tick here,
+        # sampled to the same spacing from a remote simulation
+        self.history_interval = PHYSICS_UPDATE_RATE
+        self.history_time = None
+        self.profiler = DashboardProfiler() if profiling else None
         
         # Dashboard state
         self.speed = 0.0
         self.rpm = 0.0
         self.target_speed = 0.0
         self.target_rpm = 0.0
-        self.steering_angle = 0
-        self.clutch = 0
-        self.brake = 0
-        self.gas = 0
-        self.gear = 1
         self.running = False
         self.engine_on = False
+        self.interpolator = StateInterpolator()
+        self.frame_time = None
+        
+        # Input events coalesced into one snapshot per physics tick, and the
+        # vehicle state the physics thread publishes back after every tick
+        self.input_queue = InputCoalescer(VehicleInputs(engine_on=False, running=False))
+        self.state_buffer = SnapshotBuffer(self.simulator.snapshot())
+        
+        # With remote=(host, port) the physics runs in a SimulationServer and
+        # this dashboard only sends inputs and displays the published state.
+        # physics_process does the same with a PhysicsProcess on this machine.
+        self.remote = None
+        if remote is not None:
+            self.remote = SimulationClient(*remote)
+        elif physics_process:
+            self.remote = PhysicsProcess(inputs=self.input_queue.current)
+        if self.remote is not None:
+            self.state_buffer = self.remote.state_buffer
+            if self.remote.wait_for_state() is None:
+                self.remote.close()
+                if self.recorder is not None:
+                    self.recorder.close()
+                raise ConnectionError("the simulation published no state")
         
         # Animation control
         self.animation_running = True
         self.physics_running = False
         self.physics_thread = None
+        self.physics_stop = threading.Event()
+        self.physics_scheduler = FixedStepScheduler(self.physics_tick)
+        self.frame_scheduler = FrameScheduler(self.root, self.animate_dashboard)
         
         # Setup GUI components
         self.setup_ui()
@@ -58,19 +101,30 @@ class CarDashboard:
 
         # Speed gauge
         self.speed_canvas = tk.Canvas(
-            gauge_frame, width=300, height=300, bg='black', 
+            gauge_frame, width=GAUGE_SIZE, height=GAUGE_SIZE, bg='black', 
             highlightthickness=2, highlightbackground='white'
         )
-        self.speed_canvas.pack(side=tk.LEFT, padx=20, pady=20)
+        self.speed_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=20, pady=20)
         self.speed_gauge = SpeedGauge(self.speed_canvas)
+        self.speed_canvas.bind('<Configure>', self.speed_gauge.on_configure)
 
         # RPM gauge
         self.rpm_canvas = tk.Canvas(
-            gauge_frame, width=300, height=300, bg='black', 
+            gauge_frame, width=GAUGE_SIZE, height=GAUGE_SIZE, bg='black', 
             highlightthickness=2, highlightbackground='white'
         )
-        self.rpm_canvas.pack(side=tk.RIGHT, padx=20, pady=20)
+        self.rpm_canvas.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=20, pady=20)
         self.rpm_gauge = RPMGauge(self.rpm_canvas)
+        self.rpm_canvas.bind('<Configure>', self.rpm_gauge.on_configure)
+
+        # Speed, RPM, gear and pedal history
+        self.chart_canvas = tk.Canvas(
+            main_frame, height=STRIP_CHART_HEIGHT, bg='black',
+            highlightthickness=2, highlightbackground='white'
+        )
+        self.chart_canvas.pack(fill=tk.X, padx=20)
+        self.strip_chart = StripChart(self.chart_canvas, self.history, dt=self.history_interval)
+        self.chart_canvas.bind('<Configure>', self.strip_chart.on_configure)
         
         # Setup controls with callbacks
         callbacks = {
@@ -99,6 +153,13 @@ class CarDashboard:
     def toggle_power(self):
         """Toggle engine ON/OFF"""
         self.engine_on = not self.engine_on
+        self.update_inputs(engine_on=self.engine_on)
+        self.show_power()
+        if not self.engine_on and self.running:
+            self.toggle_simulation()
+    
+    def show_power(self):
+        """Show the engine switch on the power button and status"""
         if self.engine_on:
             self.controls.power_btn.configure(bg=ACTIVE_COLOR)
             self.controls.engine_status.configure(text="ENGINE ON", bg=ACTIVE_COLOR)
@@ -107,8 +168,6 @@ class CarDashboard:
             self.controls.power_btn.configure(bg=BUTTON_COLOR)
             self.controls.engine_status.configure(text="ENGINE OFF", bg='red')
             self.target_rpm = 0
-            if self.running:
-                self.toggle_simulation()
     
     def toggle_simulation(self):
         """Toggle driving simulation ON/OFF"""
@@ -116,6 +175,11 @@ class CarDashboard:
             messagebox.showwarning("Warning", "Please start the engine first!")
             return
         self.running = not self.running
+        self.update_inputs(running=self.running)
+        self.show_simulation()
+    
+    def show_simulation(self):
+        """Start or stop the physics to match the simulation switch"""
         if self.running:
             self.controls.start_btn.configure(bg=ACTIVE_COLOR)
             self.controls.sim_status.configure(text="SIM ON", bg=ACTIVE_COLOR)
@@ -138,14 +202,12 @@ class CarDashboard:
         self.rpm = 0.0
         self.target_speed = 0.0
         self.target_rpm = 0.0
-        self.engine.velocity = 0.0
-        self.engine.acceleration = 0.0
-        self.steering_angle = 0
-        self.clutch = 0
-        self.brake = 0
-        self.gas = 0
-        self.gear = 1
-        self.engine.odometer = 0.0
+        self.interpolator.reset()
+        if self.remote is not None:
+            self.remote.send_reset()
+        else:
+            self.simulator.reset()
+            self.state_buffer.publish(self.simulator.snapshot())
         
         # Reset UI elements
         self.controls.steering_scale.set(0)
@@ -153,66 +215,127 @@ class CarDashboard:
         self.controls.brake_scale.set(0)
         self.controls.gas_scale.set(0)
         self.highlight_gear('1')
+        self.update_inputs(gas=0.0, brake=0.0, clutch=0.0, steering_angle=0.0, gear=1)
         
         # Reset button colors
         self.controls.reset_btn.configure(bg='orange')
         self.root.after(200, lambda: self.controls.reset_btn.configure(bg=BUTTON_COLOR))
         
         # Reset safety systems
-        self.safety_systems.abs_enabled = False
-        self.safety_systems.esp_enabled = False
-        self.safety_systems.acc_enabled = False
-        self.safety_systems.ods_enabled = False
-        self.safety_systems.spd_enabled = False
-        
-        self.controls.abs_btn.configure(bg=BUTTON_COLOR)
-        self.controls.esp_btn.configure(bg=BUTTON_COLOR)
-        self.controls.acc_btn.configure(bg=BUTTON_COLOR)
-        self.controls.ods_btn.configure(bg=BUTTON_COLOR)
-        self.controls.spd_btn.configure(bg=BUTTON_COLOR)
+        self.safety_systems.mask = 0
+        self.safety_changed()
+        self.show_safety()
+    
+    def show_safety(self):
+        """Light the buttons of the enabled safety systems"""
+        safety = self.safety_systems
+        for button, enabled in (
+            (self.controls.abs_btn, safety.abs_enabled), (self.controls.esp_btn, safety.esp_enabled),
+            (self.controls.acc_btn, safety.acc_enabled), (self.controls.ods_btn, safety.ods_enabled),
+            (self.controls.spd_btn, safety.spd_enabled),
+        ):
+            button.configure(bg=ACTIVE_COLOR if enabled else BUTTON_COLOR)
+    
+    def apply_controls(self, inputs, mask):
+        """Show the shared controls of a remote simulation
+
+        Other displays may have changed them. Nothing is sent back: the
+        client already counts these as the controls it last sent.
+        """
+        self.input_queue.replace(inputs)
+        for scale, value in (
+            (self.controls.steering_scale, inputs.steering_angle),
+            (self.controls.clutch_scale, inputs.clutch),
+            (self.controls.brake_scale, inputs.brake),
+            (self.controls.gas_scale, inputs.gas),
+        ):
+            if float(scale.get()) != value:
+                scale.set(value)
+        self.highlight_gear('R' if inputs.gear == -1 else str(inputs.gear))
+        if inputs.engine_on != self.engine_on:
+            self.engine_on = inputs.engine_on
+            self.show_power()
+        if inputs.running != self.running:
+            self.running = inputs.running
+            self.show_simulation()
+        if mask != self.safety_systems.mask:
+            self.safety_systems.mask = mask
+            self.show_safety()
     
     def toggle_abs(self):
         enabled = self.safety_systems.toggle_abs()
+        self.safety_changed()
         self.controls.abs_btn.configure(bg=ACTIVE_COLOR if enabled else BUTTON_COLOR)
         print(f"ABS {'enabled' if enabled else 'disabled'}")
     
     def toggle_esp(self):
         enabled = self.safety_systems.toggle_esp()
+        self.safety_changed()
         self.controls.esp_btn.configure(bg=ACTIVE_COLOR if enabled else BUTTON_COLOR)
         print(f"ESP {'enabled' if enabled else 'disabled'}")
     
     def toggle_acc(self):
         enabled = self.safety_systems.toggle_acc()
+        self.safety_changed()
         self.controls.acc_btn.configure(bg=ACTIVE_COLOR if enabled else BUTTON_COLOR)
         print(f"ACC {'enabled' if enabled else 'disabled'}")
     
     def toggle_ods(self):
         enabled = self.safety_systems.toggle_ods()
+        self.safety_changed()
         self.controls.ods_btn.configure(bg=ACTIVE_COLOR if enabled else BUTTON_COLOR)
         print(f"ODS {'enabled' if enabled else 'disabled'}")
     
     def toggle_spd(self):
         enabled = self.safety_systems.toggle_spd()
+        self.safety_changed()
         self.controls.spd_btn.configure(bg=ACTIVE_COLOR if enabled else BUTTON_COLOR)
         print(f"SPD {'enabled' if enabled else 'disabled'}")
     
+    def safety_changed(self):
+        """Forward the safety-system switches to a remote simulation"""
+        if self.remote is not None:
+            self.remote.send_safety(self.safety_systems)
+    
+    @property
+    def inputs(self):
+        """Input snapshot most recently taken from the input queue"""
+        return self.input_queue.current
+    
+    def update_inputs(self, **changes):
+        """Queue input changes for the next physics tick"""
+        self.input_received(self.input_queue.update(**changes))
+    
+    def post_input(self, field, value):
+        """Queue one raw slider value, parsed when the physics takes it"""
+        self.input_received(self.input_queue.post(field, value))
+    
+    def input_received(self, event_time):
+        """Wake the display after any input event
+
+        Every event wakes it: with the physics stopped nothing takes the
+        queue, so later events would otherwise never reach a suspended
+        display. event_time is only set for the first event since the last
+        take, which is the one the profiler measures input latency from.
+        """
+        if event_time is not None and self.profiler is not None:
+            self.profiler.input_event(event_time)
+        self.frame_scheduler.wake()
+    
     def update_steering(self, value):
-        self.steering_angle = float(value)
+        self.post_input('steering_angle', value)
     
     def update_clutch(self, value):
-        self.clutch = float(value)
+        self.post_input('clutch', value)
     
     def update_brake(self, value):
-        self.brake = float(value)
+        self.post_input('brake', value)
     
     def update_gas(self, value):
-        self.gas = float(value)
+        self.post_input('gas', value)
     
     def set_gear(self, gear):
-        if gear == 'R':
-            self.gear = -1
-        else:
-            self.gear = int(gear)
+        self.update_inputs(gear=-1 if gear == 'R' else int(gear))
         self.highlight_gear(gear)
     
     def highlight_gear(self, current_gear):
@@ -226,136 +349,133 @@ class CarDashboard:
         """Start the physics simulation in a separate thread"""
         if not self.physics_running:
             self.physics_running = True
+            if self.remote is not None:
+                return
+            self.physics_stop.clear()
             self.physics_thread = threading.Thread(target=self.physics_loop, daemon=True)
             self.physics_thread.start()
     
     def stop_physics_simulation(self):
-        """Stop the physics simulation"""
+        """Stop the physics simulation and wait for its last tick"""
         self.physics_running = False
+        self.physics_stop.set()
+        if self.physics_thread and self.physics_thread.is_alive():
+            self.physics_thread.join(timeout=1.0)
     
     def physics_loop(self):
-        """Realistic physics simulation loop"""
-        while self.physics_running:
-            if self.engine_on and self.running:
-                # Get current input values
-                gas_factor = self.gas / 100.0
-                brake_factor = self.brake / 100.0
-                clutch_factor = self.clutch / 100.0
-
-                # Apply safety systems
-                brake_factor = self.safety_systems.apply_abs(brake_factor)
-                gas_factor = self.safety_systems.apply_esp(gas_factor, self.steering_angle)
-                gas_factor = self.safety_systems.apply_acc(gas_factor, self.speed)
-                gas_factor = self.safety_systems.apply_ods(gas_factor)
-
-                if self.gear > 0:  # Forward gear
-                    # Calculate RPM based on speed and gear
-                    if self.speed > 0.1:
-                        self.target_rpm = self.engine.calculate_rpm(self.speed, self.gear)
-                    else:
-                        if gas_factor > 0:
-                            self.target_rpm = IDLE_RPM + (gas_factor * (3500 - IDLE_RPM))
-                        else:
-                            self.target_rpm = IDLE_RPM
-
-                    # Calculate acceleration
-                    if gas_factor > 0 and clutch_factor < 70:
-                        self.engine.acceleration = self.engine.calculate_acceleration(
-                            gas_factor, self.gear, clutch_factor
-                        )
-                        if self.speed < MAX_SPEED:
-                            self.engine.velocity += self.engine.acceleration
-                    else:
-                        self.engine.acceleration = 0
-
-                    # Braking
-                    if brake_factor > 0:
-                        brake_deceleration = brake_factor * 8
-                        self.engine.velocity = max(0, self.engine.velocity - brake_deceleration)
-
-                    # Natural deceleration
-                    if gas_factor == 0 and brake_factor == 0:
-                        natural_decel = 0.5 + (self.speed * 0.02)
-                        self.engine.velocity = max(0, self.engine.velocity - natural_decel)
-
-                elif self.gear == -1:  # Reverse gear
-                    if self.speed > 0.1:
-                        self.target_rpm = self.engine.calculate_rpm(self.speed, self.gear)
-                    else:
-                        if gas_factor > 0:
-                            self.target_rpm = IDLE_RPM + (gas_factor * (2500 - IDLE_RPM))
-                        else:
-                            self.target_rpm = IDLE_RPM
-
-                    if gas_factor > 0 and clutch_factor < 70:
-                        reverse_accel = gas_factor * 1.0
-                        if abs(self.engine.velocity) < 40:
-                            self.engine.velocity -= reverse_accel
-
-                    if brake_factor > 0:
-                        brake_deceleration = brake_factor * 6
-                        if self.engine.velocity < 0:
-                            self.engine.velocity = min(0, self.engine.velocity + brake_deceleration)
-
-                else:  # Neutral gear
-                    if gas_factor > 0:
-                        self.target_rpm = IDLE_RPM + (gas_factor * (4000 - IDLE_RPM))
-                    else:
-                        self.target_rpm = IDLE_RPM
-                    
-                    self.engine.acceleration = 0
-                    natural_decel = 1.0 + (self.speed * 0.03)
-                    self.engine.velocity = max(0, self.engine.velocity - natural_decel)
-
-                # Apply speed limiter
-                self.engine.velocity = self.safety_systems.apply_speed_limiter(self.engine.velocity)
-                self.target_speed = max(0, abs(self.engine.velocity))
-
-                # Update odometer
-                self.engine.update_odometer(self.speed)
-
-            elif self.engine_on and not self.running:
-                self.target_rpm = IDLE_RPM
-                coast_decel = 1.0 + (self.speed * 0.03)
-                self.engine.velocity = max(0, self.engine.velocity - coast_decel)
-                self.target_speed = max(0, self.engine.velocity)
-
-            else:
-                self.target_rpm = 0
-                coast_decel = 2.0
-                self.engine.velocity = max(0, self.engine.velocity - coast_decel)
-                self.target_speed = max(0, self.engine.velocity)
+        """Drive the headless simulator in real time from the dashboard inputs"""
+        self.physics_scheduler.run(self.physics_stop)
+    
+    def physics_tick(self, dt):
+        """Advance the simulator by one fixed step and publish its state"""
+        profiler = self.profiler
+        if profiler is not None:
+            started = time.perf_counter()
+        batch = self.input_queue.take()
+        inputs = batch.inputs
+        self.simulator.step(inputs, dt)
+        state = self.simulator.snapshot()
+        self.state_buffer.publish(state)
+        row = telemetry_row(inputs, state, self.safety_systems)
+        if self.recorder is not None:
+            self.recorder.record_row(row)
+        else:
+            self.history.append(row)
+        if profiler is not None:
+            if batch.first_event is not None:
+                profiler.input_applied(state.tick, batch.first_event)
+            profiler.record('physics_tick', time.perf_counter() - started)
+    
+    def sample_history(self, state):
+        """Append a remote state to the history once per history_interval
 
-            time.sleep(PHYSICS_UPDATE_RATE)
+        The strip chart needs evenly spaced rows, whatever rate the server
+        publishes at and the frames run at, so rows are taken on the
+        simulation clock and the latest state is repeated over longer gaps.
+        The recorder, when there is one, records the same rows.
+        """
+        if self.history_time is None or state.time < self.history_time:
+            # First state, or the simulation was reset
+            rows = 1
+            self.history_time = state.time
+        else:
+            rows = int((state.time - self.history_time) / self.history_interval + 1e-6)
+            if not rows:
+                return
+            self.history_time += rows * self.history_interval
+        row = telemetry_row(self.inputs, state, self.safety_systems)
+        append = self.recorder.record_row if self.recorder is not None else self.history.append
+        for _ in range(min(rows, self.history.size)):
+            append(row)
     
     def animate_dashboard(self):
         """Smooth animation of dashboard elements"""
         if self.animation_running:
-            # Smooth speed transition
-            speed_diff = self.target_speed - self.speed
-            if abs(speed_diff) > 0.1:
-                self.speed += speed_diff * 0.1
+            profiler = self.profiler
+            if profiler is not None:
+                frame_started = time.perf_counter()
+            if self.remote is not None:
+                if self.input_queue.pending:
+                    # One inputs message per frame however many events arrived
+                    self.remote.send_inputs(self.input_queue.take().inputs)
+                controls = self.remote.take_controls()
+                if controls is not None:
+                    self.apply_controls(*controls)
+            now = time.perf_counter()
+            # The first frame after the display idled or suspended starts
+            # the animation afresh rather than jumping over the pause
+            if self.frame_time is None or self.frame_scheduler.resumed:
+                elapsed = 0.0
             else:
-                self.speed = self.target_speed
+                elapsed = now - self.frame_time
+            self.frame_time = now
+            state = self.state_buffer.latest
+            live = self.physics_running or self.remote is not None
+            if self.remote is not None:
+                # The server runs the physics, keep the history from what it publishes
+                self.sample_history(state)
+            if live:
+                self.interpolator.push(state, now)
+                self.target_speed, self.target_rpm = self.interpolator.sample(now)
 
-            # Smooth RPM transition
-            rpm_diff = self.target_rpm - self.rpm
-            if abs(rpm_diff) > 10:
-                self.rpm += rpm_diff * 0.15
-            else:
-                self.rpm = self.target_rpm
+            # Smooth needle transitions, by elapsed time so the feel does
+            # not depend on the frame rate
+            self.speed = smooth(self.speed, self.target_speed, elapsed, SPEED_SMOOTHING_TIME, SPEED_SNAP)
+            self.rpm = smooth(self.rpm, self.target_rpm, elapsed, RPM_SMOOTHING_TIME, RPM_SNAP)
 
             # Update gauge displays
-            self.speed_gauge.draw_needle(self.speed)
-            self.rpm_gauge.draw_needle(self.rpm, self.engine.odometer)
+            if profiler is None:
+                self.speed_gauge.draw_needle(self.speed)
+                self.rpm_gauge.draw_needle(self.rpm, state.odometer)
+                self.strip_chart.update()
+            else:
+                drawn = time.perf_counter()
+                self.speed_gauge.draw_needle(self.speed)
+                speed_drawn = time.perf_counter()
+                self.rpm_gauge.draw_needle(self.rpm, state.odometer)
+                rpm_drawn = time.perf_counter()
+                profiler.record('speed_gauge', speed_drawn - drawn)
+                self.strip_chart.update()
+                chart_drawn = time.perf_counter()
+                profiler.record('rpm_gauge', rpm_drawn - speed_drawn)
+                profiler.record('strip_chart', chart_drawn - rpm_drawn)
+                profiler.frame_drawn(state.tick, self.physics_running)
+                profiler.draw_overlay(self.speed_canvas, self.rpm_canvas)
+                profiler.record('frame', time.perf_counter() - frame_started)
 
-            # Schedule next animation frame
-            self.root.after(GUI_UPDATE_RATE, self.animate_dashboard)
+            # Schedule next animation frame, idling once the needles are at rest
+            moving = self.speed != self.target_speed or self.rpm != self.target_rpm
+            self.frame_scheduler.frame_done(moving, can_suspend=not live)
     
     def on_closing(self):
         """Clean shutdown of the application"""
         self.animation_running = False
-        self.physics_running = False
-        if self.physics_thread and self.physics_thread.is_alive():
-            self.physics_thread.join(timeout=1.0)
+        self.frame_scheduler.stop()
+        self.stop_physics_simulation()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.profiler is not None:
+            self.profiler.dump(PROFILE_DUMP_PATH)
+        if self.remote is not None:
+            self.remote.close()
         self.root.destroy()
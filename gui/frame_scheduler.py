@@ -0,0 +1,76 @@
+from config import GUI_MAX_FPS, GUI_IDLE_UPDATE_RATE, GUI_IDLE_FRAMES
+
+class FrameScheduler:
+    """Adaptive scheduling of animation frames on the Tk event loop.
+
+    Frames run at max_fps while something is moving. After idle_frames
+    consecutive frames at rest the scheduler drops to one frame every
+    idle_interval ms, or suspends completely when the caller allows it.
+    wake() brings it straight back to full rate. resumed tells the frame
+    callback whether its frame comes after such a pause rather than one
+    frame interval after the last. All methods must be called from the Tk
+    thread.
+    """
+
+    def __init__(self, root, frame_callback, max_fps=GUI_MAX_FPS,
+                 idle_interval=GUI_IDLE_UPDATE_RATE, idle_frames=GUI_IDLE_FRAMES):
+        self.root = root
+        self.frame_callback = frame_callback
+        self.frame_interval = max(1, int(1000 / max_fps))
+        self.idle_interval = idle_interval
+        self.idle_frames = idle_frames
+        self.after_id = None
+        self.interval = None
+        self.idle_count = 0
+        self.running = True
+        self.resumed = False
+
+    @property
+    def suspended(self):
+        return self.running and self.after_id is None
+
+    def frame_done(self, active, can_suspend=False):
+        """Schedule the next frame after one has been drawn
+
+        active tells whether anything on the dashboard is still moving and
+        can_suspend whether nothing but an input callback can change that.
+        """
+        if not self.running:
+            return
+        if active:
+            self.idle_count = 0
+        else:
+            self.idle_count += 1
+
+        if self.idle_count <= self.idle_frames:
+            self._schedule(self.frame_interval)
+        elif not can_suspend:
+            self._schedule(self.idle_interval)
+
+    def wake(self):
+        """Return to full frame rate after an input change"""
+        if not self.running:
+            return
+        self.idle_count = 0
+        if self.after_id is None or self.interval > self.frame_interval:
+            self._schedule(0)
+
+    def stop(self):
+        """Cancel any pending frame"""
+        self.running = False
+        self._cancel()
+
+    def _schedule(self, interval):
+        self._cancel()
+        self.interval = interval
+        self.after_id = self.root.after(interval, self._run_frame)
+
+    def _cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _run_frame(self):
+        self.after_id = None
+        self.resumed = self.interval != self.frame_interval
+        self.frame_callback()
@@ -0,0 +1,153 @@
+import math
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from utils.constants import *
+
+# Colours and font family of a gauge face. Themes are hashable so they can
+# be part of the face cache key.
+GaugeTheme = namedtuple('GaugeTheme', ['outline', 'tick', 'text', 'red_zone', 'font'])
+DEFAULT_THEME = GaugeTheme(GAUGE_OUTLINE_COLOR, 'white', 'white', RED_ZONE_COLOR, 'Arial')
+
+# Canvas tag shared by every static face item, so the face is one layer
+# that can be lowered, moved or deleted as a whole
+FACE_TAG = 'gauge_face'
+
+# Faces kept for reuse; older sizes are dropped first while resizing
+FACE_CACHE_SIZE = 32
+
+# Tick tables on the unit circle as (value, cos, sin), scaled per size
+def _unit_ticks(values, full_scale):
+    ticks = []
+    for value in values:
+        angle = math.radians(225 - (value/full_scale * 270))
+        ticks.append((value, math.cos(angle), math.sin(angle)))
+    return tuple(ticks)
+
+SPEED_MAJOR_TICKS = _unit_ticks(range(0, 270, 20), 260)
+SPEED_MINOR_TICKS = _unit_ticks(range(0, 270, 10), 260)
+RPM_TICKS = _unit_ticks(range(0, 10), 9)
+
+# Positions and fonts of a gauge at one canvas size, laid out in a square
+# of size pixels. factor is size / GAUGE_SIZE.
+GaugeGeometry = namedtuple('GaugeGeometry', [
+    'size', 'factor', 'center_x', 'center_y', 'radius', 'needle_length', 'needle_width',
+    'hub_radius', 'display_y', 'display_font', 'odometer_x', 'odometer_y', 'odometer_font'
+])
+
+# Built faces: {(kind, size, scale, theme): GaugeFace}
+_faces = OrderedDict()
+
+class GaugeFace:
+    """Static face of a gauge as a display list.
+
+    items holds (create method, coords, options) for every canvas item of
+    the face with all trig done, so drawing the face is one canvas call per
+    item and nothing else. Faces are built once per (kind, size, scale,
+    theme) and shared by all gauges and canvases.
+    """
+
+    def __init__(self, kind, size, scale, theme, items):
+        self.kind = kind
+        self.size = size
+        self.scale = scale
+        self.theme = theme
+        self.items = items
+
+    def draw(self, canvas):
+        """Create the face items on canvas, in the square at the origin"""
+        for create, coords, options in self.items:
+            getattr(canvas, create)(*coords, **options)
+
+def _font(theme, size, factor, scale, *style):
+    return (theme.font, max(1, round(size * factor * scale))) + style
+
+def _width(width, factor):
+    return max(1, round(width * factor))
+
+@lru_cache(maxsize=FACE_CACHE_SIZE)
+def get_geometry(size, scale=1.0, theme=DEFAULT_THEME):
+    """Return the GaugeGeometry for a gauge size pixels square"""
+    factor = size / GAUGE_SIZE
+    center_x = GAUGE_CENTER_X * factor
+    center_y = GAUGE_CENTER_Y * factor
+    return GaugeGeometry(
+        size, factor, center_x, center_y, GAUGE_RADIUS * factor,
+        NEEDLE_LENGTH * factor, _width(4, factor), 8 * factor,
+        center_y + 40 * factor, _font(theme, 16, factor, scale, 'bold'),
+        center_x + 60 * factor, center_y + 60 * factor, _font(theme, 10, factor, scale)
+    )
+
+def _radial(geometry, cos, sin, inner):
+    """Line from inner pixels inside the rim to the rim"""
+    center_x, center_y, radius = geometry.center_x, geometry.center_y, geometry.radius
+    return (center_x + (radius - inner) * cos, center_y - (radius - inner) * sin,
+            center_x + radius * cos, center_y - radius * sin)
+
+def _outline(geometry, theme):
+    center_x, center_y, radius = geometry.center_x, geometry.center_y, geometry.radius
+    return ('create_oval', (center_x - radius, center_y - radius, center_x + radius, center_y + radius),
+            {'outline': theme.outline, 'width': _width(3, geometry.factor), 'tags': FACE_TAG})
+
+def _speed_face(size, scale, theme):
+    geometry = get_geometry(size, scale, theme)
+    factor = geometry.factor
+    items = [_outline(geometry, theme)]
+
+    # Tick marks and numbers
+    number_font = _font(theme, 12, factor, scale, 'bold')
+    for value, cos, sin in SPEED_MAJOR_TICKS:
+        items.append(('create_line', _radial(geometry, cos, sin, 15 * factor),
+                      {'fill': theme.tick, 'width': _width(2, factor), 'tags': FACE_TAG}))
+        items.append(('create_text', _radial(geometry, cos, sin, 30 * factor)[:2],
+                      {'text': str(value), 'fill': theme.text, 'font': number_font, 'tags': FACE_TAG}))
+
+    # Minor ticks
+    for value, cos, sin in SPEED_MINOR_TICKS:
+        items.append(('create_line', _radial(geometry, cos, sin, 8 * factor),
+                      {'fill': theme.tick, 'width': _width(1, factor), 'tags': FACE_TAG}))
+
+    # Center label
+    items.append(('create_text', (geometry.center_x, geometry.center_y - 40 * factor),
+                  {'text': "km/h", 'fill': theme.text, 'font': _font(theme, 14, factor, scale),
+                   'tags': FACE_TAG}))
+    return items
+
+def _rpm_face(size, scale, theme):
+    geometry = get_geometry(size, scale, theme)
+    factor = geometry.factor
+    items = [_outline(geometry, theme)]
+
+    # Tick marks and numbers (0-9 for RPM x1000)
+    number_font = _font(theme, 12, factor, scale, 'bold')
+    for value, cos, sin in RPM_TICKS:
+        color = theme.red_zone if value >= 7 else theme.tick
+        items.append(('create_line', _radial(geometry, cos, sin, 15 * factor),
+                      {'fill': color, 'width': _width(2, factor), 'tags': FACE_TAG}))
+        items.append(('create_text', _radial(geometry, cos, sin, 30 * factor)[:2],
+                      {'text': str(value), 'fill': color, 'font': number_font, 'tags': FACE_TAG}))
+
+    # Center labels
+    items.append(('create_text', (geometry.center_x, geometry.center_y - 40 * factor),
+                  {'text': "rpm", 'fill': theme.text, 'font': _font(theme, 14, factor, scale),
+                   'tags': FACE_TAG}))
+    items.append(('create_text', (geometry.center_x, geometry.center_y - 25 * factor),
+                  {'text': "x 1000", 'fill': theme.text, 'font': _font(theme, 10, factor, scale),
+                   'tags': FACE_TAG}))
+    return items
+
+FACE_BUILDERS = {
+    'speed': _speed_face,
+    'rpm': _rpm_face,
+}
+
+def get_face(kind, size=GAUGE_SIZE, scale=1.0, theme=DEFAULT_THEME):
+    """Return the cached GaugeFace, building it on first use"""
+    key = (kind, size, scale, theme)
+    face = _faces.get(key)
+    if face is None:
+        face = _faces[key] = GaugeFace(kind, size, scale, theme, tuple(FACE_BUILDERS[kind](size, scale, theme)))
+        if len(_faces) > FACE_CACHE_SIZE:
+            _faces.popitem(last=False)
+    else:
+        _faces.move_to_end(key)
+    return face
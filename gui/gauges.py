@@ -1,171 +1,237 @@
-import tkinter as tk
 import math
 from utils.constants import *
-from config import MAX_SPEED, MAX_RPM
+from config import MAX_SPEED, MAX_RPM, GUI_RESIZE_DEBOUNCE
+from gui.gauge_faces import DEFAULT_THEME, FACE_TAG, get_face, get_geometry
 
-class SpeedGauge:
-    def __init__(self, canvas):
+class ScalableGauge:
+    """Canvas-size handling shared by the gauges.
+
+    The gauge is laid out in the largest square that fits the canvas,
+    centred, using the cached face and geometry for that size. The face is
+    drawn as one tagged layer from a cached GaugeFace; drawing the face that
+    is already on the canvas only moves it if the origin changed. Canvas <Configure> events are
+    debounced so a window drag redraws the gauge once it settles rather than
+    on every intermediate size.
+    """
+
+    kind = None
+
+    def __init__(self, canvas, theme=DEFAULT_THEME, size=GAUGE_SIZE):
         self.canvas = canvas
-        
+        self.theme = theme
+        self.face = None
+        self.face_origin = (0, 0)
+        self.resize_id = None
+        self._set_size(size, size)
+        self._reset_dynamic_items()
+
+    def _set_size(self, width, height):
+        size = max(1, min(width, height))
+        self.size = size
+        self.origin_x = (width - size) / 2
+        self.origin_y = (height - size) / 2
+        self.geometry = get_geometry(size, theme=self.theme)
+        self.center_x = self.origin_x + self.geometry.center_x
+        self.center_y = self.origin_y + self.geometry.center_y
+
     def draw_gauge_face(self):
-        """Draw the speedometer face with tick marks"""
-        self.canvas.delete("all")
-        # Draw outer circle
-        self.canvas.create_oval(
-            GAUGE_CENTER_X - GAUGE_RADIUS, GAUGE_CENTER_Y - GAUGE_RADIUS,
-            GAUGE_CENTER_X + GAUGE_RADIUS, GAUGE_CENTER_Y + GAUGE_RADIUS,
-            outline=GAUGE_OUTLINE_COLOR, width=3
-        )
-        
-        # Draw tick marks and numbers
-        for i in range(0, 270, 20):
-            angle = math.radians(225 - (i/260 * 270))
-            self._draw_tick_mark(angle, i)
-            
-        # Draw minor ticks
-        for i in range(0, 270, 10):
-            angle = math.radians(225 - (i/260 * 270))
-            self._draw_minor_tick(angle)
-            
-        # Center label
-        self.canvas.create_text(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y - 40, 
-            text="km/h", fill='white', font=('Arial', 14)
+        """Draw the gauge face for the current size from the face cache"""
+        face = get_face(self.kind, self.size, theme=self.theme)
+        origin = (self.origin_x, self.origin_y)
+        if face is self.face:
+            # Same size, the canvas only grew along the other axis
+            if origin != self.face_origin:
+                self.canvas.move(FACE_TAG, origin[0] - self.face_origin[0],
+                                 origin[1] - self.face_origin[1])
+                self.face_origin = origin
+            return
+        if self.face is None:
+            self.canvas.delete("all")
+            self._reset_dynamic_items()
+        else:
+            self.canvas.delete(FACE_TAG)
+        face.draw(self.canvas)
+        if self.origin_x or self.origin_y:
+            self.canvas.move(FACE_TAG, self.origin_x, self.origin_y)
+        self.canvas.tag_lower(FACE_TAG)
+        self.face = face
+        self.face_origin = origin
+
+    def on_configure(self, event):
+        """<Configure> handler: resize once the canvas stops changing size"""
+        if self.resize_id is not None:
+            self.canvas.after_cancel(self.resize_id)
+        self.resize_id = self.canvas.after(
+            GUI_RESIZE_DEBOUNCE, self.resize, event.width, event.height
         )
-    
-    def _draw_tick_mark(self, angle, value):
-        """Draw major tick marks with numbers"""
-        x1 = GAUGE_CENTER_X + (GAUGE_RADIUS - 15) * math.cos(angle)
-        y1 = GAUGE_CENTER_Y - (GAUGE_RADIUS - 15) * math.sin(angle)
-        x2 = GAUGE_CENTER_X + GAUGE_RADIUS * math.cos(angle)
-        y2 = GAUGE_CENTER_Y - GAUGE_RADIUS * math.sin(angle)
-        
-        self.canvas.create_line(x1, y1, x2, y2, fill='white', width=2)
-        
-        if value % 20 == 0:
-            num_x = GAUGE_CENTER_X + (GAUGE_RADIUS - 30) * math.cos(angle)
-            num_y = GAUGE_CENTER_Y - (GAUGE_RADIUS - 30) * math.sin(angle)
-            self.canvas.create_text(
-                num_x, num_y, text=str(value),
-                fill='white', font=('Arial', 12, 'bold')
-            )
-    
-    def _draw_minor_tick(self, angle):
-        """Draw minor tick marks"""
-        x1 = GAUGE_CENTER_X + (GAUGE_RADIUS - 8) * math.cos(angle)
-        y1 = GAUGE_CENTER_Y - (GAUGE_RADIUS - 8) * math.sin(angle)
-        x2 = GAUGE_CENTER_X + GAUGE_RADIUS * math.cos(angle)
-        y2 = GAUGE_CENTER_Y - GAUGE_RADIUS * math.sin(angle)
-        self.canvas.create_line(x1, y1, x2, y2, fill='white', width=1)
-    
-    def draw_needle(self, speed):
-        """Draw the speedometer needle"""
-        self.canvas.delete("speed_needle")
-        self.canvas.delete("speed_display")
-        
-        speed_ratio = min(speed / MAX_SPEED, 1.0)
-        angle = math.radians(225 - (speed_ratio * 270))
-        
-        needle_x = GAUGE_CENTER_X + NEEDLE_LENGTH * math.cos(angle)
-        needle_y = GAUGE_CENTER_Y - NEEDLE_LENGTH * math.sin(angle)
-        
-        self.canvas.create_line(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y, needle_x, needle_y,
-            fill=NEEDLE_COLOR, width=4, tags="speed_needle"
+
+    def resize(self, width, height):
+        """Lay the gauge out for a canvas of width x height pixels
+
+        The sizes are the outer widget size as reported by <Configure>; the
+        border and highlight are taken off here.
+        """
+        self.resize_id = None
+        inset = 2 * (int(self.canvas.cget('highlightthickness')) + int(self.canvas.cget('borderwidth')))
+        width, height = width - inset, height - inset
+        size = max(1, min(width, height))
+        if (size == self.size and self.origin_x == (width - size) / 2
+                and self.origin_y == (height - size) / 2):
+            return
+        self._set_size(width, height)
+        self._delete_dynamic_items()
+        self.draw_gauge_face()
+        self.redraw_needle()
+
+    def _delete_dynamic_items(self):
+        for item in self._dynamic_items():
+            if item is not None:
+                self.canvas.delete(item)
+        self._reset_dynamic_items()
+
+class SpeedGauge(ScalableGauge):
+    kind = 'speed'
+    speed = 0.0
+
+    def _reset_dynamic_items(self):
+        """Forget the needle and readout items so they are created again"""
+        self.needle_item = None
+        self.hub_item = None
+        self.display_item = None
+        self.displayed_text = None
+
+    def _dynamic_items(self):
+        return (self.needle_item, self.hub_item, self.display_item)
+
+    def _create_dynamic_items(self):
+        """Create the needle, hub and readout items once"""
+        geometry = self.geometry
+        center_x, center_y = self.center_x, self.center_y
+        hub_radius = geometry.hub_radius
+        self.needle_item = self.canvas.create_line(
+            center_x, center_y, center_x, center_y,
+            fill=NEEDLE_COLOR, width=geometry.needle_width, tags="speed_needle"
         )
-        
+
         # Center circle
-        self.canvas.create_oval(
-            GAUGE_CENTER_X - 8, GAUGE_CENTER_Y - 8,
-            GAUGE_CENTER_X + 8, GAUGE_CENTER_Y + 8,
+        self.hub_item = self.canvas.create_oval(
+            center_x - hub_radius, center_y - hub_radius,
+            center_x + hub_radius, center_y + hub_radius,
             fill='gray', outline='white', tags="speed_needle"
         )
-        
+
         # Speed display
-        self.canvas.create_text(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y + 40, text=f"{speed:.1f}",
-            fill='white', font=('Arial', 16, 'bold'), tags="speed_display"
+        self.display_item = self.canvas.create_text(
+            center_x, self.origin_y + geometry.display_y, text="",
+            fill='white', font=geometry.display_font, tags="speed_display"
         )
 
-class RPMGauge:
-    def __init__(self, canvas):
-        self.canvas = canvas
-        
-    def draw_gauge_face(self):
-        """Draw the RPM gauge face with tick marks"""
-        self.canvas.delete("all")
-        # Draw outer circle
-        self.canvas.create_oval(
-            GAUGE_CENTER_X - GAUGE_RADIUS, GAUGE_CENTER_Y - GAUGE_RADIUS,
-            GAUGE_CENTER_X + GAUGE_RADIUS, GAUGE_CENTER_Y + GAUGE_RADIUS,
-            outline=GAUGE_OUTLINE_COLOR, width=3
-        )
-        
-        # Draw tick marks and numbers (0-9 for RPM x1000)
-        for i in range(0, 10):
-            angle = math.radians(225 - (i/9 * 270))
-            color = RED_ZONE_COLOR if i >= 7 else 'white'
-            self._draw_tick_mark(angle, i, color)
-            
-        # Center labels
-        self.canvas.create_text(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y - 40, 
-            text="rpm", fill='white', font=('Arial', 14)
-        )
-        self.canvas.create_text(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y - 25, 
-            text="x 1000", fill='white', font=('Arial', 10)
-        )
-    
-    def _draw_tick_mark(self, angle, value, color):
-        """Draw tick marks with numbers"""
-        x1 = GAUGE_CENTER_X + (GAUGE_RADIUS - 15) * math.cos(angle)
-        y1 = GAUGE_CENTER_Y - (GAUGE_RADIUS - 15) * math.sin(angle)
-        x2 = GAUGE_CENTER_X + GAUGE_RADIUS * math.cos(angle)
-        y2 = GAUGE_CENTER_Y - GAUGE_RADIUS * math.sin(angle)
-        
-        self.canvas.create_line(x1, y1, x2, y2, fill=color, width=2)
-        
-        num_x = GAUGE_CENTER_X + (GAUGE_RADIUS - 30) * math.cos(angle)
-        num_y = GAUGE_CENTER_Y - (GAUGE_RADIUS - 30) * math.sin(angle)
-        self.canvas.create_text(
-            num_x, num_y, text=str(value),
-            fill=color, font=('Arial', 12, 'bold')
-        )
-    
-    def draw_needle(self, rpm, odometer):
-        """Draw the RPM needle and update displays"""
-        self.canvas.delete("rpm_needle")
-        self.canvas.delete("rpm_display")
-        self.canvas.delete("odometer")
-        
-        rpm_ratio = min(rpm / MAX_RPM, 1.0)
-        angle = math.radians(225 - (rpm_ratio * 270))
-        
-        needle_x = GAUGE_CENTER_X + NEEDLE_LENGTH * math.cos(angle)
-        needle_y = GAUGE_CENTER_Y - NEEDLE_LENGTH * math.sin(angle)
-        
-        needle_color = RED_ZONE_COLOR if rpm > 7000 else NEEDLE_COLOR
-        self.canvas.create_line(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y, needle_x, needle_y,
-            fill=needle_color, width=4, tags="rpm_needle"
+    def draw_needle(self, speed):
+        """Move the speedometer needle and update the readout"""
+        self.speed = speed
+        text = f"{speed:.1f}"
+        if text == self.displayed_text:
+            return
+        if self.needle_item is None:
+            self._create_dynamic_items()
+
+        speed_ratio = min(speed / MAX_SPEED, 1.0)
+        angle = math.radians(225 - (speed_ratio * 270))
+
+        center_x, center_y = self.center_x, self.center_y
+        needle_length = self.geometry.needle_length
+        needle_x = center_x + needle_length * math.cos(angle)
+        needle_y = center_y - needle_length * math.sin(angle)
+
+        self.canvas.coords(self.needle_item, center_x, center_y, needle_x, needle_y)
+        self.canvas.itemconfigure(self.display_item, text=text)
+        self.displayed_text = text
+
+    def redraw_needle(self):
+        """Draw the last needle position again, e.g. after a resize"""
+        self.draw_needle(self.speed)
+
+class RPMGauge(ScalableGauge):
+    kind = 'rpm'
+    rpm = 0.0
+    odometer = 0.0
+
+    def _reset_dynamic_items(self):
+        """Forget the needle and readout items so they are created again"""
+        self.needle_item = None
+        self.hub_item = None
+        self.display_item = None
+        self.odometer_item = None
+        self.needle_color = None
+        self.displayed_text = None
+        self.odometer_text = None
+
+    def _dynamic_items(self):
+        return (self.needle_item, self.hub_item, self.display_item, self.odometer_item)
+
+    def _create_dynamic_items(self):
+        """Create the needle, hub, readout and odometer items once"""
+        geometry = self.geometry
+        center_x, center_y = self.center_x, self.center_y
+        hub_radius = geometry.hub_radius
+        self.needle_color = NEEDLE_COLOR
+        self.needle_item = self.canvas.create_line(
+            center_x, center_y, center_x, center_y,
+            fill=self.needle_color, width=geometry.needle_width, tags="rpm_needle"
         )
-        
+
         # Center circle
-        self.canvas.create_oval(
-            GAUGE_CENTER_X - 8, GAUGE_CENTER_Y - 8,
-            GAUGE_CENTER_X + 8, GAUGE_CENTER_Y + 8,
+        self.hub_item = self.canvas.create_oval(
+            center_x - hub_radius, center_y - hub_radius,
+            center_x + hub_radius, center_y + hub_radius,
             fill='gray', outline='white', tags="rpm_needle"
         )
-        
+
         # RPM display
-        self.canvas.create_text(
-            GAUGE_CENTER_X, GAUGE_CENTER_Y + 40, text=f"{rpm:.0f}",
-            fill='white', font=('Arial', 16, 'bold'), tags="rpm_display"
+        self.display_item = self.canvas.create_text(
+            center_x, self.origin_y + geometry.display_y, text="",
+            fill='white', font=geometry.display_font, tags="rpm_display"
         )
-        
+
         # Odometer
-        self.canvas.create_text(
-            GAUGE_CENTER_X + 60, GAUGE_CENTER_Y + 60, text=f"{odometer:.2f}",
-            fill='white', font=('Arial', 10), tags="odometer"
+        self.odometer_item = self.canvas.create_text(
+            self.origin_x + geometry.odometer_x, self.origin_y + geometry.odometer_y, text="",
+            fill='white', font=geometry.odometer_font, tags="odometer"
         )
+
+    def draw_needle(self, rpm, odometer):
+        """Move the RPM needle and update the displays"""
+        self.rpm = rpm
+        self.odometer = odometer
+        if self.needle_item is None:
+            self._create_dynamic_items()
+
+        odometer_text = f"{odometer:.2f}"
+        if odometer_text != self.odometer_text:
+            self.canvas.itemconfigure(self.odometer_item, text=odometer_text)
+            self.odometer_text = odometer_text
+
+        text = f"{rpm:.0f}"
+        if text == self.displayed_text:
+            return
+
+        rpm_ratio = min(rpm / MAX_RPM, 1.0)
+        angle = math.radians(225 - (rpm_ratio * 270))
+
+        center_x, center_y = self.center_x, self.center_y
+        needle_length = self.geometry.needle_length
+        needle_x = center_x + needle_length * math.cos(angle)
+        needle_y = center_y - needle_length * math.sin(angle)
+
+        self.canvas.coords(self.needle_item, center_x, center_y, needle_x, needle_y)
+        needle_color = RED_ZONE_COLOR if rpm > 7000 else NEEDLE_COLOR
+        if needle_color != self.needle_color:
+            self.canvas.itemconfigure(self.needle_item, fill=needle_color)
+            self.needle_color = needle_color
+
+        self.canvas.itemconfigure(self.display_item, text=text)
+        self.displayed_text = text
+
+    def redraw_needle(self):
+        """Draw the last needle position and odometer again, e.g. after a resize"""
+        self.draw_needle(self.rpm, self.odometer)
@@ -0,0 +1,56 @@
+import math
+
+def smooth(value, target, elapsed, time_constant, snap):
+    """Move value toward target by exponential smoothing over elapsed seconds
+
+    Covers 1 - exp(-elapsed / time_constant) of the distance, so the
+    response depends on time only and not on how often it is called. Within
+    snap of the target the value lands on it.
+    """
+    difference = target - value
+    if abs(difference) <= snap:
+        return target
+    return value + difference * -math.expm1(-elapsed / time_constant)
+
+class StateInterpolator:
+    """Speed and RPM between the two most recent physics states.
+
+    Every frame pushes the latest published VehicleState with the frame
+    time. When a new tick arrives the previous one is kept, and sample()
+    moves from the previous to the newest state over the simulated time
+    between them, starting when the newest arrived. The needles so trail the
+    physics by one sampled state but move evenly whatever the physics rate,
+    the frame rate or the jitter between them.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.previous = None
+        self.current = None
+        self.arrived = 0.0
+
+    def push(self, state, now):
+        """Note the latest published state at frame time now"""
+        current = self.current
+        if current is not None and state.tick == current.tick:
+            return
+        self.previous = current
+        self.current = state
+        self.arrived = now
+
+    def sample(self, now):
+        """Interpolated (speed, rpm) at frame time now"""
+        previous, current = self.previous, self.current
+        if previous is None:
+            return current.speed, current.rpm
+        interval = current.time - previous.time
+        if interval <= 0:
+            # The simulation was reset in between
+            return current.speed, current.rpm
+        fraction = min(1.0, (now - self.arrived) / interval)
+        return (
+            previous.speed + (current.speed - previous.speed) * fraction,
+            previous.rpm + (current.rpm - previous.rpm) * fraction,
+        )
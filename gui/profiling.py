@@ -0,0 +1,143 @@
+import json
+import math
+import time
+from config import PROFILE_OVERLAY_INTERVAL
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in seconds.
+
+    Buckets grow geometrically from min_value, so recording is one log and
+    one increment and percentiles are accurate to about the growth factor.
+    """
+
+    def __init__(self, min_value=1e-6, max_value=10.0, growth=1.05):
+        self.min_value = min_value
+        self.log_growth = math.log(growth)
+        self.growth = growth
+        self.counts = [0] * (int(math.log(max_value / min_value) / self.log_growth) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds <= self.min_value:
+            index = 0
+        else:
+            index = min(len(self.counts) - 1,
+                        1 + int(math.log(seconds / self.min_value) / self.log_growth))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.max, self.min_value * self.growth ** index)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+class DashboardProfiler:
+    """Opt-in timing instrumentation for CarDashboard.
+
+    Keeps histograms of frame time, gauge and chart draw time, physics tick
+    time and the latency from an input callback to the first frame drawn
+    from a physics state that used the input. Frames and input callbacks run on
+    the Tk thread and ticks on the physics thread; each histogram and each
+    field has a single writer. The physics thread only replaces applied,
+    and the Tk thread keeps its own input_time and measured.
+    """
+
+    HISTOGRAMS = ('frame', 'speed_gauge', 'rpm_gauge', 'strip_chart', 'physics_tick', 'input_latency')
+
+    def __init__(self, overlay_interval=PROFILE_OVERLAY_INTERVAL):
+        self.histograms = {name: LatencyHistogram() for name in self.HISTOGRAMS}
+        self.overlay_interval = overlay_interval
+        self.frames = 0
+        self.input_time = None
+        self.applied = None
+        self.measured = None
+
+    def record(self, name, seconds):
+        self.histograms[name].record(seconds)
+
+    def input_event(self, timestamp=None):
+        """Note an input callback (Tk thread)"""
+        if self.input_time is None:
+            self.input_time = time.perf_counter() if timestamp is None else timestamp
+
+    def input_applied(self, tick, input_time):
+        """Note that a physics tick used inputs changed at input_time
+
+        input_time is the first_event of the InputBatch the tick took, the
+        same timestamp the Tk thread passed to input_event. Physics thread
+        only; the tuple is replaced whole so the Tk thread never sees half
+        of it.
+        """
+        self.applied = (tick, input_time)
+
+    def frame_drawn(self, state_tick, physics_running):
+        """Close the input latency measurement once a frame shows the input"""
+        now = time.perf_counter()
+        applied = self.applied
+        if applied is not None and applied is not self.measured and state_tick >= applied[0]:
+            self.record('input_latency', now - applied[1])
+            self.measured = applied
+            if self.input_time is not None and self.input_time <= applied[1]:
+                self.input_time = None
+        elif not physics_running and self.input_time is not None:
+            self.record('input_latency', now - self.input_time)
+            self.input_time = None
+        self.frames += 1
+
+    def _overlay_text(self, names):
+        lines = []
+        for name in names:
+            summary = self.histograms[name].summary()
+            lines.append(f"{name} p50 {summary['p50'] * 1000:.2f} p99 {summary['p99'] * 1000:.2f} ms")
+        return '\n'.join(lines)
+
+    def draw_overlay(self, speed_canvas, rpm_canvas):
+        """Show p50/p99 timings on the gauge canvases every overlay_interval frames"""
+        if self.frames % self.overlay_interval:
+            return
+        for canvas, names in (
+            (speed_canvas, ('frame', 'speed_gauge', 'input_latency')),
+            (rpm_canvas, ('physics_tick', 'rpm_gauge', 'strip_chart')),
+        ):
+            text = self._overlay_text(names)
+            if canvas.find_withtag("profile_overlay"):
+                canvas.itemconfigure("profile_overlay", text=text)
+            else:
+                canvas.create_text(
+                    4, 4, text=text, anchor='nw', fill='yellow',
+                    font=('Courier', 7), tags="profile_overlay"
+                )
+
+    def summary(self):
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def dump(self, path):
+        """Write the histogram summaries and bucket counts as JSON"""
+        data = {
+            name: dict(histogram.summary(), min_value=histogram.min_value,
+                       growth=histogram.growth, counts=histogram.counts)
+            for name, histogram in self.histograms.items()
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
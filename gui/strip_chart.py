@@ -0,0 +1,159 @@
+import math
+from collections import deque, namedtuple
+from config import PHYSICS_UPDATE_RATE, MAX_SPEED, MAX_RPM, STRIP_CHART_WINDOW, GUI_RESIZE_DEBOUNCE
+
+# One plotted telemetry column. Values from low to high span the trace's
+# lane (0 is the top lane); absolute plots the magnitude, e.g. of velocity.
+Trace = namedtuple('Trace', ['label', 'column', 'low', 'high', 'color', 'lane', 'absolute'])
+
+TRACES = (
+    Trace('km/h', 'velocity', 0, MAX_SPEED, 'deep sky blue', 0, True),
+    Trace('rpm', 'rpm', 0, MAX_RPM, 'orange', 0, False),
+    Trace('gas', 'gas', 0, 100, 'lime green', 1, False),
+    Trace('brake', 'brake', 0, 100, 'red', 1, False),
+    Trace('gear', 'gear', -1, 6, 'white', 1, False),
+)
+LANE_WEIGHTS = (2, 1)   # Share of the chart height taken by each lane
+LEGEND_WIDTH = 50       # Pixels on the left kept for the trace labels
+RING_MARGIN = 100       # Oldest ring rows left unread, the writer may be reusing them
+
+STRIP_TAG = 'strip_chart'
+
+class StripChart:
+    """Scrolling history of speed, RPM, gear and pedals on a Tk canvas.
+
+    The chart reads the rows of a TelemetryRing and min/max decimates them
+    to the pixel width: every pixel column covers a fixed number of ticks,
+    aligned to the ring's row numbers, and is drawn as a vertical stroke from
+    its lowest to its highest value. Completed columns are kept as pixel
+    coordinates, so a frame only folds the newly appended rows into the
+    newest column and, when something changed, sets the coordinates of one
+    polyline per trace. No canvas item is created after layout. The ring
+    must hold one row every dt seconds, so window spans window seconds, up
+    to the ring's size less RING_MARGIN rows: the oldest rows may be
+    overwritten by the physics thread while they are read.
+    """
+
+    def __init__(self, canvas, ring, window=STRIP_CHART_WINDOW, dt=PHYSICS_UPDATE_RATE):
+        self.canvas = canvas
+        self.ring = ring
+        self.window_rows = max(1, min(int(round(window / dt)), ring.size - RING_MARGIN))
+        self.resize_id = None
+        self.width = None
+        self.height = None
+        self.lines = []
+
+    def layout(self, width, height):
+        """Lay the chart out for width x height pixels and replot the history"""
+        self.width = width
+        self.height = height
+        columns = max(1, width - LEGEND_WIDTH)
+        self.right = width - 1
+        self.rows_per_column = max(1, math.ceil(self.window_rows / columns))
+
+        # Pixel transform per trace: y = offset - value * scale
+        lane_heights = [height * weight / sum(LANE_WEIGHTS) for weight in LANE_WEIGHTS]
+        lane_tops = [sum(lane_heights[:lane]) for lane in range(len(lane_heights))]
+        self.transforms = []
+        for trace in TRACES:
+            bottom = lane_tops[trace.lane] + lane_heights[trace.lane] - 2
+            scale = (lane_heights[trace.lane] - 4) / (trace.high - trace.low)
+            self.transforms.append((bottom + trace.low * scale, scale))
+
+        canvas = self.canvas
+        canvas.delete(STRIP_TAG)
+        for top in lane_tops[1:]:
+            canvas.create_line(0, top, width, top, fill='gray30', tags=STRIP_TAG)
+        label_y = {}
+        self.lines = []
+        for trace in TRACES:
+            y = label_y.get(trace.lane, lane_tops[trace.lane] + 8)
+            label_y[trace.lane] = y + 12
+            canvas.create_text(4, y, text=trace.label, anchor='w', fill=trace.color,
+                               font=('Arial', 8), tags=STRIP_TAG)
+            self.lines.append(canvas.create_line(
+                self.right, 0, self.right, 0, fill=trace.color, tags=STRIP_TAG
+            ))
+
+        self.closed = [deque(maxlen=columns - 1) for _ in TRACES]
+        self.closed_coords = [None] * len(TRACES)
+        self.current = [None] * len(TRACES)
+        self.drawn = [None] * len(TRACES)
+        self.column = None
+        self.seen = max(0, self.ring.appended - self.window_rows)
+        self.update()
+
+    def on_configure(self, event):
+        """<Configure> handler: lay out again once the canvas stops changing size"""
+        if self.resize_id is not None:
+            self.canvas.after_cancel(self.resize_id)
+        self.resize_id = self.canvas.after(
+            GUI_RESIZE_DEBOUNCE, self.resize, event.width, event.height
+        )
+
+    def resize(self, width, height):
+        """Lay out for the outer canvas size reported by <Configure>"""
+        self.resize_id = None
+        inset = 2 * (int(self.canvas.cget('highlightthickness')) + int(self.canvas.cget('borderwidth')))
+        width, height = max(1, width - inset), max(1, height - inset)
+        if (width, height) != (self.width, self.height):
+            self.layout(width, height)
+
+    def update(self):
+        """Plot the rows appended since the last update, returns True if drawn"""
+        if self.width is None:
+            return False
+        ring = self.ring
+        end = ring.appended
+        if end == self.seen:
+            return False
+        start = max(self.seen, end - self.window_rows)
+        self.seen = end
+
+        # Split the new rows into runs that fall into the same pixel column
+        per_column = self.rows_per_column
+        runs = []
+        row = start
+        while row < end:
+            column = row // per_column
+            stop = min(end, (column + 1) * per_column)
+            runs.append((column, row - start, stop - start))
+            row = stop
+
+        closed_any = False
+        for index, trace in enumerate(TRACES):
+            values = ring.rows(trace.column, start, end)
+            if trace.absolute:
+                values = [abs(value) for value in values]
+            current = self.current[index]
+            closed = self.closed[index]
+            offset, scale = self.transforms[index]
+            column = self.column
+            for run_column, first, last in runs:
+                run = values[first:last]
+                low, high = min(run), max(run)
+                if run_column == column:
+                    low, high = min(low, current[0]), max(high, current[1])
+                elif current is not None:
+                    closed.append((offset - current[1] * scale, offset - current[0] * scale))
+                    closed_any = True
+                column = run_column
+                current = (low, high)
+            self.current[index] = current
+        self.column = column
+
+        for index, trace in enumerate(TRACES):
+            if closed_any or self.closed_coords[index] is None:
+                coords = []
+                x = self.right - len(self.closed[index])
+                for top, bottom in self.closed[index]:
+                    coords += (x, top, x, bottom)
+                    x += 1
+                self.closed_coords[index] = coords
+            offset, scale = self.transforms[index]
+            low, high = self.current[index]
+            newest = (self.right, offset - high * scale, self.right, offset - low * scale)
+            if newest != self.drawn[index] or closed_any:
+                self.canvas.coords(self.lines[index], self.closed_coords[index] + list(newest))
+                self.drawn[index] = newest
+        return True
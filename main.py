@@ -1,9 +1,36 @@
-import tkinter as tk
-from gui.dashboard_gui import CarDashboard
+import argparse
+import sys
+from cli import COMMANDS
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        # Headless commands never load tkinter or the GUI modules
+        from cli import main as cli_main
+        return cli_main(argv)
+
+    parser = argparse.ArgumentParser(description="pyConsole car dashboard")
+    parser.add_argument('--connect', metavar='HOST:PORT',
+                        help="display a simulation server instead of running local physics")
+    parser.add_argument('--physics-process', action='store_true',
+                        help="run the physics in a separate process at PHYSICS_PROCESS_RATE")
+    args = parser.parse_args(argv)
+    remote = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(':')
+        remote = (host or 'localhost', int(port))
+
+    import tkinter as tk
+    from config import PHYSICS_PROCESS_ENABLED
+    from gui.dashboard_gui import CarDashboard
 
-def main():
     root = tk.Tk()
-    dashboard = CarDashboard(root)
+    try:
+        dashboard = CarDashboard(root, remote=remote,
+                                 physics_process=args.physics_process or PHYSICS_PROCESS_ENABLED)
+    except OSError as e:
+        root.destroy()
+        return f"pyConsole: cannot start the simulation: {e}"
     root.protocol("WM_DELETE_WINDOW", dashboard.on_closing)
     try:
         root.mainloop()
@@ -11,4 +38,4 @@ def main():
         dashboard.on_closing()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
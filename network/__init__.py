@@ -0,0 +1 @@
+# Network package initialization
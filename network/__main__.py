@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+from config import SERVER_HOST, SERVER_PORT, SERVER_PUBLISH_RATE
+from network.server import SimulationServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pyConsole simulation server")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--rate', type=float, default=SERVER_PUBLISH_RATE,
+                        help="state updates per second sent to each client")
+    args = parser.parse_args()
+    server = SimulationServer(args.host, args.port, args.rate)
+    print(f"pyConsole simulation server on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
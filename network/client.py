@@ -0,0 +1,110 @@
+import socket
+import threading
+import time
+from config import SERVER_HOST, SERVER_PORT
+from physics.snapshot import SnapshotBuffer
+from network.protocol import (
+    HEADER, MSG_STATE, MSG_CONTROLS, MSG_RESET, frame, decode_state, decode_controls,
+    encode_inputs, encode_safety
+)
+
+class SimulationClient:
+    """Blocking client for SimulationServer, usable from a Tk application.
+
+    A background thread decodes state deltas into complete VehicleState
+    snapshots and publishes them through state_buffer, the same interface
+    the dashboard uses for its local physics thread. Only the inputs and
+    safety systems that differ from what the client last sent or was shown
+    go to the server; the shared controls it sends back are published
+    through controls_buffer and picked up with take_controls(). Controls
+    that predate this client's latest change are skipped, so a display
+    never snaps its own slider back while it is being dragged.
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.state_buffer = SnapshotBuffer()
+        self.controls_buffer = SnapshotBuffer()
+        self.controls_sequence = 0
+        self.sent_inputs = None
+        self.sent_mask = 0
+        self.sent_changes = 0
+        self.connected = True
+        self.reader_thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader_thread.start()
+
+    def _read_exactly(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _read_loop(self):
+        state = None
+        try:
+            while True:
+                length, message_type = HEADER.unpack(self._read_exactly(HEADER.size))
+                payload = self._read_exactly(length) if length else b''
+                if message_type == MSG_STATE:
+                    state = decode_state(payload, state)
+                    self.state_buffer.publish(state)
+                elif message_type == MSG_CONTROLS:
+                    self.controls_buffer.publish(decode_controls(payload))
+        except OSError:
+            self.connected = False
+
+    def send_inputs(self, inputs):
+        """Send the fields of inputs this client changed"""
+        message = encode_inputs(inputs, self.sent_inputs)
+        if message is not None:
+            self.sock.sendall(message)
+            self.sent_changes += 1
+        self.sent_inputs = inputs
+
+    def send_safety(self, safety_systems):
+        """Send the safety systems this client switched"""
+        changed = safety_systems.mask ^ self.sent_mask
+        if changed:
+            self.sock.sendall(encode_safety(changed, safety_systems.mask))
+            self.sent_changes += 1
+        self.sent_mask = safety_systems.mask
+
+    def take_controls(self):
+        """(inputs, safety mask) set by any client since the last call, or None
+
+        Must be called from the thread that sends, as what the server shows
+        becomes the base the next changes are measured against.
+        """
+        sequence = self.controls_buffer.sequence
+        if sequence == self.controls_sequence:
+            return None
+        self.controls_sequence = sequence
+        inputs, mask, received = self.controls_buffer.latest
+        if received != self.sent_changes:
+            # The server has not seen this client's latest change yet
+            return None
+        self.sent_inputs, self.sent_mask = inputs, mask
+        return inputs, mask
+
+    def send_reset(self):
+        self.sock.sendall(frame(MSG_RESET))
+
+    def wait_for_state(self, timeout=5.0):
+        """Block until the first state has arrived"""
+        deadline = time.monotonic() + timeout
+        while self.state_buffer.latest is None and self.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.state_buffer.latest
+
+    def close(self):
+        self.connected = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
@@ -0,0 +1,120 @@
+import struct
+from physics.simulator import VehicleInputs, VehicleState
+
+# Every message is a little-endian header of payload length (u16) and
+# message type (u8) followed by the payload.
+HEADER = struct.Struct('<HB')
+
+MSG_STATE = 1     # server -> client: state fields that changed, see encode_state
+MSG_INPUTS = 2    # client -> server: VehicleInputs fields the client changed
+MSG_SAFETY = 3    # client -> server: safety systems the client switched, see encode_safety
+MSG_RESET = 4     # client -> server: reset the vehicle, no payload
+MSG_CONTROLS = 5  # server -> client: the shared inputs and safety mask, see encode_controls
+
+# A safety message is a u8 mask of the systems changed and a u8 of their
+# new states, so clients never overwrite switches they did not touch.
+_SAFETY = struct.Struct('<BB')
+SAFETY_SIZE = _SAFETY.size
+
+# The complete inputs and safety mask everyone drives with, and how many
+# inputs and safety messages the server has taken from the receiving client
+_CONTROLS = struct.Struct('<ddddb??BI')
+
+# VehicleState and VehicleInputs fields and their wire formats. State and
+# input messages start with a u8 mask of the fields that follow, in this
+# order.
+_STATE_FORMATS = ('I', 'd', 'b', 'f', 'f', 'f', 'f', 'd')
+_INPUT_FORMATS = ('d', 'd', 'd', 'd', 'b', '?', '?')
+_state_structs = {}
+_input_structs = {}
+
+def frame(message_type, payload=b''):
+    """Prefix a payload with the message header"""
+    return HEADER.pack(len(payload), message_type) + payload
+
+def _delta_struct(formats, structs, mask):
+    compiled = structs.get(mask)
+    if compiled is None:
+        codes = ''.join(code for bit, code in enumerate(formats) if mask & (1 << bit))
+        compiled = structs[mask] = struct.Struct('<B' + codes)
+    return compiled
+
+def _state_struct(mask):
+    return _delta_struct(_STATE_FORMATS, _state_structs, mask)
+
+def _input_struct(mask):
+    return _delta_struct(_INPUT_FORMATS, _input_structs, mask)
+
+def encode_state(state, previous=None):
+    """Encode the fields of state that differ from previous as a state frame
+
+    Returns None when nothing changed.
+    """
+    mask = 0
+    values = []
+    for bit, value in enumerate(state):
+        if previous is None or previous[bit] != value:
+            mask |= 1 << bit
+            values.append(value)
+    if not mask:
+        return None
+    return frame(MSG_STATE, _state_struct(mask).pack(mask, *values))
+
+def decode_state(payload, previous=None):
+    """Apply a state payload on top of previous and return the new VehicleState"""
+    mask = payload[0]
+    values = iter(_state_struct(mask).unpack(payload)[1:])
+    fields = []
+    for bit in range(len(VehicleState._fields)):
+        if mask & (1 << bit):
+            fields.append(next(values))
+        elif previous is not None:
+            fields.append(previous[bit])
+        else:
+            fields.append(0)
+    return VehicleState(*fields)
+
+def encode_inputs(inputs, previous=None):
+    """Encode the fields of inputs that differ from previous as an inputs frame
+
+    Returns None when nothing changed.
+    """
+    mask = 0
+    values = []
+    for bit, value in enumerate(inputs):
+        if previous is None or previous[bit] != value:
+            mask |= 1 << bit
+            values.append(value)
+    if not mask:
+        return None
+    return frame(MSG_INPUTS, _input_struct(mask).pack(mask, *values))
+
+def decode_inputs(payload, inputs):
+    """Apply an inputs payload on top of inputs, None if it is malformed"""
+    if not payload or payload[0] >> len(_INPUT_FORMATS):
+        return None
+    mask = payload[0]
+    compiled = _input_struct(mask)
+    if len(payload) != compiled.size:
+        return None
+    values = iter(compiled.unpack(payload)[1:])
+    return VehicleInputs(*(
+        next(values) if mask & (1 << bit) else value for bit, value in enumerate(inputs)
+    ))
+
+def encode_safety(changed, mask):
+    """Frame switching the systems in changed to their states in mask"""
+    return frame(MSG_SAFETY, _SAFETY.pack(changed, mask & changed))
+
+def apply_safety(payload, mask):
+    """Apply a safety payload to a safety mask"""
+    changed, enabled = _SAFETY.unpack(payload)
+    return (mask & ~changed) | enabled
+
+def encode_controls(inputs, mask, received):
+    return frame(MSG_CONTROLS, _CONTROLS.pack(*inputs, mask, received))
+
+def decode_controls(payload):
+    """Return the (VehicleInputs, safety mask, messages received) of a controls payload"""
+    *fields, mask, received = _CONTROLS.unpack(payload)
+    return VehicleInputs(*fields), mask, received
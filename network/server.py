@@ -0,0 +1,167 @@
+import asyncio
+import threading
+from config import SERVER_HOST, SERVER_PORT, SERVER_PUBLISH_RATE
+from physics.simulator import VehicleSimulator, VehicleInputs
+from physics.snapshot import SnapshotBuffer
+from physics.scheduler import FixedStepScheduler
+from network.protocol import (
+    HEADER, MSG_INPUTS, MSG_SAFETY, MSG_RESET, SAFETY_SIZE, decode_inputs, apply_safety,
+    encode_state, encode_controls
+)
+
+class ClientConnection:
+    """One connected client with single-slot outboxes.
+
+    The publisher only ever replaces the pending state and controls, so a
+    client that reads slowly receives fewer, coalesced updates and never
+    holds up the simulation or the other clients.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = None
+        self.pending_controls = None
+        self.received = 0
+        self.sent = None
+        self.ready = asyncio.Event()
+
+    def offer(self, state):
+        self.pending = state
+        self.ready.set()
+
+    def offer_controls(self, inputs, mask):
+        self.pending_controls = (inputs, mask)
+        self.ready.set()
+
+    async def send_loop(self):
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                controls, self.pending_controls = self.pending_controls, None
+                if controls is not None:
+                    self.writer.write(encode_controls(*controls, self.received))
+                state, self.pending = self.pending, None
+                message = encode_state(state, self.sent) if state is not None else None
+                if message is not None:
+                    self.writer.write(message)
+                    self.sent = state
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+
+class SimulationServer:
+    """Headless simulation shared by any number of local clients.
+
+    Physics runs on its own thread through FixedStepScheduler, exactly as in
+    the dashboard. The asyncio side applies input, safety and reset commands
+    from clients and publishes state deltas to every client at publish_rate.
+    Clients send only the inputs and safety systems they changed, and every
+    change is sent back to all clients as the shared controls, so any
+    number of displays can drive the one vehicle without overwriting each
+    other's settings.
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, publish_rate=SERVER_PUBLISH_RATE,
+                 simulator=None):
+        self.host = host
+        self.port = port
+        self.publish_interval = 1.0 / publish_rate
+        self.simulator = simulator if simulator is not None else VehicleSimulator()
+        self.inputs = VehicleInputs(engine_on=False, running=False)
+        self.state_buffer = SnapshotBuffer(self.simulator.snapshot())
+        self.scheduler = FixedStepScheduler(self._tick)
+        self.stop_event = threading.Event()
+        self.reset_requested = False
+        self.clients = set()
+        self.server = None
+
+    def _tick(self, dt):
+        if self.reset_requested:
+            self.reset_requested = False
+            self.simulator.reset()
+        self.simulator.step(self.inputs, dt)
+        self.state_buffer.publish(self.simulator.snapshot())
+
+    async def _handle_client(self, reader, writer):
+        client = ClientConnection(reader, writer)
+        client.offer_controls(self.inputs, self.simulator.safety_systems.mask)
+        client.offer(self.state_buffer.latest)
+        self.clients.add(client)
+        sender = asyncio.create_task(client.send_loop())
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                length, message_type = HEADER.unpack(header)
+                payload = await reader.readexactly(length) if length else b''
+                # Malformed messages are dropped like unknown ones, but
+                # still acknowledged
+                if message_type == MSG_INPUTS:
+                    client.received += 1
+                    inputs = decode_inputs(payload, self.inputs)
+                    changed = inputs is not None and inputs != self.inputs
+                    if changed:
+                        self.inputs = inputs
+                    self._controls_changed(client, changed)
+                elif message_type == MSG_SAFETY:
+                    client.received += 1
+                    safety = self.simulator.safety_systems
+                    mask = apply_safety(payload, safety.mask) if length == SAFETY_SIZE else safety.mask
+                    changed = mask != safety.mask
+                    if changed:
+                        safety.mask = mask
+                    self._controls_changed(client, changed)
+                elif message_type == MSG_RESET:
+                    self.reset_requested = True
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    def _controls_changed(self, sender, changed):
+        """Send the controls after a client's message, to everyone if it changed them
+
+        The sender always gets them, acknowledging its message.
+        """
+        mask = self.simulator.safety_systems.mask
+        for client in self.clients if changed else (sender,):
+            client.offer_controls(self.inputs, mask)
+
+    async def _publish_loop(self):
+        sequence = None
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            if self.state_buffer.sequence == sequence:
+                continue
+            sequence = self.state_buffer.sequence
+            state = self.state_buffer.latest
+            for client in self.clients:
+                client.offer(state)
+
+    async def start(self):
+        """Start the physics thread, the listener and the publisher"""
+        self.stop_event.clear()
+        self.physics_thread = threading.Thread(
+            target=self.scheduler.run, args=(self.stop_event,), daemon=True
+        )
+        self.physics_thread.start()
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.publisher = asyncio.create_task(self._publish_loop())
+
+    async def stop(self):
+        self.publisher.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+        self.stop_event.set()
+        self.physics_thread.join(timeout=1.0)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
@@ -0,0 +1,105 @@
+from physics.profile import DEFAULT_PROFILE
+
+# Acceleration factor per forward gear; other gears use the default
+ACCELERATION_FACTORS = {1: 1.2, 2: 0.9, 3: 0.7, 4: 0.5, 5: 0.4, 6: 0.35}
+DEFAULT_ACCELERATION_FACTOR = 0.5
+
+# Batched lookups index arrays with gear + GEAR_INDEX_OFFSET, so R=-1 -> 0,
+# N=0 -> 1 and gears 1-6 -> 2-7
+GEAR_INDEX_OFFSET = 1
+
+class DrivetrainTable:
+    """Per-gear drivetrain coefficients precomputed from a VehicleProfile.
+
+    Engine RPM is proportional to road speed in every gear, so each gear
+    reduces to one km/h -> RPM coefficient combining the tire circumference,
+    gear ratio and final drive. Acceleration factors and redline speeds are
+    tabulated alongside. Neutral has no coefficient and always idles.
+    """
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+        self.idle_rpm = profile.idle_rpm
+        speed_to_wheel_rpm = (1000 / 3600) / profile.tire_circumference * 60
+        ratios = {gear: ratio for gear, ratio in enumerate(profile.gear_ratios, start=1)}
+        ratios[-1] = profile.reverse_gear_ratio
+        self.gears = sorted(ratios)
+
+        self.rpm_per_kmh = {
+            gear: speed_to_wheel_rpm * ratio * profile.final_drive_ratio
+            for gear, ratio in ratios.items()
+        }
+        # Gears outside the gearbox keep the old fallback ratio of 1.0
+        self.default_rpm_per_kmh = speed_to_wheel_rpm * profile.final_drive_ratio
+        self.acceleration_factors = {
+            gear: ACCELERATION_FACTORS.get(gear, DEFAULT_ACCELERATION_FACTOR) for gear in self.gears
+        }
+        self.redline_speeds = {
+            gear: profile.max_rpm / coefficient for gear, coefficient in self.rpm_per_kmh.items()
+        }
+        self._arrays = None
+
+    def rpm(self, speed, gear):
+        """Engine RPM at a road speed in km/h"""
+        if speed <= 0.1:
+            return self.idle_rpm
+        coefficient = self.rpm_per_kmh.get(gear)
+        if coefficient is None:
+            if gear <= 0:
+                return self.idle_rpm
+            coefficient = self.default_rpm_per_kmh
+        return max(self.idle_rpm, speed * coefficient)
+
+    def acceleration_factor(self, gear):
+        return self.acceleration_factors.get(gear, DEFAULT_ACCELERATION_FACTOR)
+
+    def redline_speed(self, gear):
+        """Road speed in km/h at which the gear reaches max_rpm, None in neutral"""
+        return self.redline_speeds.get(gear)
+
+    def arrays(self):
+        """NumPy lookup tables indexed by gear + GEAR_INDEX_OFFSET"""
+        if self._arrays is None:
+            import numpy as np
+            size = max(self.gears) + GEAR_INDEX_OFFSET + 1
+            rpm_per_kmh = np.zeros(size)
+            acceleration_factors = np.full(size, DEFAULT_ACCELERATION_FACTOR)
+            for gear in self.gears:
+                rpm_per_kmh[gear + GEAR_INDEX_OFFSET] = self.rpm_per_kmh[gear]
+                acceleration_factors[gear + GEAR_INDEX_OFFSET] = self.acceleration_factors[gear]
+            self._arrays = (rpm_per_kmh, acceleration_factors)
+        return self._arrays
+
+    def _gear_index(self, gears):
+        """Array index of each gear and whether the gearbox has that gear"""
+        import numpy as np
+        index = np.asarray(gears) + GEAR_INDEX_OFFSET
+        valid = (index >= 0) & (index <= max(self.gears) + GEAR_INDEX_OFFSET)
+        return np.where(valid, index, GEAR_INDEX_OFFSET), valid
+
+    def rpm_batch(self, speeds, gears):
+        """Engine RPM for arrays of road speeds and gears"""
+        import numpy as np
+        rpm_per_kmh, _ = self.arrays()
+        gears = np.asarray(gears)
+        speeds = np.asarray(speeds)
+        index, valid = self._gear_index(gears)
+        coefficients = np.where(
+            valid, rpm_per_kmh[index], np.where(gears > 0, self.default_rpm_per_kmh, 0.0)
+        )
+        rpm = np.maximum(self.idle_rpm, speeds * coefficients)
+        return np.where((coefficients > 0) & (speeds > 0.1), rpm, self.idle_rpm)
+
+    def acceleration_factor_batch(self, gears):
+        _, acceleration_factors = self.arrays()
+        index, _ = self._gear_index(gears)
+        return acceleration_factors[index]
+
+_tables = {}
+
+def get_drivetrain(profile=DEFAULT_PROFILE):
+    """Return the shared DrivetrainTable for a profile, building it once"""
+    table = _tables.get(profile)
+    if table is None:
+        table = _tables[profile] = DrivetrainTable(profile)
+    return table
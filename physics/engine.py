@@ -1,8 +1,15 @@
 import time
-from config import *
+from physics.profile import DEFAULT_PROFILE
+from physics.drivetrain import get_drivetrain
 
 class EnginePhysics:
-    def __init__(self):
+    __slots__ = ('profile', 'drivetrain', 'torque_model', 'velocity', 'acceleration',
+                 'odometer', 'last_time')
+
+    def __init__(self, profile=DEFAULT_PROFILE, torque_model=None):
+        self.profile = profile
+        self.drivetrain = get_drivetrain(profile)
+        self.torque_model = torque_model
         self.velocity = 0.0
         self.acceleration = 0.0
         self.odometer = 0.0
@@ -10,27 +17,30 @@ class EnginePhysics:
         
     def calculate_rpm(self, speed, gear):
         """Calculate realistic RPM based on speed and gear"""
-        if gear > 0 and speed > 0.1:
-            speed_mps = speed * (1000 / 3600)
-            wheel_rps = speed_mps / TIRE_CIRCUMFERENCE
-            wheel_rpm = wheel_rps * 60
-            gear_ratio = GEAR_RATIOS.get(gear, 1.0)
-            return max(IDLE_RPM, wheel_rpm * gear_ratio * FINAL_DRIVE_RATIO)
-        return IDLE_RPM
+        return self.drivetrain.rpm(speed, gear)
     
-    def calculate_acceleration(self, gas_factor, gear, clutch_factor):
-        """Calculate realistic acceleration based on inputs"""
+    def calculate_acceleration(self, gas_factor, gear, clutch_factor, speed=0.0):
+        """Calculate realistic acceleration based on inputs
+
+        With a TorqueModel the acceleration depends on the road speed too,
+        otherwise it is a fixed factor per gear.
+        """
         if gas_factor > 0 and clutch_factor < 70:
-            gear_accel_factors = {1: 1.2, 2: 0.9, 3: 0.7, 4: 0.5, 5: 0.4, 6: 0.35}
-            accel_factor = gear_accel_factors.get(gear, 0.5)
-            return gas_factor * accel_factor * 1.5
+            if self.torque_model is not None:
+                return self.torque_model.acceleration(speed, gear, gas_factor)
+            return gas_factor * self.drivetrain.acceleration_factor(gear) * 1.5
         return 0
     
-    def update_odometer(self, speed):
-        """Update odometer based on current speed"""
-        current_time = time.time()
-        time_diff = current_time - self.last_time
+    def update_odometer(self, speed, time_diff=None):
+        """Update odometer based on current speed
+
+        When time_diff is given it is used as the elapsed time in seconds,
+        otherwise the wall clock time since the last update is used.
+        """
+        if time_diff is None:
+            current_time = time.time()
+            time_diff = current_time - self.last_time
+            self.last_time = current_time
         if time_diff > 0:
             distance_traveled = (speed / 3600) * time_diff
             self.odometer += distance_traveled
-            self.last_time = current_time
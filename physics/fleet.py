@@ -0,0 +1,195 @@
+import numpy as np
+from config import PHYSICS_UPDATE_RATE, TORQUE_MODEL_ENABLED
+from physics.profile import DEFAULT_PROFILE
+from physics.drivetrain import get_drivetrain
+from physics.safety_systems import SPD, compile_batch_pipeline
+from physics.torque import get_torque_model
+from physics.vehicle_state import VehicleStateArray, FLAG_ENGINE_ON, FLAG_RUNNING, SAFETY_FLAG_SHIFT
+
+class FleetSimulator:
+    """Vectorized VehicleSimulator stepping many vehicles per call.
+
+    Vehicle state and safety-system settings are held as NumPy arrays, one
+    element per vehicle. The branches of VehicleSimulator.step are evaluated
+    for the whole fleet with masked array operations. Each vehicle's enabled
+    safety systems are a SafetySystems bitmask in safety_mask; change it with
+    set_safety so the per-mask vehicle groups are rebuilt.
+    """
+
+    def __init__(self, size, profile=DEFAULT_PROFILE, torque=TORQUE_MODEL_ENABLED):
+        self.size = size
+        self.profile = profile
+        self.drivetrain = get_drivetrain(profile)
+        self.torque_model = get_torque_model(profile) if torque else None
+        self.velocity = np.zeros(size)
+        self.acceleration = np.zeros(size)
+        self.odometer = np.zeros(size)
+        self.target_rpm = np.zeros(size)
+        self.safety_mask = np.zeros(size, dtype=np.uint8)
+        # Gear and switches of the last step, for pack_states
+        self.gear = np.ones(size, dtype=np.int64)
+        self.engine_on = np.zeros(size, dtype=bool)
+        self.running = np.zeros(size, dtype=bool)
+        self._safety_groups = None
+        self.time = 0.0
+        self.ticks = 0
+
+    @property
+    def speed(self):
+        """Current vehicle speeds in km/h (always positive)"""
+        return np.abs(self.velocity)
+
+    def set_safety(self, mask, index=slice(None)):
+        """Set the enabled-system mask of the vehicles selected by index"""
+        self.safety_mask[index] = mask
+        self._safety_groups = None
+
+    def _groups(self):
+        """(batch pipeline, vehicle indices) per distinct mask, None for all"""
+        if self._safety_groups is None:
+            masks = np.unique(self.safety_mask)
+            if len(masks) == 1:
+                groups = [(compile_batch_pipeline(int(masks[0]), self.profile), None)]
+            else:
+                groups = [
+                    (compile_batch_pipeline(int(mask), self.profile),
+                     np.flatnonzero(self.safety_mask == mask))
+                    for mask in masks if mask
+                ]
+            self._safety_groups = groups
+        return self._safety_groups
+
+    def reset(self):
+        """Reset every vehicle to standstill"""
+        self.velocity[:] = 0.0
+        self.acceleration[:] = 0.0
+        self.odometer[:] = 0.0
+        self.target_rpm[:] = 0.0
+        self.time = 0.0
+        self.ticks = 0
+
+    def step(self, inputs, dt=PHYSICS_UPDATE_RATE):
+        """Advance every vehicle by dt seconds
+
+        inputs is a VehicleInputs whose fields are arrays of length size or
+        scalars shared by the whole fleet.
+        """
+        size = self.size
+        profile = self.profile
+        idle_rpm = profile.idle_rpm
+        scale = dt / PHYSICS_UPDATE_RATE
+        velocity = self.velocity
+        speed = np.abs(velocity)
+
+        gear = np.broadcast_to(np.asarray(inputs.gear, dtype=np.int64), size)
+        engine_on = np.broadcast_to(np.asarray(inputs.engine_on, dtype=bool), size)
+        running = np.broadcast_to(np.asarray(inputs.running, dtype=bool), size)
+        gas_factor = np.broadcast_to(np.asarray(inputs.gas, dtype=float) / 100.0, size)
+        brake_factor = np.broadcast_to(np.asarray(inputs.brake, dtype=float) / 100.0, size)
+        clutch_factor = np.broadcast_to(np.asarray(inputs.clutch, dtype=float) / 100.0, size)
+        steering_angle = np.broadcast_to(np.asarray(inputs.steering_angle, dtype=float), size)
+
+        self.gear, self.engine_on, self.running = gear, engine_on, running
+        active = engine_on & running
+        forward = active & (gear > 0)
+        reverse = active & (gear == -1)
+        neutral = active & ~forward & ~reverse
+
+        # Apply safety systems, one pipeline per group of vehicles sharing a mask
+        groups = self._groups()
+        if len(groups) == 1 and groups[0][1] is None:
+            brake_factor, gas_factor = groups[0][0](brake_factor, gas_factor, steering_angle, speed)
+        else:
+            brake_factor = brake_factor.copy()
+            gas_factor = gas_factor.copy()
+            for pipeline, index in groups:
+                brake_factor[index], gas_factor[index] = pipeline(
+                    brake_factor[index], gas_factor[index], steering_angle[index], speed[index]
+                )
+
+        # Engine RPM
+        rpm_ceiling = np.where(forward, 3500, np.where(reverse, 2500, 4000))
+        rpm = np.where(gas_factor > 0, idle_rpm + gas_factor * (rpm_ceiling - idle_rpm), idle_rpm)
+        rpm = np.where(
+            (forward | reverse) & (speed > 0.1), self.drivetrain.rpm_batch(speed, gear), rpm
+        )
+        rpm = np.where(active, rpm, np.where(engine_on, idle_rpm, 0))
+        self.target_rpm = rpm
+
+        driving = (gas_factor > 0) & (clutch_factor < 70)
+
+        # Forward gear
+        if self.torque_model is not None:
+            acceleration = self.torque_model.acceleration_batch(speed, gear, gas_factor)
+        else:
+            acceleration = gas_factor * self.drivetrain.acceleration_factor_batch(gear) * 1.5
+        self.acceleration = np.where(
+            forward | neutral, np.where(forward & driving, acceleration, 0.0), self.acceleration
+        )
+        velocity = np.where(
+            forward & driving & (speed < profile.max_speed), velocity + acceleration * scale, velocity
+        )
+        velocity = np.where(
+            forward & (brake_factor > 0),
+            np.maximum(0, velocity - brake_factor * 8 * scale), velocity
+        )
+        velocity = np.where(
+            forward & (gas_factor == 0) & (brake_factor == 0),
+            np.maximum(0, velocity - (0.5 + speed * 0.02) * scale), velocity
+        )
+
+        # Reverse gear
+        if self.torque_model is not None:
+            backwards = np.minimum(0, velocity - acceleration * scale)
+        else:
+            backwards = velocity - gas_factor * scale
+        velocity = np.where(reverse & driving & (np.abs(velocity) < 40), backwards, velocity)
+        velocity = np.where(
+            reverse & (brake_factor > 0) & (velocity < 0),
+            np.minimum(0, velocity + brake_factor * 6 * scale), velocity
+        )
+
+        # Neutral gear, and coasting with the simulation stopped
+        coasting = neutral | (engine_on & ~running)
+        velocity = np.where(
+            coasting, np.maximum(0, velocity - (1.0 + speed * 0.03) * scale), velocity
+        )
+
+        # Engine off
+        velocity = np.where(~engine_on, np.maximum(0, velocity - 2.0 * scale), velocity)
+
+        # Apply speed limiter
+        velocity = np.where(
+            active & ((self.safety_mask & SPD) != 0) & (velocity > profile.spd_max_speed),
+            profile.spd_max_speed, velocity
+        )
+        self.velocity = velocity
+
+        # Update odometer
+        self.odometer = np.where(active, self.odometer + (speed / 3600) * dt, self.odometer)
+
+        self.time += dt
+        self.ticks += 1
+
+    def pack_states(self, states=None):
+        """Copy every vehicle into a VehicleStateArray, creating one if not given"""
+        if states is None:
+            states = VehicleStateArray(self.size)
+        records = states.records()
+        records['tick'] = self.ticks
+        records['time'] = self.time
+        records['velocity'] = self.velocity
+        records['acceleration'] = self.acceleration
+        records['rpm'] = self.target_rpm
+        records['odometer'] = self.odometer
+        records['gear'] = self.gear
+        records['flags'] = (
+            np.where(self.engine_on, FLAG_ENGINE_ON, 0) | np.where(self.running, FLAG_RUNNING, 0)
+            | (self.safety_mask.astype(np.intp) << SAFETY_FLAG_SHIFT)
+        )
+        return states
+
+    def run(self, inputs, duration, dt=PHYSICS_UPDATE_RATE):
+        """Run with constant inputs for duration seconds, as fast as possible"""
+        for _ in range(int(round(duration / dt))):
+            self.step(inputs, dt)
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import namedtuple
+
+# Inputs taken by one physics tick. first_event and last_event are the
+# clock times of the oldest and newest input event merged into inputs, and
+# events is how many there were; both times are None when nothing changed.
+InputBatch = namedtuple('InputBatch', ['inputs', 'first_event', 'last_event', 'events'])
+
+# Fields posted as raw widget values (Tk scales pass strings), parsed once
+# per batch instead of once per event
+_PARSERS = {
+    'gas': float,
+    'brake': float,
+    'clutch': float,
+    'steering_angle': float,
+}
+
+class InputCoalescer:
+    """Latest-value-wins input buffer between event sources and the physics.
+
+    Slider callbacks and other input sources post field changes as they
+    arrive; posting only stores the raw value, so a burst of motion events
+    costs a dictionary write each. The consumer takes everything pending once
+    per tick as a single VehicleInputs snapshot, keeping just the newest value
+    of every field. Posting and taking may happen on different threads, but
+    there must be only one consumer. events / batches is the number of
+    events each take coalesced on average.
+    """
+
+    def __init__(self, initial, clock=time.perf_counter):
+        self.clock = clock
+        self.current = initial
+        self.events = 0
+        self.batches = 0
+        self._pending = {}
+        self._pending_events = 0
+        self._first_event = None
+        self._last_event = None
+        self._lock = threading.Lock()
+        self._idle = InputBatch(initial, None, None, 0)
+
+    def post(self, field, value):
+        """Record a new value for one input field
+
+        Returns the event time for the first event since the last take and
+        None otherwise, so the caller can measure the latency of each batch
+        from its oldest event.
+        """
+        now = self.clock()
+        with self._lock:
+            first = self._first_event is None
+            if first:
+                self._first_event = now
+            self._last_event = now
+            self._pending[field] = value
+            self._pending_events += 1
+        return now if first else None
+
+    def update(self, **changes):
+        """Record new values for several input fields as one event"""
+        now = self.clock()
+        with self._lock:
+            first = self._first_event is None
+            if first:
+                self._first_event = now
+            self._last_event = now
+            self._pending.update(changes)
+            self._pending_events += 1
+        return now if first else None
+
+    def replace(self, inputs):
+        """Make inputs the current snapshot, keeping the events still pending"""
+        with self._lock:
+            self.current = inputs
+            self._idle = InputBatch(inputs, None, None, 0)
+
+    @property
+    def pending(self):
+        """True if events are waiting for the next take"""
+        return self._first_event is not None
+
+    def take(self):
+        """Merge the pending events into the inputs and return an InputBatch"""
+        with self._lock:
+            if self._first_event is None:
+                return self._idle
+            pending, self._pending = self._pending, {}
+            first_event, self._first_event = self._first_event, None
+            last_event = self._last_event
+            events, self._pending_events = self._pending_events, 0
+
+        for field, parse in _PARSERS.items():
+            if field in pending:
+                pending[field] = parse(pending[field])
+        inputs = self.current = self.current._replace(**pending)
+        self._idle = InputBatch(inputs, None, None, 0)
+        self.events += events
+        self.batches += 1
+        return InputBatch(inputs, first_event, last_event, events)
@@ -0,0 +1,233 @@
+import atexit
+import os
+import struct
+import time
+from config import PHYSICS_PROCESS_RATE, TORQUE_MODEL_ENABLED
+from physics.profile import DEFAULT_PROFILE
+from physics.simulator import VehicleSimulator, VehicleInputs
+from physics.vehicle_state import STATE_FORMAT, state_values, state_from_values, pack_state_flags
+
+# Layout of the shared segment. Each block is a seqlock: a sequence number
+# followed by a struct payload, with a single writer. The state block holds
+# a packed vehicle state (physics.vehicle_state) and is
+# written by the physics process, the input block by the dashboard and the
+# control byte only by the dashboard. Blocks sit on separate cache lines.
+INPUT_FORMAT = '<ddddb??BQ'  # VehicleInputs fields, safety mask, reset count
+CACHE_LINE = 64
+
+_SEQUENCE = struct.Struct('<Q')
+_STOP = struct.Struct('<B')
+
+def _block_end(offset, payload_format):
+    """First cache-line aligned offset after a seqlock block"""
+    end = offset + _SEQUENCE.size + struct.calcsize(payload_format)
+    return -(-end // CACHE_LINE) * CACHE_LINE
+
+STATE_OFFSET = 0
+INPUT_OFFSET = _block_end(STATE_OFFSET, STATE_FORMAT)
+CONTROL_OFFSET = _block_end(INPUT_OFFSET, INPUT_FORMAT)
+SEGMENT_SIZE = CONTROL_OFFSET + CACHE_LINE
+
+class SeqlockBlock:
+    """Single-writer seqlock over a struct in a shared buffer.
+
+    The writer makes the sequence odd, writes the payload and makes it even
+    again; a reader retries while the sequence is odd or changed during its
+    read. Neither side ever blocks the other.
+    """
+
+    def __init__(self, buffer, offset, payload_format):
+        self.buffer = buffer
+        self.offset = offset
+        self.payload_offset = offset + _SEQUENCE.size
+        self.payload = struct.Struct(payload_format)
+
+    @property
+    def sequence(self):
+        return _SEQUENCE.unpack_from(self.buffer, self.offset)[0]
+
+    def write(self, *values):
+        sequence = self.sequence
+        _SEQUENCE.pack_into(self.buffer, self.offset, sequence + 1)
+        self.payload.pack_into(self.buffer, self.payload_offset, *values)
+        _SEQUENCE.pack_into(self.buffer, self.offset, sequence + 2)
+
+    def read(self):
+        """Return (sequence, values) of a consistent write"""
+        buffer, offset = self.buffer, self.offset
+        while True:
+            before = _SEQUENCE.unpack_from(buffer, offset)[0]
+            if before & 1:
+                time.sleep(0)
+                continue
+            values = self.payload.unpack_from(buffer, self.payload_offset)
+            if _SEQUENCE.unpack_from(buffer, offset)[0] == before:
+                return before, values
+
+class SharedStateBuffer:
+    """SnapshotBuffer over the state block of a shared segment
+
+    latest only unpacks the block when the physics process published since
+    the last read, so sampling it every frame is nearly free.
+    """
+
+    def __init__(self, buffer):
+        self.block = SeqlockBlock(buffer, STATE_OFFSET, STATE_FORMAT)
+        self.sequence = 0
+        self._latest = None
+
+    def publish(self, state, flags=0):
+        self.block.write(*state_values(state, flags))
+
+    @property
+    def latest(self):
+        if self.block.sequence != self.sequence:
+            self.sequence, values = self.block.read()
+            self._latest = state_from_values(values)
+        return self._latest
+
+class _SharedStop:
+    """Stop event for FixedStepScheduler backed by the control byte
+
+    Also set once the dashboard process has gone, so a crashed parent never
+    leaves the physics running.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.parent = os.getppid()
+
+    def is_set(self):
+        return bool(_STOP.unpack_from(self.buffer, CONTROL_OFFSET)[0]) or os.getppid() != self.parent
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return self.is_set()
+
+class _PhysicsLoop:
+    """Physics process side: steps the simulator from the shared inputs"""
+
+    def __init__(self, buffer, profile, torque):
+        self.simulator = VehicleSimulator(profile=profile, torque=torque)
+        self.state_buffer = SharedStateBuffer(buffer)
+        self.input_block = SeqlockBlock(buffer, INPUT_OFFSET, INPUT_FORMAT)
+        self.input_sequence = None
+        self.inputs = None
+        self.flags = 0
+        self.resets = 0
+        self.state_buffer.publish(self.simulator.snapshot())
+
+    def tick(self, dt):
+        # Inputs are unpacked only when the dashboard wrote new ones
+        if self.input_block.sequence != self.input_sequence:
+            self.input_sequence, values = self.input_block.read()
+            *fields, mask, resets = values
+            self.inputs = inputs = VehicleInputs(*fields)
+            self.flags = pack_state_flags(inputs.engine_on, inputs.running, mask)
+            if mask != self.simulator.safety_systems.mask:
+                self.simulator.safety_systems.mask = mask
+            if resets != self.resets:
+                self.resets = resets
+                self.simulator.reset()
+        self.simulator.step(self.inputs, dt)
+        self.state_buffer.publish(self.simulator.snapshot(), self.flags)
+
+def run_physics_process(name, dt, profile=DEFAULT_PROFILE, torque=TORQUE_MODEL_ENABLED):
+    """Entry point of the physics process started by PhysicsProcess"""
+    from multiprocessing import shared_memory
+    from physics.scheduler import FixedStepScheduler
+
+    segment = shared_memory.SharedMemory(name)
+    try:
+        loop = _PhysicsLoop(segment.buf, profile, torque)
+        FixedStepScheduler(loop.tick, dt).run(_SharedStop(segment.buf))
+    finally:
+        segment.close()
+
+class PhysicsProcess:
+    """VehicleSimulator running at a high fixed rate in a separate process.
+
+    The physics never competes with Tk for the GIL. State and inputs are
+    exchanged through one multiprocessing.shared_memory segment holding
+    seqlock-protected structs, so there is no pickling, queue or socket on
+    either path. Offers the interface of SimulationClient (state_buffer,
+    send_inputs, send_safety, send_reset, wait_for_state, close) so the
+    dashboard drives it like a remote simulation. The segment is unlinked
+    by close(), which also runs at interpreter exit.
+    """
+
+    def __init__(self, rate=PHYSICS_PROCESS_RATE, profile=DEFAULT_PROFILE,
+                 torque=TORQUE_MODEL_ENABLED, inputs=None):
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        self.dt = 1.0 / rate
+        self.segment = shared_memory.SharedMemory(create=True, size=SEGMENT_SIZE)
+        self.closed = False
+        try:
+            buffer = self.segment.buf
+            self.state_buffer = SharedStateBuffer(buffer)
+            self.input_block = SeqlockBlock(buffer, INPUT_OFFSET, INPUT_FORMAT)
+            self.inputs = inputs if inputs is not None else VehicleInputs()
+            self.mask = 0
+            self.resets = 0
+            self._write_inputs()
+
+            # Spawned rather than forked so the child starts without Tk
+            context = multiprocessing.get_context('spawn')
+            self.process = context.Process(
+                target=run_physics_process, args=(self.segment.name, self.dt, profile, torque),
+                name='physics', daemon=True
+            )
+            self.process.start()
+        except BaseException:
+            self.close()
+            raise
+        atexit.register(self.close)
+
+    def _write_inputs(self):
+        self.input_block.write(*self.inputs, self.mask, self.resets)
+
+    def send_inputs(self, inputs):
+        self.inputs = inputs
+        self._write_inputs()
+
+    def send_safety(self, safety_systems):
+        self.mask = safety_systems.mask
+        self._write_inputs()
+
+    def send_reset(self):
+        self.resets += 1
+        self._write_inputs()
+
+    def take_controls(self):
+        """Only this dashboard drives the process, so nothing else changes its controls"""
+        return None
+
+    @property
+    def connected(self):
+        return not self.closed and self.process.is_alive()
+
+    def wait_for_state(self, timeout=5.0):
+        """Block until the physics process has published its first state"""
+        deadline = time.monotonic() + timeout
+        while self.state_buffer.block.sequence == 0 and self.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.state_buffer.latest
+
+    def close(self, timeout=1.0):
+        """Stop the physics process and release the shared segment"""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        process = getattr(self, 'process', None)
+        if process is not None:
+            _STOP.pack_into(self.segment.buf, CONTROL_OFFSET, 1)
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+        self.state_buffer = self.input_block = None
+        self.segment.close()
+        self.segment.unlink()
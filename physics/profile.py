@@ -0,0 +1,42 @@
+from collections import namedtuple
+from config import *
+
+# Tunable vehicle parameters. gear_ratios holds the ratios of gears 1-6 in
+# order and torque_curve the torque every torque_curve_step RPM from 0, so
+# that profiles stay hashable and can key caches.
+VehicleProfile = namedtuple('VehicleProfile', [
+    'gear_ratios', 'reverse_gear_ratio', 'final_drive_ratio', 'tire_circumference',
+    'max_speed', 'max_rpm', 'idle_rpm', 'abs_max_brake', 'esp_steering_threshold',
+    'esp_power_reduction', 'acc_target_speed', 'spd_max_speed', 'ods_power_reduction',
+    'torque_curve', 'torque_curve_step', 'vehicle_mass', 'drag_coefficient',
+    'rolling_resistance', 'drivetrain_efficiency',
+])
+
+DEFAULT_PROFILE = VehicleProfile(
+    gear_ratios=tuple(GEAR_RATIOS[gear] for gear in sorted(GEAR_RATIOS)),
+    reverse_gear_ratio=REVERSE_GEAR_RATIO,
+    final_drive_ratio=FINAL_DRIVE_RATIO,
+    tire_circumference=TIRE_CIRCUMFERENCE,
+    max_speed=MAX_SPEED,
+    max_rpm=MAX_RPM,
+    idle_rpm=IDLE_RPM,
+    abs_max_brake=ABS_MAX_BRAKE,
+    esp_steering_threshold=ESP_STEERING_THRESHOLD,
+    esp_power_reduction=ESP_POWER_REDUCTION,
+    acc_target_speed=ACC_TARGET_SPEED,
+    spd_max_speed=SPD_MAX_SPEED,
+    ods_power_reduction=ODS_POWER_REDUCTION,
+    torque_curve=tuple(TORQUE_CURVE),
+    torque_curve_step=TORQUE_CURVE_STEP,
+    vehicle_mass=VEHICLE_MASS,
+    drag_coefficient=DRAG_COEFFICIENT,
+    rolling_resistance=ROLLING_RESISTANCE,
+    drivetrain_efficiency=DRIVETRAIN_EFFICIENCY,
+)
+
+def make_profile(**overrides):
+    """Return DEFAULT_PROFILE with some parameters replaced"""
+    for name in ('gear_ratios', 'torque_curve'):
+        if name in overrides:
+            overrides[name] = tuple(overrides[name])
+    return DEFAULT_PROFILE._replace(**overrides)
@@ -1,44 +1,207 @@
-from config import *
+from physics.profile import DEFAULT_PROFILE
 
-class SafetySystems:
-    def __init__(self):
-        self.abs_enabled = False
-        self.esp_enabled = False
-        self.acc_enabled = False
-        self.ods_enabled = False
-        self.spd_enabled = False
+# Bits of the enabled-system mask
+ABS = 0x01
+ESP = 0x02
+ACC = 0x04
+ODS = 0x08
+SPD = 0x10
+ALL_SYSTEMS = ABS | ESP | ACC | ODS | SPD
+SYSTEM_BITS = {'abs': ABS, 'esp': ESP, 'acc': ACC, 'ods': ODS, 'spd': SPD}
+
+# Input-stage systems for compile_pipeline, in the order the physics loop
+# has always applied them. Each factory binds the profile limits into a
+# stage(brake, gas, steering, speed, hits) -> (brake, gas, hits) that sets
+# its bit in hits when it changes an input.
+def _abs_stage(profile):
+    max_brake = profile.abs_max_brake
+
+    def stage(brake, gas, steering, speed, hits):
+        if brake > max_brake:
+            return max_brake, gas, hits | ABS
+        return brake, gas, hits
+    return stage
+
+def _esp_stage(profile):
+    threshold = profile.esp_steering_threshold
+    reduction = profile.esp_power_reduction
+
+    def stage(brake, gas, steering, speed, hits):
+        if gas > 0 and abs(steering) > threshold:
+            return brake, gas * reduction, hits | ESP
+        return brake, gas, hits
+    return stage
+
+def _acc_stage(profile):
+    target_speed = profile.acc_target_speed
+
+    def stage(brake, gas, steering, speed, hits):
+        if speed < target_speed:
+            if gas < 1.0:
+                return brake, min(gas + 0.02, 1.0), hits | ACC
+        elif speed > target_speed:
+            if gas > 0:
+                return brake, max(gas - 0.02, 0), hits | ACC
+        return brake, gas, hits
+    return stage
+
+def _ods_stage(profile):
+    reduction = profile.ods_power_reduction
+
+    def stage(brake, gas, steering, speed, hits):
+        if gas > 0:
+            return brake, gas * reduction, hits | ODS
+        return brake, gas, hits
+    return stage
+
+_PIPELINE_STAGES = ((ABS, _abs_stage), (ESP, _esp_stage), (ACC, _acc_stage), (ODS, _ods_stage))
+
+_pipelines = {}
+_batch_pipelines = {}
+
+def _no_systems(brake, gas, steering, speed):
+    return brake, gas, 0
+
+def compile_pipeline(mask, profile=DEFAULT_PROFILE):
+    """Return pipeline(brake, gas, steering, speed) -> (brake, gas, hits)
+
+    The pipeline chains only the stages of the enabled systems, with the
+    profile limits bound in, so disabled systems cost nothing. hits is the
+    mask of systems that changed an input. Pipelines are cached per (mask,
+    profile). The speed limiter acts on the velocity after the dynamics and
+    is not part of the pipeline.
+    """
+    key = (mask, profile)
+    pipeline = _pipelines.get(key)
+    if pipeline is not None:
+        return pipeline
+
+    stages = tuple(make(profile) for bit, make in _PIPELINE_STAGES if mask & bit)
+    if not stages:
+        pipeline = _no_systems
+    elif len(stages) == 1:
+        only, = stages
+
+        def pipeline(brake, gas, steering, speed):
+            return only(brake, gas, steering, speed, 0)
+    else:
+        def pipeline(brake, gas, steering, speed):
+            hits = 0
+            for stage in stages:
+                brake, gas, hits = stage(brake, gas, steering, speed, hits)
+            return brake, gas, hits
+
+    _pipelines[key] = pipeline
+    return pipeline
+
+def compile_batch_pipeline(mask, profile=DEFAULT_PROFILE):
+    """Return a NumPy pipeline(brake, gas, steering, speed) -> (brake, gas)
+
+    Works on arrays of vehicles that share the enabled-system mask; only the
+    enabled stages are evaluated. Cached per (mask, profile).
+    """
+    key = (mask, profile)
+    pipeline = _batch_pipelines.get(key)
+    if pipeline is not None:
+        return pipeline
+
+    import numpy as np
+    stages = []
+    if mask & ABS:
+        stages.append(lambda brake, gas, steering, speed:
+                      (np.minimum(brake, profile.abs_max_brake), gas))
+    if mask & ESP:
+        stages.append(lambda brake, gas, steering, speed: (brake, np.where(
+            np.abs(steering) > profile.esp_steering_threshold,
+            gas * profile.esp_power_reduction, gas)))
+    if mask & ACC:
+        stages.append(lambda brake, gas, steering, speed: (brake, np.where(
+            speed < profile.acc_target_speed, np.minimum(gas + 0.02, 1.0),
+            np.where(speed > profile.acc_target_speed, np.maximum(gas - 0.02, 0), gas))))
+    if mask & ODS:
+        stages.append(lambda brake, gas, steering, speed:
+                      (brake, gas * profile.ods_power_reduction))
+
+    def pipeline(brake, gas, steering, speed):
+        for stage in stages:
+            brake, gas = stage(brake, gas, steering, speed)
+        return brake, gas
+
+    _batch_pipelines[key] = pipeline
+    return pipeline
+
+class SafetySystems:    
+    """Driver-assistance systems, switched on and off through a bitmask.
+    
+    Every change of the enabled set swaps in the cached pipeline for the new
+    mask together with the speed limit, as a single (pipeline, speed_limit)
+    tuple in compiled that the physics loop reads once per tick. speed_limit
+    is None while the speed limiter is off.
+    """
+    
+    __slots__ = ('profile', '_mask', 'compiled')
+    
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+        self.mask = 0
+    
+    @property
+    def mask(self):
+        return self._mask
+    
+    @mask.setter
+    def mask(self, mask):
+        mask &= ALL_SYSTEMS
+        self._mask = mask
+        speed_limit = self.profile.spd_max_speed if mask & SPD else None
+        self.compiled = (compile_pipeline(mask, self.profile), speed_limit)
+    
+    def _set_system(self, bit, enabled):
+        self.mask = (self._mask | bit) if enabled else (self._mask & ~bit)
+    
+    abs_enabled = property(lambda self: bool(self._mask & ABS),
+                           lambda self, enabled: self._set_system(ABS, enabled))
+    esp_enabled = property(lambda self: bool(self._mask & ESP),
+                           lambda self, enabled: self._set_system(ESP, enabled))
+    acc_enabled = property(lambda self: bool(self._mask & ACC),
+                           lambda self, enabled: self._set_system(ACC, enabled))
+    ods_enabled = property(lambda self: bool(self._mask & ODS),
+                           lambda self, enabled: self._set_system(ODS, enabled))
+    spd_enabled = property(lambda self: bool(self._mask & SPD),
+                           lambda self, enabled: self._set_system(SPD, enabled))
     
     def apply_abs(self, brake_factor):
         """Apply ABS logic to brake input"""
-        if self.abs_enabled and brake_factor > ABS_MAX_BRAKE:
-            return ABS_MAX_BRAKE
+        if self.abs_enabled and brake_factor > self.profile.abs_max_brake:
+            return self.profile.abs_max_brake
         return brake_factor
     
     def apply_esp(self, gas_factor, steering_angle):
         """Apply ESP logic to gas input"""
-        if self.esp_enabled and abs(steering_angle) > ESP_STEERING_THRESHOLD:
-            return gas_factor * ESP_POWER_REDUCTION
+        if self.esp_enabled and abs(steering_angle) > self.profile.esp_steering_threshold:
+            return gas_factor * self.profile.esp_power_reduction
         return gas_factor
     
     def apply_acc(self, gas_factor, current_speed):
         """Apply Adaptive Cruise Control"""
         if self.acc_enabled:
-            if current_speed < ACC_TARGET_SPEED:
+            target_speed = self.profile.acc_target_speed
+            if current_speed < target_speed:
                 return min(gas_factor + 0.02, 1.0)
-            elif current_speed > ACC_TARGET_SPEED:
+            elif current_speed > target_speed:
                 return max(gas_factor - 0.02, 0)
         return gas_factor
     
     def apply_speed_limiter(self, velocity):
         """Apply speed limiter"""
-        if self.spd_enabled and velocity > SPD_MAX_SPEED:
-            return SPD_MAX_SPEED
+        if self.spd_enabled and velocity > self.profile.spd_max_speed:
+            return self.profile.spd_max_speed
         return velocity
     
     def apply_ods(self, gas_factor):
         """Apply Obstacle Detection System"""
         if self.ods_enabled:
-            return gas_factor * ODS_POWER_REDUCTION
+            return gas_factor * self.profile.ods_power_reduction
         return gas_factor
     
     def toggle_abs(self):
@@ -0,0 +1,296 @@
+import re
+from collections import namedtuple
+from config import PHYSICS_UPDATE_RATE, SCENARIO_MAX_WAIT
+from physics.safety_systems import SYSTEM_BITS
+from physics.simulator import VehicleSimulator, VehicleInputs
+
+# One stretch of a compiled scenario during which the inputs and the enabled
+# safety systems stay constant. Timed phases last ticks ticks; closed-loop
+# phases run until the 'speed' (km/h) or 'rpm' condition reaches threshold,
+# or for at most max_ticks. direction is 1 to wait for value >= threshold,
+# -1 for value <= threshold and 0 to approach it from wherever the phase
+# starts.
+Phase = namedtuple(
+    'Phase', ['inputs', 'mask', 'ticks', 'condition', 'threshold', 'direction', 'max_ticks']
+)
+
+CONDITION_UNITS = {'kmh': 'speed', 'rpm': 'rpm'}
+GEAR_NAMES = {'r': -1, 'n': 0, '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6}
+PEDALS = {'gas': 'gas', 'brake': 'brake', 'clutch': 'clutch'}
+_CONDITION_CODES = {None: 0, 'speed': 1, 'rpm': 2}
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+def _words(statement):
+    """Lower-case words with numbers split from their units"""
+    text = statement.lower().replace('km/h', 'kmh').replace(',', ' ')
+    text = re.sub(r'(\d)([a-z%°])', r'\1 \2', text)
+    return text.split()
+
+class Scenario:
+    """Driving scenario compiled from the scenario language.
+
+    A scenario is a list of statements separated by ';' or newlines, '#'
+    starting a comment:
+
+        gear 1; gas 80% for 3s; shift 2 at 6000rpm
+        brake 100% until 0 km/h; enable ABS
+
+    gas, brake and clutch take a percentage, steer an angle in degrees and
+    gear (or shift) 1-6, R or N. enable and disable take safety system names
+    and engine takes on or off. Any of these may end in 'for <n>s' or
+    'until <n> km/h|rpm' to hold the result, and 'wait' only holds. 'shift 2
+    at 6000 rpm' holds the current inputs until the condition and then
+    shifts; an upshift waits for the value to be at least the threshold and
+    a downshift for it to be at most, so a shift that is already due happens
+    at once. Changes without a hold carry over into the next held phase;
+    changes after the last hold end the scenario as a phase of no ticks.
+
+    Compilation resolves every statement into Phases of constant inputs, so
+    running a scenario is a loop over prebuilt VehicleInputs with a cheap
+    condition check per tick.
+    """
+
+    def __init__(self, source, dt=PHYSICS_UPDATE_RATE, initial=None, mask=0):
+        self.source = source
+        self.dt = dt
+        self.max_ticks = int(round(SCENARIO_MAX_WAIT / dt))
+        self._inputs = initial if initial is not None else VehicleInputs()
+        self._mask = mask
+        self._held = (self._inputs, mask)
+        self.phases = []
+        for number, line in enumerate(source.splitlines(), start=1):
+            line = line.split('#', 1)[0]
+            for statement in line.split(';'):
+                statement = statement.strip()
+                if statement:
+                    self._compile(statement, number)
+        if (self._inputs, self._mask) != self._held:
+            self._hold()
+        self.phases = tuple(self.phases)
+        self._arrays = None
+
+    @classmethod
+    def load(cls, path, dt=PHYSICS_UPDATE_RATE):
+        with open(path) as f:
+            return cls(f.read(), dt)
+
+    def __len__(self):
+        return len(self.phases)
+
+    def _error(self, statement, number, reason):
+        return ValueError(f"scenario line {number}: {reason} in {statement!r}")
+
+    def _hold(self, ticks=0, condition=None, threshold=0.0, direction=0):
+        self.phases.append(Phase(
+            self._inputs, self._mask, ticks, condition, threshold, direction, self.max_ticks
+        ))
+        self._held = (self._inputs, self._mask)
+
+    def _parse_hold(self, words, statement, number, direction=0):
+        """Append the phase for a trailing 'for' / 'until' / 'at' clause"""
+        if not words:
+            return False
+        if len(words) < 3 or words[0] not in ('for', 'until', 'at') or not _NUMBER.fullmatch(words[1]):
+            raise self._error(statement, number, "expected 'for <n>s' or 'until <n> km/h|rpm'")
+        value, unit = float(words[1]), words[2]
+        if unit in ('s', 'sec', 'seconds') and words[0] != 'at':
+            self._hold(ticks=int(round(value / self.dt)))
+        elif unit in CONDITION_UNITS and words[0] != 'for':
+            self._hold(condition=CONDITION_UNITS[unit], threshold=value, direction=direction)
+        else:
+            raise self._error(statement, number, f"unknown unit {unit!r}")
+        if len(words) > 3:
+            raise self._error(statement, number, f"unexpected {' '.join(words[3:])!r}")
+        return True
+
+    def _compile(self, statement, number):
+        words = _words(statement)
+        verb, arguments = words[0], words[1:]
+
+        if verb in PEDALS or verb in ('steer', 'steering'):
+            if not arguments or not _NUMBER.fullmatch(arguments[0]):
+                raise self._error(statement, number, f"{verb} needs a value")
+            value = float(arguments[0])
+            rest = arguments[1:]
+            if rest and rest[0] in ('%', 'deg', '°', 'degrees'):
+                rest = rest[1:]
+            if verb in PEDALS:
+                if not 0 <= value <= 100:
+                    raise self._error(statement, number, "pedal values are 0-100%")
+                self._inputs = self._inputs._replace(**{PEDALS[verb]: value})
+            else:
+                self._inputs = self._inputs._replace(steering_angle=value)
+            self._parse_hold(rest, statement, number)
+
+        elif verb in ('gear', 'shift'):
+            if not arguments or arguments[0] not in GEAR_NAMES:
+                raise self._error(statement, number, "gear must be 1-6, R or N")
+            gear = GEAR_NAMES[arguments[0]]
+            rest = arguments[1:]
+            if rest and rest[0] == 'at':
+                current = self._inputs.gear
+                direction = 1 if 0 < current < gear else -1 if 0 < gear < current else 0
+                self._parse_hold(rest, statement, number, direction)
+                rest = []
+            self._inputs = self._inputs._replace(gear=gear)
+            self._parse_hold(rest, statement, number)
+
+        elif verb in ('enable', 'disable'):
+            names = []
+            while arguments and arguments[0] in SYSTEM_BITS or arguments[:1] == ['and']:
+                word = arguments.pop(0)
+                if word != 'and':
+                    names.append(word)
+            if not names:
+                raise self._error(statement, number, f"{verb} needs one of {', '.join(SYSTEM_BITS)}")
+            for name in names:
+                if verb == 'enable':
+                    self._mask |= SYSTEM_BITS[name]
+                else:
+                    self._mask &= ~SYSTEM_BITS[name]
+            self._parse_hold(arguments, statement, number)
+
+        elif verb == 'engine':
+            if not arguments or arguments[0] not in ('on', 'off'):
+                raise self._error(statement, number, "engine must be on or off")
+            self._inputs = self._inputs._replace(engine_on=arguments[0] == 'on')
+            self._parse_hold(arguments[1:], statement, number)
+
+        elif verb in ('wait', 'hold'):
+            if not self._parse_hold(arguments, statement, number):
+                raise self._error(statement, number, f"{verb} needs 'for' or 'until'")
+
+        else:
+            raise self._error(statement, number, f"unknown command {verb!r}")
+
+    def ticks(self, simulator):
+        """Yield (inputs, safety mask) for every tick of the scenario
+
+        Closed-loop conditions are evaluated against simulator between
+        ticks, so the caller must step simulator with each yielded input
+        before asking for the next.
+        """
+        for phase in self.phases:
+            if phase.condition is None:
+                for _ in range(phase.ticks):
+                    yield phase.inputs, phase.mask
+                continue
+            speed = phase.condition == 'speed'
+            threshold = phase.threshold
+            value = simulator.speed if speed else simulator.target_rpm
+            rising = phase.direction > 0 or (phase.direction == 0 and threshold > value)
+            for _ in range(phase.max_ticks):
+                if (value >= threshold) if rising else (value <= threshold):
+                    break
+                yield phase.inputs, phase.mask
+                value = simulator.speed if speed else simulator.target_rpm
+
+    def arrays(self):
+        """Columnar NumPy phase table used by run_scenario_batch"""
+        if self._arrays is None:
+            import numpy as np
+            phases = self.phases
+            columns = {
+                field: np.array([getattr(phase.inputs, field) for phase in phases])
+                for field in VehicleInputs._fields
+            }
+            columns['mask'] = np.array([phase.mask for phase in phases], dtype=np.uint8)
+            columns['ticks'] = np.array([phase.ticks for phase in phases], dtype=np.int64)
+            columns['condition'] = np.array([_CONDITION_CODES[phase.condition] for phase in phases])
+            columns['threshold'] = np.array([phase.threshold for phase in phases], dtype=float)
+            columns['direction'] = np.array([phase.direction for phase in phases], dtype=np.int8)
+            columns['max_ticks'] = np.array([phase.max_ticks for phase in phases], dtype=np.int64)
+            self._arrays = columns
+        return self._arrays
+
+def run_scenario(scenario, simulator=None):
+    """Drive a VehicleSimulator through a scenario as fast as possible"""
+    if simulator is None:
+        simulator = VehicleSimulator()
+    safety = simulator.safety_systems
+    dt = scenario.dt
+    for inputs, mask in scenario.ticks(simulator):
+        if mask != safety.mask:
+            safety.mask = mask
+        simulator.step(inputs, dt)
+    if scenario.phases:
+        # The last phase may have no ticks to apply its switches
+        safety.mask = scenario.phases[-1].mask
+    return simulator
+
+def run_scenario_batch(scenario, fleet):
+    """Drive every vehicle of a FleetSimulator through a scenario
+
+    Each vehicle moves through the phases on its own, following its own
+    closed-loop conditions. Vehicles that finish early keep being stepped
+    with the last phase's inputs until all are done, so the state each one
+    had when it finished is returned: a dict of 'ticks', 'time', 'velocity',
+    'speed', 'rpm' and 'odometer' arrays.
+    """
+    import numpy as np
+    columns = scenario.arrays()
+    count = len(scenario)
+    size = fleet.size
+    dt = scenario.dt
+    phase = np.zeros(size, dtype=np.intp)
+    elapsed = np.zeros(size, dtype=np.int64)
+    rising = np.zeros(size, dtype=bool)
+    finished = np.zeros(size, dtype=bool)
+    ticks = np.zeros(size, dtype=np.int64)
+    result = {name: np.zeros(size) for name in ('time', 'velocity', 'speed', 'rpm', 'odometer')}
+    if not count:
+        finished[:] = True
+
+    condition = columns['condition']
+    threshold = columns['threshold']
+    direction = columns['direction']
+
+    def condition_values(current):
+        return np.where(condition[current] == _CONDITION_CODES['rpm'], fleet.target_rpm, fleet.speed)
+
+    def phase_done(current, values):
+        reached = np.where(rising, values >= threshold[current], values <= threshold[current])
+        return np.where(
+            condition[current] == 0, elapsed >= columns['ticks'][current],
+            reached | (elapsed >= columns['max_ticks'][current])
+        )
+
+    def finish(done):
+        """Advance done vehicles, skipping phases already complete on entry"""
+        while done.any():
+            phase[done] += 1
+            entering = done & (phase < count)
+            current = np.minimum(phase, count - 1)
+            values = condition_values(current)
+            rising[entering] = np.where(
+                direction[current] == 0, threshold[current] > values, direction[current] > 0
+            )[entering]
+            elapsed[entering] = 0
+            done = entering & phase_done(current, values)
+        newly = ~finished & (phase >= count)
+        if newly.any():
+            ticks[newly] = fleet.ticks
+            result['time'][newly] = fleet.ticks * dt
+            result['velocity'][newly] = fleet.velocity[newly]
+            result['speed'][newly] = fleet.speed[newly]
+            result['rpm'][newly] = fleet.target_rpm[newly]
+            result['odometer'][newly] = fleet.odometer[newly]
+            finished[newly] = True
+
+    # Enter the first phase
+    if count:
+        phase[:] = -1
+        finish(np.ones(size, dtype=bool))
+
+    while not finished.all():
+        current = np.minimum(phase, count - 1)
+        masks = columns['mask'][current]
+        if not np.array_equal(masks, fleet.safety_mask):
+            fleet.set_safety(masks)
+        fleet.step(VehicleInputs(*(columns[field][current] for field in VehicleInputs._fields)), dt)
+        elapsed += 1
+        finish(~finished & phase_done(current, condition_values(current)))
+
+    result['ticks'] = ticks
+    return result
@@ -0,0 +1,101 @@
+import time
+from collections import deque, namedtuple
+from config import PHYSICS_UPDATE_RATE, PHYSICS_MAX_CATCH_UP, PHYSICS_JITTER_SAMPLES
+
+SchedulerStats = namedtuple(
+    'SchedulerStats',
+    ['achieved_hz', 'jitter_p50', 'jitter_p90', 'jitter_p99', 'overruns', 'dropped_steps']
+)
+
+class FixedStepScheduler:
+    """Real-time driver for a fixed-step simulation.
+
+    Elapsed monotonic time is collected in an accumulator and paid out in
+    steps of exactly dt, so the simulated clock follows the wall clock no
+    matter how long each step takes. After a stall at most max_catch_up steps
+    run back to back; the rest of the backlog is dropped and counted instead
+    of making the simulation spiral further behind.
+    """
+
+    def __init__(self, step, dt=PHYSICS_UPDATE_RATE, max_catch_up=PHYSICS_MAX_CATCH_UP,
+                 jitter_samples=PHYSICS_JITTER_SAMPLES, clock=time.perf_counter):
+        self.step = step
+        self.dt = dt
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.intervals = deque(maxlen=jitter_samples)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the timing statistics"""
+        self.intervals.clear()
+        self.ticks = 0
+        self.overruns = 0
+        self.dropped_steps = 0
+        self.started = None
+        self.last_tick = None
+
+    def run(self, stop_event):
+        """Step in real time until stop_event is set
+
+        The statistics start over with every run, so time spent stopped
+        does not count against the achieved rate.
+        """
+        dt = self.dt
+        clock = self.clock
+        self.reset_stats()
+        previous = clock()
+        self.started = previous
+        accumulator = 0.0
+
+        while not stop_event.is_set():
+            now = clock()
+            accumulator += now - previous
+            previous = now
+
+            steps = 0
+            while accumulator >= dt and steps < self.max_catch_up:
+                self.step(dt)
+                accumulator -= dt
+                steps += 1
+
+            if steps:
+                self.ticks += steps
+                if self.last_tick is not None:
+                    self.intervals.append(now - self.last_tick)
+                self.last_tick = now
+                if steps > 1:
+                    self.overruns += 1
+            if accumulator >= dt:
+                dropped = int(accumulator / dt)
+                self.dropped_steps += dropped
+                accumulator -= dropped * dt
+
+            stop_event.wait(max(0.0, dt - accumulator - (clock() - now)))
+
+    def stats(self):
+        """Return achieved rate, tick jitter percentiles (seconds) and overruns
+
+        Safe to call from another thread while run() is stepping.
+        """
+        ticks, started, last_tick = self.ticks, self.started, self.last_tick
+        elapsed = (last_tick - started) if last_tick is not None and started is not None else 0.0
+        achieved_hz = ticks / elapsed if elapsed > 0 else 0.0
+        while True:
+            # The physics thread may append while the deque is copied
+            try:
+                intervals = list(self.intervals)
+                break
+            except RuntimeError:
+                continue
+        jitter = sorted(abs(interval - self.dt) for interval in intervals)
+
+        def percentile(fraction):
+            if not jitter:
+                return 0.0
+            return jitter[min(len(jitter) - 1, int(fraction * len(jitter)))]
+
+        return SchedulerStats(
+            achieved_hz, percentile(0.5), percentile(0.9), percentile(0.99),
+            self.overruns, self.dropped_steps
+        )
@@ -0,0 +1,200 @@
+from collections import namedtuple
+from config import *
+from physics.engine import EnginePhysics
+from physics.safety_systems import SafetySystems, SYSTEM_BITS
+from physics.profile import DEFAULT_PROFILE
+from physics.torque import get_torque_model
+
+# Driver inputs for one physics step. Pedals and clutch are in percent (0-100),
+# the steering angle is in degrees and the gear is -1 (R), 0 (N) or 1-6.
+VehicleInputs = namedtuple(
+    'VehicleInputs',
+    ['gas', 'brake', 'clutch', 'steering_angle', 'gear', 'engine_on', 'running'],
+    defaults=[0.0, 0.0, 0.0, 0.0, 1, True, True]
+)
+
+SAFETY_SYSTEM_NAMES = ('abs', 'esp', 'acc', 'ods', 'spd')
+
+# Immutable snapshot of the vehicle after a physics step. Speed is in km/h
+# and always positive, velocity is negative when reversing.
+VehicleState = namedtuple(
+    'VehicleState',
+    ['tick', 'time', 'gear', 'velocity', 'speed', 'acceleration', 'rpm', 'odometer']
+)
+
+class VehicleSimulator:
+    """Headless vehicle dynamics, advanced explicitly with step(inputs, dt).
+
+    The per-tick deltas of the original dashboard loop were tuned for a tick
+    of PHYSICS_UPDATE_RATE seconds, so they are scaled by dt / PHYSICS_UPDATE_RATE
+    here. Unlike that loop, which read the smoothed speed shown on the gauge
+    for rpm, drag, ACC and the odometer, the simulator uses its own speed
+    throughout, so its trajectories differ slightly from the old dashboard
+    whenever the display lagged behind. With torque=True a new engine is
+    driven by the profile's TorqueModel, in reverse as well as forwards.
+    """
+
+    def __init__(self, engine=None, safety_systems=None, profile=DEFAULT_PROFILE,
+                 torque=TORQUE_MODEL_ENABLED):
+        self.profile = profile
+        if engine is None:
+            engine = EnginePhysics(profile, get_torque_model(profile) if torque else None)
+        self.engine = engine
+        self.safety_systems = safety_systems if safety_systems is not None else SafetySystems(profile)
+        self.interventions = dict.fromkeys(SAFETY_SYSTEM_NAMES, 0)
+        self.target_rpm = 0.0
+        self.time = 0.0
+        self.ticks = 0
+        self.gear = 1
+
+    @property
+    def speed(self):
+        """Current vehicle speed in km/h (always positive)"""
+        return max(0, abs(self.engine.velocity))
+
+    def reset(self):
+        """Reset the vehicle to standstill"""
+        self.engine.velocity = 0.0
+        self.engine.acceleration = 0.0
+        self.engine.odometer = 0.0
+        self.target_rpm = 0.0
+        self.time = 0.0
+        self.ticks = 0
+        self.gear = 1
+        self.interventions = dict.fromkeys(SAFETY_SYSTEM_NAMES, 0)
+
+    def snapshot(self):
+        """Return the current state as an immutable VehicleState"""
+        engine = self.engine
+        return VehicleState(
+            self.ticks, self.time, self.gear, engine.velocity, self.speed,
+            engine.acceleration, self.target_rpm, engine.odometer
+        )
+
+    def restore(self, state):
+        """Restore the vehicle from a VehicleState snapshot"""
+        engine = self.engine
+        engine.velocity = state.velocity
+        engine.acceleration = state.acceleration
+        engine.odometer = state.odometer
+        self.target_rpm = state.rpm
+        self.time = state.time
+        self.ticks = state.tick
+        self.gear = state.gear
+
+    def step(self, inputs, dt=PHYSICS_UPDATE_RATE):
+        """Advance the simulation by dt seconds using the given inputs"""
+        engine = self.engine
+        idle_rpm = self.profile.idle_rpm
+        scale = dt / PHYSICS_UPDATE_RATE
+        speed = self.speed
+        self.gear = inputs.gear
+
+        if inputs.engine_on and inputs.running:
+            gear = inputs.gear
+            gas_factor = inputs.gas / 100.0
+            brake_factor = inputs.brake / 100.0
+            clutch_factor = inputs.clutch / 100.0
+
+            # Apply safety systems, counting the ticks each one intervened
+            pipeline, speed_limit = self.safety_systems.compiled
+            interventions = self.interventions
+            brake_factor, gas_factor, hits = pipeline(
+                brake_factor, gas_factor, inputs.steering_angle, speed
+            )
+            if hits:
+                for name in SAFETY_SYSTEM_NAMES:
+                    if hits & SYSTEM_BITS[name]:
+                        interventions[name] += 1
+
+            if gear > 0:  # Forward gear
+                if speed > 0.1:
+                    self.target_rpm = engine.calculate_rpm(speed, gear)
+                elif gas_factor > 0:
+                    self.target_rpm = idle_rpm + (gas_factor * (3500 - idle_rpm))
+                else:
+                    self.target_rpm = idle_rpm
+
+                if gas_factor > 0 and clutch_factor < 70:
+                    engine.acceleration = engine.calculate_acceleration(
+                        gas_factor, gear, clutch_factor, speed
+                    )
+                    if speed < self.profile.max_speed:
+                        engine.velocity += engine.acceleration * scale
+                else:
+                    engine.acceleration = 0
+
+                # Braking
+                if brake_factor > 0:
+                    brake_deceleration = brake_factor * 8 * scale
+                    engine.velocity = max(0, engine.velocity - brake_deceleration)
+
+                # Natural deceleration
+                if gas_factor == 0 and brake_factor == 0:
+                    natural_decel = (0.5 + (speed * 0.02)) * scale
+                    engine.velocity = max(0, engine.velocity - natural_decel)
+
+            elif gear == -1:  # Reverse gear
+                if speed > 0.1:
+                    self.target_rpm = engine.calculate_rpm(speed, gear)
+                elif gas_factor > 0:
+                    self.target_rpm = idle_rpm + (gas_factor * (2500 - idle_rpm))
+                else:
+                    self.target_rpm = idle_rpm
+
+                if gas_factor > 0 and clutch_factor < 70:
+                    if abs(engine.velocity) < 40:
+                        if engine.torque_model is not None:
+                            # Road load may outweigh the drive, but never
+                            # pushes the car forwards
+                            acceleration = engine.calculate_acceleration(
+                                gas_factor, gear, clutch_factor, speed
+                            )
+                            engine.velocity = min(0, engine.velocity - acceleration * scale)
+                        else:
+                            engine.velocity -= gas_factor * 1.0 * scale
+
+                if brake_factor > 0:
+                    brake_deceleration = brake_factor * 6 * scale
+                    if engine.velocity < 0:
+                        engine.velocity = min(0, engine.velocity + brake_deceleration)
+
+            else:  # Neutral gear
+                if gas_factor > 0:
+                    self.target_rpm = idle_rpm + (gas_factor * (4000 - idle_rpm))
+                else:
+                    self.target_rpm = idle_rpm
+
+                engine.acceleration = 0
+                natural_decel = (1.0 + (speed * 0.03)) * scale
+                engine.velocity = max(0, engine.velocity - natural_decel)
+
+            # Apply speed limiter
+            if speed_limit is not None and engine.velocity > speed_limit:
+                interventions['spd'] += 1
+                engine.velocity = speed_limit
+
+            # Update odometer
+            engine.update_odometer(speed, dt)
+
+        elif inputs.engine_on:
+            self.target_rpm = idle_rpm
+            coast_decel = (1.0 + (speed * 0.03)) * scale
+            engine.velocity = max(0, engine.velocity - coast_decel)
+
+        else:
+            self.target_rpm = 0
+            engine.velocity = max(0, engine.velocity - 2.0 * scale)
+
+        self.time += dt
+        self.ticks += 1
+
+    def run(self, inputs, duration, dt=PHYSICS_UPDATE_RATE):
+        """Run with constant inputs for duration seconds, as fast as possible"""
+        for _ in range(int(round(duration / dt))):
+            self.step(inputs, dt)
+
+    def run_script(self, script, dt=PHYSICS_UPDATE_RATE):
+        """Run a driving script of (duration, VehicleInputs) segments"""
+        for duration, inputs in script:
+            self.run(inputs, duration, dt)
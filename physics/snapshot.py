@@ -0,0 +1,26 @@
+import itertools
+
+class SnapshotBuffer:
+    """Latest-value publication of immutable snapshots between threads.
+
+    A single writer thread publishes complete snapshots (namedtuples such as
+    VehicleState or VehicleInputs); any number of reader threads take the most
+    recent one. Publishing is a single reference assignment, which is atomic
+    under the GIL, so readers always see one whole snapshot and never a mix of
+    two ticks. No locks are taken on either side.
+    """
+
+    def __init__(self, initial=None):
+        self._latest = initial
+        self._sequence = itertools.count(1)
+        self.sequence = 0
+
+    def publish(self, snapshot):
+        """Make snapshot the latest value"""
+        self._latest = snapshot
+        self.sequence = next(self._sequence)
+
+    @property
+    def latest(self):
+        """Most recently published snapshot"""
+        return self._latest
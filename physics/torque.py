@@ -0,0 +1,133 @@
+import math
+from config import PHYSICS_UPDATE_RATE
+from physics.profile import DEFAULT_PROFILE
+from physics.drivetrain import get_drivetrain, GEAR_INDEX_OFFSET
+
+GRAVITY = 9.81
+
+class TorqueModel:
+    """Engine and road-load model driven by a torque-vs-RPM table.
+
+    The profile's torque curve is sampled on a uniform RPM grid, so a lookup
+    is one multiply, one truncation and one linear interpolation with a
+    precomputed slope, never a search. Engine torque becomes wheel force
+    through a per-gear factor (gear ratio, final drive, efficiency and wheel
+    radius); aerodynamic drag and rolling resistance are subtracted while
+    the car moves. Fuel is cut at max_rpm. Accelerations are returned in the
+    simulator's units, km/h gained per PHYSICS_UPDATE_RATE tick.
+    """
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+        self.drivetrain = get_drivetrain(profile)
+        self.max_rpm = profile.max_rpm
+        self.inverse_step = 1.0 / profile.torque_curve_step
+        self.torque = tuple(float(torque) for torque in profile.torque_curve)
+        self.slopes = tuple(
+            following - torque for torque, following in zip(self.torque, self.torque[1:])
+        ) + (0.0,)
+        self.last_position = len(self.torque) - 1
+
+        wheel_radius = profile.tire_circumference / (2 * math.pi)
+        ratios = {gear: ratio for gear, ratio in enumerate(profile.gear_ratios, start=1)}
+        ratios[-1] = profile.reverse_gear_ratio
+        scale = profile.final_drive_ratio * profile.drivetrain_efficiency / wheel_radius
+        self.wheel_force = {gear: ratio * scale for gear, ratio in ratios.items()}
+        # Gears outside the gearbox keep the drivetrain's fallback ratio of 1.0
+        self.default_wheel_force = scale
+
+        self.drag = profile.drag_coefficient / (3.6 * 3.6)  # per (km/h)^2
+        self.rolling = profile.rolling_resistance * profile.vehicle_mass * GRAVITY
+        self.force_to_acceleration = 3.6 * PHYSICS_UPDATE_RATE / profile.vehicle_mass
+
+        # Per gear (km/h -> RPM, Nm -> acceleration) so the scalar path needs
+        # one dictionary lookup; the road load is in acceleration units too
+        drivetrain = self.drivetrain
+        self.idle_rpm = drivetrain.idle_rpm
+        self.gear_coefficients = {
+            gear: (drivetrain.rpm_per_kmh[gear], force * self.force_to_acceleration)
+            for gear, force in self.wheel_force.items()
+        }
+        self.default_gear_coefficients = (
+            drivetrain.default_rpm_per_kmh, self.default_wheel_force * self.force_to_acceleration
+        )
+        self.drag_acceleration = self.drag * self.force_to_acceleration
+        self.rolling_acceleration = self.rolling * self.force_to_acceleration
+        self._arrays = None
+
+    def engine_torque(self, rpm):
+        """Full-throttle torque in Nm at an engine speed"""
+        if rpm >= self.max_rpm:
+            return 0.0
+        position = rpm * self.inverse_step
+        if position >= self.last_position:
+            return self.torque[-1]
+        index = int(position)
+        return self.torque[index] + self.slopes[index] * (position - index)
+
+    def acceleration(self, speed, gear, gas_factor):
+        """Acceleration in km/h per tick at a road speed and forward gear"""
+        rpm_per_kmh, per_nm = self.gear_coefficients.get(gear, self.default_gear_coefficients)
+        if speed > 0.1:
+            rpm = speed * rpm_per_kmh
+            if rpm < self.idle_rpm:
+                rpm = self.idle_rpm
+            road_load = self.drag_acceleration * speed * speed + self.rolling_acceleration
+        else:
+            rpm = self.idle_rpm
+            road_load = 0.0
+        if rpm >= self.max_rpm:
+            return -road_load
+        position = rpm * self.inverse_step
+        if position >= self.last_position:
+            torque = self.torque[-1]
+        else:
+            index = int(position)
+            torque = self.torque[index] + self.slopes[index] * (position - index)
+        return gas_factor * torque * per_nm - road_load
+
+    def arrays(self):
+        """NumPy torque, slope and per-gear Nm -> acceleration tables"""
+        if self._arrays is None:
+            import numpy as np
+            rpm_per_kmh, _ = self.drivetrain.arrays()
+            per_nm = np.full(len(rpm_per_kmh), self.default_gear_coefficients[1])
+            per_nm[0 + GEAR_INDEX_OFFSET] = 0.0
+            for gear, (_, gear_per_nm) in self.gear_coefficients.items():
+                per_nm[gear + GEAR_INDEX_OFFSET] = gear_per_nm
+            self._arrays = (np.array(self.torque), np.array(self.slopes), per_nm)
+        return self._arrays
+
+    def engine_torque_batch(self, rpm):
+        """Full-throttle torque for an array of engine speeds"""
+        import numpy as np
+        torque, slopes, _ = self.arrays()
+        position = np.minimum(np.asarray(rpm) * self.inverse_step, self.last_position)
+        index = position.astype(np.intp)
+        result = torque[index] + slopes[index] * (position - index)
+        return np.where(rpm >= self.max_rpm, 0.0, result)
+
+    def acceleration_batch(self, speeds, gears, gas_factors):
+        """Acceleration for arrays of road speeds, gears and throttles"""
+        import numpy as np
+        _, _, per_nm = self.arrays()
+        speeds = np.asarray(speeds)
+        index, valid = self.drivetrain._gear_index(gears)
+        gear_per_nm = np.where(
+            valid, per_nm[index],
+            np.where(np.asarray(gears) > 0, self.default_gear_coefficients[1], 0.0)
+        )
+        torque = self.engine_torque_batch(self.drivetrain.rpm_batch(speeds, gears))
+        road_load = np.where(
+            speeds > 0.1, self.drag_acceleration * speeds * speeds + self.rolling_acceleration, 0.0
+        )
+        return gas_factors * torque * gear_per_nm - road_load
+
+_models = {}
+
+def get_torque_model(profile=DEFAULT_PROFILE):
+    """Return the shared TorqueModel for a profile, building it once"""
+    model = _models.get(profile)
+    if model is None:
+        model = _models[profile] = TorqueModel(profile)
+    return model
@@ -0,0 +1,175 @@
+import struct
+from physics.simulator import VehicleState
+
+# Bits of a packed state's flags byte, shared with the telemetry flags
+# column: the engine and simulation switches, then the SafetySystems mask
+FLAG_ENGINE_ON = 0x01
+FLAG_RUNNING = 0x02
+SAFETY_FLAG_SHIFT = 2
+
+# Fixed little-endian layout of one vehicle state, without padding. speed is
+# not stored since it is always abs(velocity).
+STATE_FIELDS = ('tick', 'time', 'velocity', 'acceleration', 'rpm', 'odometer', 'gear', 'flags')
+STATE_FORMAT = '<QdddddbB'
+STATE_STRUCT = struct.Struct(STATE_FORMAT)
+STATE_SIZE = STATE_STRUCT.size
+
+_FIELD_STRUCTS = {}
+_offset = 0
+for _name, _code in zip(STATE_FIELDS, STATE_FORMAT[1:]):
+    _FIELD_STRUCTS[_name] = (struct.Struct('<' + _code), _offset)
+    _offset += struct.calcsize('<' + _code)
+del _name, _code, _offset
+
+def pack_state_flags(engine_on, running, mask):
+    """Pack the engine and simulation switches and a safety mask into a bitfield"""
+    return (
+        (FLAG_ENGINE_ON if engine_on else 0)
+        | (FLAG_RUNNING if running else 0)
+        | (mask << SAFETY_FLAG_SHIFT)
+    )
+
+def state_values(state, flags=0):
+    """Values of a VehicleState in STATE_STRUCT order"""
+    return (state.tick, state.time, state.velocity, state.acceleration,
+            state.rpm, state.odometer, state.gear, flags)
+
+def state_from_values(values):
+    """VehicleState from values in STATE_STRUCT order (flags are dropped)"""
+    tick, time, velocity, acceleration, rpm, odometer, gear, _ = values
+    return VehicleState(tick, time, gear, velocity, abs(velocity), acceleration, rpm, odometer)
+
+def pack_state(state, flags=0):
+    return STATE_STRUCT.pack(*state_values(state, flags))
+
+def pack_state_into(buffer, offset, state, flags=0):
+    STATE_STRUCT.pack_into(buffer, offset, *state_values(state, flags))
+
+def unpack_state(buffer, offset=0):
+    """Return (VehicleState, flags) stored at offset in buffer"""
+    values = STATE_STRUCT.unpack_from(buffer, offset)
+    return state_from_values(values), values[-1]
+
+_dtype = None
+
+def state_dtype():
+    """NumPy record dtype with exactly the STATE_STRUCT layout"""
+    global _dtype
+    if _dtype is None:
+        import numpy as np
+        _dtype = np.dtype([
+            ('tick', '<u8'), ('time', '<f8'), ('velocity', '<f8'), ('acceleration', '<f8'),
+            ('rpm', '<f8'), ('odometer', '<f8'), ('gear', 'i1'), ('flags', 'u1'),
+        ])
+    return _dtype
+
+def _field(name):
+    field, field_offset = _FIELD_STRUCTS[name]
+
+    def get(self):
+        return field.unpack_from(self.buffer, self.offset + field_offset)[0]
+
+    def set(self, value):
+        field.pack_into(self.buffer, self.offset + field_offset, value)
+    return property(get, set)
+
+def _flag(bit):
+    def get(self):
+        return bool(self.flags & bit)
+
+    def set(self, enabled):
+        self.flags = (self.flags | bit) if enabled else (self.flags & ~bit)
+    return property(get, set)
+
+class PackedVehicleState:
+    """Vehicle state stored in STATE_SIZE bytes of a buffer.
+
+    A zero-copy view: fields are read from and written to the buffer at
+    offset, which may be a bytearray, an mmap, a shared memory segment or a
+    VehicleStateArray. The safety systems live in the flags bitfield.
+    """
+
+    __slots__ = ('buffer', 'offset')
+
+    def __init__(self, buffer=None, offset=0):
+        self.buffer = buffer if buffer is not None else bytearray(STATE_SIZE)
+        self.offset = offset
+
+    tick = _field('tick')
+    time = _field('time')
+    velocity = _field('velocity')
+    acceleration = _field('acceleration')
+    rpm = _field('rpm')
+    odometer = _field('odometer')
+    gear = _field('gear')
+    flags = _field('flags')
+    engine_on = _flag(FLAG_ENGINE_ON)
+    running = _flag(FLAG_RUNNING)
+
+    @property
+    def speed(self):
+        return abs(self.velocity)
+
+    @property
+    def safety_mask(self):
+        return self.flags >> SAFETY_FLAG_SHIFT
+
+    @safety_mask.setter
+    def safety_mask(self, mask):
+        self.flags = (self.flags & (FLAG_ENGINE_ON | FLAG_RUNNING)) | (mask << SAFETY_FLAG_SHIFT)
+
+    def store(self, state, flags=0):
+        """Write a VehicleState (and flags) into the view"""
+        pack_state_into(self.buffer, self.offset, state, flags)
+
+    def state(self):
+        """Copy the view out as an immutable VehicleState"""
+        return unpack_state(self.buffer, self.offset)[0]
+
+    def memoryview(self):
+        """The STATE_SIZE bytes of this state, without copying"""
+        return memoryview(self.buffer)[self.offset:self.offset + STATE_SIZE]
+
+class VehicleStateArray:
+    """Fixed number of packed vehicle states in one contiguous buffer
+
+    100k states take STATE_SIZE * 100k bytes with no per-state objects.
+    records() views the same memory as a NumPy record array, and the
+    buffer can be written to a file or socket, or shared, as it is.
+    """
+
+    __slots__ = ('count', 'buffer')
+
+    def __init__(self, count, buffer=None):
+        self.count = count
+        self.buffer = buffer if buffer is not None else bytearray(count * STATE_SIZE)
+        if len(self.buffer) < count * STATE_SIZE:
+            raise ValueError(f"buffer holds fewer than {count} states")
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("vehicle state index out of range")
+        return (index % self.count) * STATE_SIZE
+
+    def __getitem__(self, index):
+        """PackedVehicleState view of one state"""
+        return PackedVehicleState(self.buffer, self._offset(index))
+
+    def store(self, index, state, flags=0):
+        pack_state_into(self.buffer, self._offset(index), state, flags)
+
+    def state(self, index):
+        return unpack_state(self.buffer, self._offset(index))[0]
+
+    def __iter__(self):
+        """Yield every state as a VehicleState"""
+        for values in STATE_STRUCT.iter_unpack(memoryview(self.buffer)[:self.count * STATE_SIZE]):
+            yield state_from_values(values)
+
+    def records(self):
+        """Zero-copy NumPy record array over the states"""
+        import numpy as np
+        return np.frombuffer(self.buffer, dtype=state_dtype(), count=self.count)
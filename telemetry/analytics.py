@@ -0,0 +1,254 @@
+import os
+from collections import OrderedDict, namedtuple
+import numpy as np
+from config import (
+    ANALYTICS_REDLINE_RPM, ANALYTICS_BRAKING_G, ANALYTICS_CACHE_SIZE, ANALYTICS_RESULT_CACHE_SIZE
+)
+from physics.profile import DEFAULT_PROFILE
+from physics.safety_systems import ABS, ESP, ACC, ODS, SPD, SYSTEM_BITS
+from telemetry.recorder import TelemetryReader, FLAG_ENGINE_ON, FLAG_RUNNING, SAFETY_FLAG_SHIFT
+
+GRAVITY = 9.81
+
+# Runs of consecutive ticks: start and stop are tick arrays (stop exclusive),
+# time and duration the same runs in seconds.
+Events = namedtuple('Events', ['start', 'stop', 'time', 'duration'])
+
+# Stretch of a recording between dashboard resets. odometer is the reading
+# at its end and distance what was driven during it, both in km.
+Session = namedtuple('Session', ['start', 'stop', 'duration', 'distance', 'odometer'])
+
+def _runs(condition):
+    """Start and stop ticks of the runs where a boolean array is set"""
+    edges = np.diff(condition.view(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def intervention_hits(flags, gas, brake, steering_angle, speed_before, velocity,
+                      profile=DEFAULT_PROFILE):
+    """Reconstruct the safety-system hits mask of every recorded tick
+
+    Recordings store the inputs, the enabled systems and the resulting state,
+    so the input stages of the safety pipeline are evaluated again over
+    whole columns: the same conditions as compile_pipeline, in the same
+    order, on the speed before each tick. The speed limiter acted when the
+    recorded velocity sits exactly on the limit.
+    """
+    mask = (flags >> SAFETY_FLAG_SHIFT).astype(np.uint8)
+    active = (flags & (FLAG_ENGINE_ON | FLAG_RUNNING)) == (FLAG_ENGINE_ON | FLAG_RUNNING)
+    gas = gas / 100.0
+    brake = brake / 100.0
+    hits = np.zeros(len(flags), dtype=np.uint8)
+
+    def stage(bit, condition):
+        hit = active & ((mask & bit) != 0) & condition
+        hits[hit] |= bit
+        return hit
+
+    stage(ABS, brake > profile.abs_max_brake)
+    hit = stage(ESP, (gas > 0) & (np.abs(steering_angle) > profile.esp_steering_threshold))
+    gas = np.where(hit, gas * profile.esp_power_reduction, gas)
+    target = profile.acc_target_speed
+    hit = stage(ACC, ((speed_before < target) & (gas < 1.0)) | ((speed_before > target) & (gas > 0)))
+    gas = np.where(hit, np.where(speed_before < target, np.minimum(gas + 0.02, 1.0),
+                                 np.maximum(gas - 0.02, 0)), gas)
+    stage(ODS, gas > 0)
+    stage(SPD, velocity == np.float32(profile.spd_max_speed))
+    return hits
+
+class TripIndex:
+    """Time and event indexes over one telemetry recording.
+
+    Built with a handful of vectorized passes over the file's columns: the
+    speed, deceleration and session boundaries, the reconstructed
+    safety-system hits, the gear changes and the runs of every intervention
+    and of redline. Queries are scans over these arrays. Use get_trip or
+    query rather than building one directly so indexes and results are
+    shared.
+    """
+
+    def __init__(self, path, profile=DEFAULT_PROFILE, redline=ANALYTICS_REDLINE_RPM):
+        self.path = path
+        self.profile = profile
+        with TelemetryReader(path) as reader:
+            self.dt = dt = reader.dt
+            self.rows = len(reader)
+            # Copies, so no view keeps the file mapped
+            time = reader.column('time').copy()
+            velocity = reader.column('velocity').copy()
+            self.rpm = reader.column('rpm').copy()
+            self.gear = reader.column('gear').copy()
+            self.brake = reader.column('brake').copy()
+            self.odometer = reader.column('odometer').copy()
+            self.flags = flags = reader.column('flags').copy()
+            gas = reader.column('gas')
+            steering_angle = reader.column('steering_angle')
+
+            # A dashboard reset starts the simulation clock again from zero
+            self.session_starts = np.concatenate(([0], np.flatnonzero(np.diff(time) < 0) + 1))
+            self.start_time = float(time[0]) if self.rows else 0.0
+            self.speed = speed = np.abs(velocity)
+            speed_before = np.concatenate(([0.0], speed[:-1]))
+            speed_before[self.session_starts] = 0.0
+            # Deceleration in g (positive while slowing down)
+            self.deceleration = ((speed_before - speed) / 3.6 / dt / GRAVITY).astype(np.float32)
+            self.hits = intervention_hits(
+                flags, gas, self.brake, steering_angle, speed_before, velocity, profile
+            )
+            del gas, steering_angle
+
+        self.duration = self.rows * dt
+        self.gear_changes = np.flatnonzero(np.diff(self.gear)) + 1
+        self.interventions = {
+            name: self._events(*_runs((self.hits & bit) != 0)) for name, bit in SYSTEM_BITS.items()
+        }
+        self.redline = redline
+        self.redline_events = self._events(*_runs(self.rpm >= redline))
+
+    def _events(self, start, stop):
+        return Events(start, stop, start * self.dt, (stop - start) * self.dt)
+
+    def events(self, name):
+        """Intervention runs of a safety system ('abs', 'esp', ...) or 'redline'"""
+        if name == 'redline':
+            return self.redline_events
+        return self.interventions[name]
+
+    def braking_events(self, min_g=ANALYTICS_BRAKING_G, systems=0):
+        """Runs of braking at min_g or harder while all of systems were enabled"""
+        condition = (self.brake > 0) & (self.deceleration >= min_g)
+        if systems:
+            enabled = systems << SAFETY_FLAG_SHIFT
+            condition &= (self.flags & enabled) == enabled
+        return self._events(*_runs(condition))
+
+    def time_in_gear(self, min_rpm=None):
+        """Seconds spent in each gear, optionally only at min_rpm or above"""
+        gear = self.gear if min_rpm is None else self.gear[self.rpm >= min_rpm]
+        # Gears are -1 to 6; shift them so reverse gets a bincount slot
+        counts = np.bincount(gear.astype(np.intp) + 1)
+        return {
+            index - 1: float(count * self.dt) for index, count in enumerate(counts.tolist()) if count
+        }
+
+    def time_above_rpm(self, rpm=None):
+        """Seconds at or above rpm (the redline by default) per gear"""
+        return self.time_in_gear(self.redline if rpm is None else rpm)
+
+    def gear_shifts(self):
+        """(tick, from gear, to gear) arrays of every gear change"""
+        changes = self.gear_changes
+        return changes, self.gear[changes - 1], self.gear[changes]
+
+    def sessions(self):
+        """The recording split at dashboard resets"""
+        stops = np.append(self.session_starts[1:], self.rows)
+        sessions = []
+        for start, stop in zip(self.session_starts.tolist(), stops.tolist()):
+            if stop <= start:
+                continue
+            # The odometer starts at zero with the drive, unless the
+            # recording began part way through it
+            begin = 0.0
+            if not start and self.start_time > 1.5 * self.dt:
+                begin = float(self.odometer[0])
+            end = float(self.odometer[stop - 1])
+            sessions.append(Session(start, stop, (stop - start) * self.dt, end - begin, end))
+        return sessions
+
+    def intervention_counts(self):
+        """Ticks in which each safety system intervened"""
+        return {
+            name: int(np.count_nonzero(self.hits & bit)) for name, bit in SYSTEM_BITS.items()
+        }
+
+    def summary(self, min_g=ANALYTICS_BRAKING_G, systems=0):
+        """Aggregates of the whole trip as plain Python values"""
+        sessions = self.sessions()
+        braking = self.braking_events(min_g, systems)
+        return {
+            'rows': self.rows,
+            'duration': self.duration,
+            'sessions': len(sessions),
+            'distance': sum(session.distance for session in sessions),
+            'odometer': [session.odometer for session in sessions],
+            'top_speed': float(self.speed.max()) if self.rows else 0.0,
+            'gear_changes': len(self.gear_changes),
+            'time_in_gear': self.time_in_gear(),
+            'time_above_redline': self.time_above_rpm(),
+            'redline_events': len(self.redline_events.start),
+            'braking_events': len(braking.start),
+            'braking_time': float(braking.duration.sum()),
+            'interventions': self.intervention_counts(),
+        }
+
+_trips = OrderedDict()
+_results = OrderedDict()
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def get_trip(path, profile=DEFAULT_PROFILE):
+    """Return the TripIndex of a recording, rebuilt when the file changed
+
+    The last ANALYTICS_CACHE_SIZE indexes are kept.
+    """
+    key = (os.path.abspath(path), profile)
+    stamp = _stamp(path)
+    cached = _trips.get(key)
+    if cached is not None and cached[0] == stamp:
+        _trips.move_to_end(key)
+        return cached[1]
+    trip = TripIndex(path, profile)
+    _trips[key] = (stamp, trip)
+    _trips.move_to_end(key)
+    if len(_trips) > ANALYTICS_CACHE_SIZE:
+        _trips.popitem(last=False)
+    return trip
+
+def _read_only(result):
+    """Copy of a query result through which the cached one cannot change
+
+    Arrays become read-only views and dicts, lists and tuples are rebuilt.
+    """
+    if isinstance(result, np.ndarray):
+        view = result.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(result, dict):
+        return {key: _read_only(value) for key, value in result.items()}
+    if isinstance(result, list):
+        return [_read_only(value) for value in result]
+    if isinstance(result, tuple):
+        values = [_read_only(value) for value in result]
+        return type(result)(*values) if hasattr(result, '_fields') else tuple(values)
+    return result
+
+def query(path, name, *args, profile=DEFAULT_PROFILE):
+    """Run a TripIndex query on a recording, caching the result per file
+
+    Results are kept for as long as the file is unchanged, even after its
+    index has left the cache, so repeating a query over many trips only
+    costs a stat per file. The last ANALYTICS_RESULT_CACHE_SIZE results are
+    kept, and every call returns its own copy with read-only arrays.
+    """
+    key = (os.path.abspath(path), profile, name, args)
+    stamp = _stamp(path)
+    cached = _results.get(key)
+    if cached is not None and cached[0] == stamp:
+        _results.move_to_end(key)
+        return _read_only(cached[1])
+    result = _read_only(getattr(get_trip(path, profile), name)(*args))
+    _results[key] = (stamp, result)
+    _results.move_to_end(key)
+    if len(_results) > ANALYTICS_RESULT_CACHE_SIZE:
+        _results.popitem(last=False)
+    return _read_only(result)
+
+def query_trips(paths, name, *args, profile=DEFAULT_PROFILE):
+    """Run a query on every recording, returning {path: result}"""
+    return {path: query(path, name, *args, profile=profile) for path in paths}
+
+def clear_cache():
+    _trips.clear()
+    _results.clear()
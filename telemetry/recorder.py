@@ -0,0 +1,303 @@
+import mmap
+import struct
+from array import array
+from collections import namedtuple
+from config import PHYSICS_UPDATE_RATE, TELEMETRY_BLOCK_ROWS, TELEMETRY_RING_SIZE
+from physics.safety_systems import ABS, ESP, ACC, ODS, SPD, ALL_SYSTEMS
+from physics.vehicle_state import FLAG_ENGINE_ON, FLAG_RUNNING, SAFETY_FLAG_SHIFT, pack_state_flags
+
+TELEMETRY_MAGIC = b'PYCTEL01'
+TELEMETRY_VERSION = 1
+
+# Fixed column schema as (name, array typecode). Columns are ordered by item
+# size so every column inside a block starts on an aligned offset.
+TELEMETRY_COLUMNS = (
+    ('time', 'd'),
+    ('odometer', 'd'),
+    ('velocity', 'f'),
+    ('rpm', 'f'),
+    ('gas', 'f'),
+    ('brake', 'f'),
+    ('clutch', 'f'),
+    ('steering_angle', 'f'),
+    ('gear', 'b'),
+    ('flags', 'B'),
+)
+COLUMN_NAMES = tuple(name for name, _ in TELEMETRY_COLUMNS)
+TelemetryRow = namedtuple('TelemetryRow', COLUMN_NAMES)
+
+# Bits of the flags column, the same bitfield as a packed vehicle state's
+# flags: FLAG_ENGINE_ON, FLAG_RUNNING and the SafetySystems mask shifted
+# past them
+FLAG_ABS = ABS << SAFETY_FLAG_SHIFT
+FLAG_ESP = ESP << SAFETY_FLAG_SHIFT
+FLAG_ACC = ACC << SAFETY_FLAG_SHIFT
+FLAG_ODS = ODS << SAFETY_FLAG_SHIFT
+FLAG_SPD = SPD << SAFETY_FLAG_SHIFT
+
+# magic, version, column count, rows per block, data offset, tick dt, row count
+_HEADER = struct.Struct('<8sHHIQdQ')
+_ROW_COUNT_OFFSET = _HEADER.size - 8
+_ITEM_SIZES = tuple(struct.calcsize(code) for _, code in TELEMETRY_COLUMNS)
+ROW_SIZE = sum(_ITEM_SIZES)
+
+def pack_flags(inputs, safety_systems):
+    """Pack the engine, simulation and safety-system switches into a bitfield"""
+    return pack_state_flags(inputs.engine_on, inputs.running, safety_systems.mask)
+
+def telemetry_row(inputs, state, safety_systems):
+    """Build the row recorded for one physics tick"""
+    return (
+        state.time, state.odometer, state.velocity, state.rpm,
+        inputs.gas, inputs.brake, inputs.clutch, inputs.steering_angle,
+        inputs.gear, pack_flags(inputs, safety_systems)
+    )
+
+def apply_flags(flags, safety_systems):
+    """Set the safety-system switches from a packed flags value"""
+    safety_systems.mask = (flags >> SAFETY_FLAG_SHIFT) & ALL_SYSTEMS
+
+def _column_offsets(block_rows):
+    """Byte offset of every column inside a block"""
+    offsets = []
+    offset = 0
+    for size in _ITEM_SIZES:
+        offsets.append(offset)
+        offset += size * block_rows
+    return offsets
+
+class TelemetryRing:
+    """Fixed-size in-memory history of the most recent telemetry rows
+
+    appended counts every row ever appended. A reader on another thread can
+    take it first and then read rows() up to it, since a row is stored
+    before the counters move.
+    """
+
+    def __init__(self, size=TELEMETRY_RING_SIZE):
+        self.size = size
+        self.columns = [array(code, bytes(size * struct.calcsize(code))) for _, code in TELEMETRY_COLUMNS]
+        self.index = 0
+        self.count = 0
+        self.appended = 0
+
+    def append(self, row):
+        index = self.index
+        for column, value in zip(self.columns, row):
+            column[index] = value
+        self.index = (index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.appended += 1
+
+    def latest(self):
+        """Return the most recent row, or None if nothing was recorded"""
+        if not self.count:
+            return None
+        index = self.index - 1
+        return TelemetryRow(*(column[index] for column in self.columns))
+
+    def recent(self, name, count=None):
+        """Return up to count most recent values of a column, oldest first"""
+        column = self.columns[COLUMN_NAMES.index(name)]
+        count = self.count if count is None else min(count, self.count)
+        start = self.index - count
+        if start >= 0:
+            return column[start:self.index].tolist()
+        return column[start:].tolist() + column[:self.index].tolist()
+
+    def rows(self, name, start, stop):
+        """Return a column's values for rows start to stop, numbered like appended
+
+        Only the last size rows are held; rows older than that have been
+        overwritten by newer ones.
+        """
+        if not 0 <= start <= stop <= self.appended or stop - start > self.size:
+            raise ValueError(f"rows {start}-{stop} are not in the ring")
+        column = self.columns[COLUMN_NAMES.index(name)]
+        first = start % self.size
+        end = first + stop - start
+        if end <= self.size:
+            return column[first:end].tolist()
+        return column[first:].tolist() + column[:end - self.size].tolist()
+
+class TelemetryRecorder:
+    """Append-only columnar telemetry file backed by mmap.
+
+    The file holds a small header followed by blocks of block_rows rows. Each
+    block stores every column contiguously, so readers can map a column of a
+    block straight into an array. Only the block being written is mapped;
+    recording a row is a handful of stores into it and never a syscall.
+    """
+
+    def __init__(self, path, dt=PHYSICS_UPDATE_RATE, block_rows=TELEMETRY_BLOCK_ROWS,
+                 ring_size=TELEMETRY_RING_SIZE):
+        if block_rows % mmap.ALLOCATIONGRANULARITY:
+            raise ValueError(f"block_rows must be a multiple of {mmap.ALLOCATIONGRANULARITY}")
+        self.path = path
+        self.block_rows = block_rows
+        self.block_bytes = block_rows * ROW_SIZE
+        self.data_offset = mmap.ALLOCATIONGRANULARITY
+        self.column_offsets = _column_offsets(block_rows)
+
+        self.file = open(path, 'w+b')
+        self.file.truncate(self.data_offset)
+        self.header = mmap.mmap(self.file.fileno(), self.data_offset)
+        _HEADER.pack_into(
+            self.header, 0, TELEMETRY_MAGIC, TELEMETRY_VERSION, len(TELEMETRY_COLUMNS),
+            block_rows, self.data_offset, dt, 0
+        )
+        self._row_count = memoryview(self.header)[_ROW_COUNT_OFFSET:_HEADER.size].cast('Q')
+
+        self.rows = 0
+        self.blocks = 0
+        self.block = None
+        self.views = []
+        self.columns = None
+        self.index = block_rows
+        self.ring = TelemetryRing(ring_size) if ring_size else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open_block(self):
+        """Grow the file by one block and map it for writing"""
+        self._close_block()
+        offset = self.data_offset + self.blocks * self.block_bytes
+        self.file.truncate(offset + self.block_bytes)
+        self.block = mmap.mmap(self.file.fileno(), self.block_bytes, offset=offset)
+        view = memoryview(self.block)
+        self.views = [view]
+        for (_, code), start, size in zip(TELEMETRY_COLUMNS, self.column_offsets, _ITEM_SIZES):
+            self.views.append(view[start:start + size * self.block_rows].cast(code))
+        self.columns = self.views[1:]
+        self.blocks += 1
+        self.index = 0
+
+    def _close_block(self):
+        if self.block is None:
+            return
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.columns = None
+        self.block.close()
+        self.block = None
+
+    def record(self, inputs, state, safety_systems):
+        """Append one physics tick"""
+        self.record_row(telemetry_row(inputs, state, safety_systems))
+
+    def record_row(self, row):
+        """Append a row built by telemetry_row"""
+        if self.index == self.block_rows:
+            self._open_block()
+        index = self.index
+        for column, value in zip(self.columns, row):
+            column[index] = value
+        self.index = index + 1
+        self.rows += 1
+        self._row_count[0] = self.rows
+        if self.ring is not None:
+            self.ring.append(row)
+
+    def flush(self):
+        """Write the mapped pages back to disk"""
+        if self.block is not None:
+            self.block.flush()
+        self.header.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self._close_block()
+        self._row_count.release()
+        self.header.close()
+        self.file.close()
+
+class TelemetryReader:
+    """Read-only access to a telemetry file written by TelemetryRecorder"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, column_count, block_rows, data_offset, dt, rows = _HEADER.unpack_from(self.map, 0)
+        if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {TELEMETRY_VERSION} telemetry file")
+        if column_count != len(TELEMETRY_COLUMNS):
+            self.close()
+            raise ValueError(f"{path} has {column_count} columns, expected {len(TELEMETRY_COLUMNS)}")
+        self.block_rows = block_rows
+        self.block_bytes = block_rows * ROW_SIZE
+        self.data_offset = data_offset
+        self.dt = dt
+        self.column_offsets = _column_offsets(block_rows)
+        capacity = (len(self.map) - data_offset) // self.block_bytes * block_rows
+        self.rows = min(rows, capacity)
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _block_slices(self, start=0, stop=None):
+        """Yield (block, first row, last row) for the blocks covering start:stop"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        row = start
+        while row < stop:
+            block, first = divmod(row, self.block_rows)
+            last = min(self.block_rows, first + stop - row)
+            yield block, first, last
+            row += last - first
+
+    def column(self, name, start=0, stop=None):
+        """Return rows start:stop of a column as a NumPy array
+
+        Rows from a single block are returned as a zero-copy view of the file.
+        """
+        import numpy as np
+        column_index = COLUMN_NAMES.index(name)
+        dtype = np.dtype(TELEMETRY_COLUMNS[column_index][1])
+        parts = []
+        for block, first, last in self._block_slices(start, stop):
+            offset = (self.data_offset + block * self.block_bytes
+                      + self.column_offsets[column_index] + first * dtype.itemsize)
+            parts.append(np.frombuffer(self.map, dtype=dtype, count=last - first, offset=offset))
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def iter_rows(self, start=0, stop=None):
+        """Yield rows start:stop as TelemetryRow tuples"""
+        for block, first, last in self._block_slices(start, stop):
+            base = self.data_offset + block * self.block_bytes
+            columns = []
+            for (_, code), offset, size in zip(TELEMETRY_COLUMNS, self.column_offsets, _ITEM_SIZES):
+                begin = base + offset + first * size
+                columns.append(memoryview(self.map)[begin:begin + (last - first) * size].cast(code))
+            for values in zip(*columns):
+                yield TelemetryRow(*values)
+            for column in columns:
+                column.release()
+
+    def close(self):
+        if not self.map.closed:
+            try:
+                self.map.close()
+            except BufferError:
+                # Arrays returned by column() still view the mapping; it is
+                # unmapped once the last of them is released
+                pass
+        self.file.close()
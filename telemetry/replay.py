@@ -0,0 +1,128 @@
+import time
+from bisect import bisect_right
+from config import REPLAY_KEYFRAME_INTERVAL
+from physics.simulator import VehicleSimulator, VehicleInputs
+from telemetry.recorder import FLAG_ENGINE_ON, FLAG_RUNNING, apply_flags
+
+def row_inputs(row):
+    """Build the VehicleInputs recorded in a telemetry row"""
+    return VehicleInputs(
+        row.gas, row.brake, row.clutch, row.steering_angle, row.gear,
+        bool(row.flags & FLAG_ENGINE_ON), bool(row.flags & FLAG_RUNNING)
+    )
+
+def session_starts(reader):
+    """Rows at which the dashboard was reset during a recording
+
+    A reset starts the simulation clock again from zero, so these are the
+    rows whose time goes backwards.
+    """
+    import numpy as np
+    time = reader.column('time')
+    return frozenset((np.flatnonzero(np.diff(time) < 0) + 1).tolist())
+
+class ReplayEngine:
+    """Deterministic replay of a recorded drive through the simulator.
+
+    The recorded inputs and safety-system switches are fed back through a
+    VehicleSimulator tick by tick. While the engine is built the whole drive
+    is simulated once and the simulator state is kept every
+    keyframe_interval ticks, so seek() restores the nearest earlier keyframe
+    by bisection and only re-simulates the ticks after it. The simulator is
+    reset wherever the recording was, so drives spanning dashboard resets
+    replay as they were recorded.
+    """
+
+    def __init__(self, reader, simulator=None, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.reader = reader
+        self.dt = reader.dt
+        self.simulator = simulator if simulator is not None else VehicleSimulator()
+        self.keyframe_interval = keyframe_interval
+        self.session_starts = session_starts(reader)
+        # Recorded ticks replayed so far; the simulator's own tick count
+        # starts again at every reset
+        self.tick = 0
+        self.keyframe_ticks = []
+        self.keyframes = []
+        self._build_index()
+
+    def __len__(self):
+        return len(self.reader)
+
+    @property
+    def position(self):
+        """Number of recorded ticks replayed so far"""
+        return self.tick
+
+    @property
+    def duration(self):
+        return len(self.reader) * self.dt
+
+    def _apply(self, row):
+        if self.tick in self.session_starts:
+            self.simulator.reset()
+        apply_flags(row.flags, self.simulator.safety_systems)
+        self.simulator.step(row_inputs(row), self.dt)
+        self.tick += 1
+
+    def _build_index(self):
+        """Simulate the whole drive once, keeping periodic keyframes"""
+        simulator = self.simulator
+        simulator.reset()
+        self.tick = 0
+        for tick, row in enumerate(self.reader.iter_rows()):
+            if tick % self.keyframe_interval == 0:
+                self.keyframe_ticks.append(tick)
+                self.keyframes.append(simulator.snapshot())
+            self._apply(row)
+        self.seek_tick(0)
+
+    def seek_tick(self, tick):
+        """Restore the state after the first tick recorded ticks"""
+        tick = max(0, min(tick, len(self.reader)))
+        index = bisect_right(self.keyframe_ticks, tick) - 1
+        if index < 0:
+            self.simulator.reset()
+            self.tick = 0
+        else:
+            self.simulator.restore(self.keyframes[index])
+            self.tick = self.keyframe_ticks[index]
+        for row in self.reader.iter_rows(self.tick, tick):
+            self._apply(row)
+        return self.simulator.snapshot()
+
+    def seek(self, seconds):
+        """Restore the state at the given time into the drive"""
+        return self.seek_tick(int(round(seconds / self.dt)))
+
+    def step(self):
+        """Replay the next recorded tick, returning None at the end"""
+        tick = self.tick
+        if tick >= len(self.reader):
+            return None
+        for row in self.reader.iter_rows(tick, tick + 1):
+            self._apply(row)
+        return self.simulator.snapshot()
+
+    def play(self, speed=1.0, callback=None, stop_event=None, until=None):
+        """Replay from the current position
+
+        speed is a multiple of real time, or None to run as fast as possible.
+        callback receives every VehicleState; until is an end time in seconds.
+        """
+        stop = len(self.reader) if until is None else min(len(self.reader), int(round(until / self.dt)))
+        first_tick = self.tick
+        started = time.perf_counter()
+        for row in self.reader.iter_rows(first_tick, stop):
+            if stop_event is not None and stop_event.is_set():
+                break
+            self._apply(row)
+            state = self.simulator.snapshot()
+            if callback is not None:
+                callback(state)
+            if speed is not None:
+                due = started + (self.tick - first_tick) * self.dt / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        return self.simulator.snapshot()
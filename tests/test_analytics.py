@@ -0,0 +1,35 @@
+import pytest
+from physics.simulator import VehicleSimulator, VehicleInputs
+from telemetry import analytics
+from telemetry.recorder import TelemetryRecorder
+
+@pytest.fixture
+def trip(tmp_path):
+    path = str(tmp_path / 'trip.tlm')
+    simulator = VehicleSimulator()
+    inputs = VehicleInputs(gas=100)
+    with TelemetryRecorder(path) as recorder:
+        for _ in range(400):
+            simulator.step(inputs)
+            recorder.record(inputs, simulator.snapshot(), simulator.safety_systems)
+    analytics.clear_cache()
+    yield path
+    analytics.clear_cache()
+
+def test_query_results_cannot_change_the_cache(trip):
+    summary = analytics.query(trip, 'summary')
+    summary['time_in_gear'].clear()
+    summary['odometer'].append(1.0)
+    assert analytics.query(trip, 'summary') == analytics.get_trip(trip).summary()
+
+    events = analytics.query(trip, 'events', 'redline')
+    assert len(events.start)
+    with pytest.raises(ValueError):
+        events.start[0] = -1
+
+def test_query_results_are_bounded(trip, monkeypatch):
+    monkeypatch.setattr(analytics, 'ANALYTICS_RESULT_CACHE_SIZE', 3)
+    for rpm in range(1000, 6000, 1000):
+        analytics.query(trip, 'time_above_rpm', rpm)
+    assert len(analytics._results) == 3
+    assert [key[3] for key in analytics._results] == [(3000,), (4000,), (5000,)]
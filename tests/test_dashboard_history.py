@@ -0,0 +1,46 @@
+from gui.dashboard_gui import CarDashboard
+from physics.simulator import VehicleSimulator, VehicleInputs
+from telemetry.recorder import TelemetryRecorder, TelemetryReader, TelemetryRing
+
+def _dashboard(interval, recorder=None):
+    # Only the history of a dashboard showing a remote simulation
+    dashboard = CarDashboard.__new__(CarDashboard)
+    dashboard.recorder = recorder
+    dashboard.history = recorder.ring if recorder is not None else TelemetryRing(1000)
+    dashboard.history_interval = interval
+    dashboard.history_time = None
+    dashboard.safety_systems = VehicleSimulator().safety_systems
+    dashboard.input_queue = type('Queue', (), {'current': VehicleInputs(gas=50)})()
+    return dashboard
+
+def _run(dashboard, simulator, dt, seconds, frame_every):
+    inputs = VehicleInputs(gas=50)
+    for tick in range(int(round(seconds / dt))):
+        simulator.step(inputs, dt)
+        if tick % frame_every == 0:
+            dashboard.sample_history(simulator.snapshot())
+    dashboard.sample_history(simulator.snapshot())
+
+def test_remote_history_rows_follow_history_interval():
+    # A 500 Hz simulation sampled by frames every 8 ms and by idle frames
+    # every 250 ms both give one row per 50 ms of simulated time
+    dashboard = _dashboard(0.05)
+    simulator = VehicleSimulator()
+    _run(dashboard, simulator, 0.002, 2.0, 4)
+    assert dashboard.history.appended == 40
+    _run(dashboard, simulator, 0.002, 2.0, 125)
+    assert dashboard.history.appended == 80
+
+    # A reset starts the sampling again from the new clock
+    simulator.reset()
+    _run(dashboard, simulator, 0.002, 1.0, 4)
+    assert dashboard.history.appended == 100
+
+def test_remote_history_rows_are_recorded(tmp_path):
+    path = tmp_path / 'remote.tlm'
+    with TelemetryRecorder(path) as recorder:
+        dashboard = _dashboard(0.05, recorder)
+        _run(dashboard, VehicleSimulator(), 0.002, 2.0, 4)
+    assert dashboard.history.appended == 40
+    with TelemetryReader(path) as reader:
+        assert len(reader) == 40
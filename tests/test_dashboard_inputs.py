@@ -0,0 +1,74 @@
+from gui.dashboard_gui import CarDashboard
+from gui.frame_scheduler import FrameScheduler
+from physics.input_queue import InputCoalescer
+from physics.simulator import VehicleInputs
+
+class FakeRoot:
+    """Just the after() scheduling of a Tk root, run by hand"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, interval, callback):
+        self.next_id += 1
+        self.pending[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+def _dashboard():
+    # Only the input path of a dashboard, with the physics stopped
+    dashboard = CarDashboard.__new__(CarDashboard)
+    dashboard.root = FakeRoot()
+    dashboard.profiler = None
+    dashboard.input_queue = InputCoalescer(VehicleInputs(engine_on=False, running=False))
+    dashboard.frames = 0
+
+    def frame():
+        dashboard.frames += 1
+        dashboard.frame_scheduler.frame_done(False, can_suspend=True)
+    dashboard.frame_scheduler = FrameScheduler(dashboard.root, frame, idle_frames=0)
+    return dashboard
+
+def test_every_input_event_wakes_suspended_display():
+    dashboard = _dashboard()
+    scheduler = dashboard.frame_scheduler
+    assert scheduler.suspended
+
+    dashboard.update_inputs(engine_on=True)
+    assert not scheduler.suspended
+    dashboard.root.run_pending()
+    assert dashboard.frames == 1 and scheduler.suspended
+
+    # Nothing took the queue, so this is not the first event of a batch
+    assert dashboard.input_queue.pending
+    dashboard.update_inputs(engine_on=False)
+    assert not scheduler.suspended
+    dashboard.root.run_pending()
+    dashboard.post_input('gas', '20')
+    assert not scheduler.suspended
+    dashboard.root.run_pending()
+    assert dashboard.frames == 3
+
+def test_frames_after_a_pause_are_marked_resumed():
+    root = FakeRoot()
+    resumed = []
+
+    def frame():
+        resumed.append(scheduler.resumed)
+        scheduler.frame_done(False, can_suspend=True)
+    scheduler = FrameScheduler(root, frame, max_fps=50, idle_frames=1)
+    scheduler.wake()
+    root.run_pending()
+    root.run_pending()
+    assert scheduler.suspended
+    scheduler.wake()
+    root.run_pending()
+    assert resumed == [True, False, True]
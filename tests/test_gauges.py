@@ -0,0 +1,29 @@
+from benchmarks.stub_canvas import StubCanvas
+from gui.gauge_faces import FACE_TAG
+from gui.gauges import SpeedGauge, RPMGauge
+
+class MoveRecordingCanvas(StubCanvas):
+    def __init__(self):
+        super().__init__()
+        self.face_offset = [0, 0]
+
+    def delete(self, *items):
+        if 'all' in items or FACE_TAG in items:
+            self.face_offset = [0, 0]
+
+    def move(self, item, dx, dy):
+        if item == FACE_TAG:
+            self.face_offset[0] += dx
+            self.face_offset[1] += dy
+
+def test_face_follows_origin_only_resize():
+    for gauge_class in (SpeedGauge, RPMGauge):
+        canvas = MoveRecordingCanvas()
+        gauge = gauge_class(canvas)
+        gauge.draw_gauge_face()
+        gauge.resize(300, 300)
+        gauge.resize(500, 300)
+        assert gauge.center_x == 250
+        assert canvas.face_offset == [100, 0]
+        gauge.resize(300, 500)
+        assert canvas.face_offset == [0, 100]
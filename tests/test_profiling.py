@@ -0,0 +1,31 @@
+import time
+from gui.profiling import DashboardProfiler
+
+def _latencies(profiler):
+    return profiler.histograms['input_latency'].count
+
+def test_input_latency_is_measured_once_per_applied_batch():
+    profiler = DashboardProfiler()
+    event = time.perf_counter()
+    profiler.input_event(event)
+    profiler.input_applied(5, event)
+    profiler.frame_drawn(4, True)
+    assert _latencies(profiler) == 0
+    profiler.frame_drawn(5, True)
+    profiler.frame_drawn(6, True)
+    assert _latencies(profiler) == 1
+    assert profiler.input_time is None and profiler.applied == (5, event)
+
+    # A newer batch is measured even before the Tk thread saw its event
+    later = time.perf_counter()
+    profiler.input_applied(7, later)
+    profiler.input_event(later)
+    profiler.frame_drawn(7, True)
+    assert _latencies(profiler) == 2 and profiler.input_time is None
+
+def test_input_latency_without_physics_uses_the_event_time():
+    profiler = DashboardProfiler()
+    profiler.input_event(time.perf_counter())
+    profiler.frame_drawn(0, False)
+    profiler.frame_drawn(0, False)
+    assert _latencies(profiler) == 1
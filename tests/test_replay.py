@@ -0,0 +1,50 @@
+from cli import drive, _recorded_ticks
+from physics.safety_systems import ABS
+from physics.simulator import VehicleSimulator, VehicleInputs
+from telemetry.recorder import TelemetryRecorder, TelemetryReader
+from telemetry.replay import ReplayEngine, session_starts
+
+DT = 0.01
+
+def _record_with_reset(path):
+    """Record a drive reset part way through, returning the state after every tick"""
+    simulator = VehicleSimulator()
+    simulator.safety_systems.mask = ABS
+    states = []
+    recorder = TelemetryRecorder(str(path), DT)
+    try:
+        for tick in range(700):
+            if tick == 400:
+                simulator.reset()
+            gas = 80 if tick < 300 or tick >= 450 else 0
+            inputs = VehicleInputs(gas=gas, brake=0 if gas else 40, gear=2)
+            simulator.step(inputs, DT)
+            state = simulator.snapshot()
+            recorder.record(inputs, state, simulator.safety_systems)
+            states.append(state)
+    finally:
+        recorder.close()
+    return states
+
+def test_replay_resets_at_recorded_resets(tmp_path):
+    path = tmp_path / 'drive.tlm'
+    states = _record_with_reset(path)
+    with TelemetryReader(str(path)) as reader:
+        assert session_starts(reader) == {400}
+        replay = ReplayEngine(reader, keyframe_interval=64)
+        for tick in (150, 399, 400, 401, 450, 700):
+            assert replay.seek_tick(tick) == (states[tick - 1])
+            assert replay.position == tick
+
+        replay.seek_tick(350)
+        assert replay.play(speed=None) == states[-1]
+        assert replay.position == len(states)
+        assert replay.step() is None
+
+def test_simulate_replay_resets_at_recorded_resets(tmp_path):
+    path = tmp_path / 'drive.tlm'
+    states = _record_with_reset(path)
+    simulator = VehicleSimulator()
+    with TelemetryReader(str(path)) as reader:
+        drive(simulator, _recorded_ticks(reader, simulator), reader.dt)
+    assert simulator.snapshot() == states[-1]
@@ -0,0 +1,32 @@
+import itertools
+import numpy as np
+from physics.profile import DEFAULT_PROFILE
+from physics.safety_systems import ABS, ALL_SYSTEMS, SafetySystems, compile_pipeline
+
+INPUTS = list(itertools.product(
+    (0.0, 0.5, 1.0),        # brake
+    (0.0, 0.3, 1.0),        # gas
+    (-45.0, 0.0, 10.0),     # steering
+    (0.0, 50.0, 200.0),     # speed
+))
+
+def _chain(systems, brake, gas, steering, speed):
+    brake = systems.apply_abs(brake)
+    gas = systems.apply_esp(gas, steering)
+    gas = systems.apply_acc(gas, speed)
+    gas = systems.apply_ods(gas)
+    return brake, gas
+
+def test_pipeline_matches_the_apply_chain_for_every_mask():
+    systems = SafetySystems()
+    for mask in range(ALL_SYSTEMS + 1):
+        systems.mask = mask
+        pipeline = compile_pipeline(mask)
+        for brake, gas, steering, speed in INPUTS:
+            expected = _chain(systems, brake, gas, steering, speed)
+            assert pipeline(brake, gas, steering, speed)[:2] == expected
+
+def test_pipeline_binds_profile_values_of_any_type():
+    profile = DEFAULT_PROFILE._replace(abs_max_brake=np.float64(0.7))
+    brake, gas, hits = compile_pipeline(ALL_SYSTEMS, profile)(1.0, 0.5, 0.0, 0.0)
+    assert brake == 0.7 and hits & ABS
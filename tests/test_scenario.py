@@ -0,0 +1,25 @@
+import numpy as np
+from physics.fleet import FleetSimulator
+from physics.safety_systems import ABS
+from physics.scenario import Scenario, run_scenario, run_scenario_batch
+
+EXAMPLE = "gear 1; gas 80% for 3s; shift 2 at 6000rpm; brake 100% until 0 km/h; enable ABS"
+
+def test_trailing_changes_end_in_a_phase_of_no_ticks():
+    scenario = Scenario(EXAMPLE)
+    last = scenario.phases[-1]
+    assert last.ticks == 0 and last.condition is None and last.mask == ABS
+
+    simulator = run_scenario(scenario)
+    assert simulator.speed == 0 and simulator.ticks > 60
+    assert simulator.safety_systems.mask == ABS
+    result = run_scenario_batch(scenario, FleetSimulator(2))
+    assert np.all(result['ticks'] == simulator.ticks)
+
+    scenario = Scenario("gear 1; gas 80% for 3s; shift 2 at 6000rpm")
+    assert scenario.phases[-1].inputs.gear == 2 and scenario.phases[-1].ticks == 0
+
+def test_changes_carry_over_into_the_next_hold():
+    scenario = Scenario("enable ABS; gear 2\ngas 50%; wait for 1s\ngear 2")
+    assert len(scenario) == 1
+    assert scenario.phases[0].inputs.gas == 50 and scenario.phases[0].inputs.gear == 2
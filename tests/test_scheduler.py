@@ -0,0 +1,36 @@
+from physics.scheduler import FixedStepScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CountingStop:
+    """Stop event that advances the fake clock on every wait"""
+
+    def __init__(self, clock, waits, step=0.125):
+        self.clock = clock
+        self.waits = waits
+        self.step = step
+
+    def is_set(self):
+        return self.waits <= 0
+
+    def wait(self, timeout):
+        self.waits -= 1
+        self.clock.now += self.step
+
+def test_stats_start_over_when_the_physics_restarts():
+    clock = FakeClock()
+    scheduler = FixedStepScheduler(lambda dt: None, dt=0.125, clock=clock)
+    scheduler.run(CountingStop(clock, 100))
+    assert scheduler.ticks == 99
+
+    clock.now += 64.0
+    scheduler.run(CountingStop(clock, 100))
+    stats = scheduler.stats()
+    assert scheduler.ticks == 99 and stats.dropped_steps == 0
+    assert abs(stats.achieved_hz - 8.0) < 0.2
+    assert stats.jitter_p99 == 0.0
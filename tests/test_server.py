@@ -0,0 +1,84 @@
+import asyncio
+import socket
+import threading
+import time
+import pytest
+from network.client import SimulationClient
+from network.protocol import MSG_INPUTS, MSG_SAFETY, frame
+from network.server import SimulationServer
+from physics.safety_systems import SafetySystems, ABS, ESP
+from physics.simulator import VehicleInputs
+
+@pytest.fixture
+def server():
+    server = SimulationServer(port=0)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+def _until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def _safety(mask):
+    safety = SafetySystems()
+    safety.mask = mask
+    return safety
+
+def _controls(client):
+    # Latest controls the client has been shown
+    def taken():
+        controls = client.take_controls()
+        if controls is not None:
+            taken.value = controls
+        return taken.value
+    taken.value = None
+    return taken
+
+def test_server_drops_malformed_messages(server):
+    with socket.create_connection((server.host, server.port)) as sock:
+        sock.sendall(frame(MSG_SAFETY) + frame(MSG_INPUTS) + frame(MSG_INPUTS, b'\x01\0'))
+        client = SimulationClient(server.host, server.port)
+        try:
+            client.send_inputs(VehicleInputs(gas=30))
+            assert _until(lambda: server.inputs.gas == 30)
+        finally:
+            client.close()
+
+def test_clients_only_change_what_they_touch(server):
+    driver = SimulationClient(server.host, server.port)
+    display = SimulationClient(server.host, server.port)
+    try:
+        driver_controls, display_controls = _controls(driver), _controls(display)
+        assert _until(lambda: driver_controls() and display_controls())
+
+        stale = display_controls()[0]
+        driver.send_inputs(driver_controls()[0]._replace(gas=40, engine_on=True, running=True))
+        driver.send_safety(_safety(ABS))
+        assert _until(lambda: server.inputs.gas == 40 and server.simulator.safety_systems.mask == ABS)
+
+        # The second display has not taken the driver's changes when it
+        # switches gear and ESP, and still overwrites nothing else
+        display.send_inputs(stale._replace(gear=2))
+        display.send_safety(_safety(ESP))
+        expected = (VehicleInputs(gas=40, gear=2, engine_on=True, running=True), ABS | ESP)
+        assert _until(lambda: driver_controls() == expected and display_controls() == expected)
+        assert server.inputs == expected[0] and server.simulator.safety_systems.mask == ABS | ESP
+    finally:
+        driver.close()
+        display.close()
@@ -0,0 +1,15 @@
+import numpy as np
+from physics.fleet import FleetSimulator
+from physics.simulator import VehicleSimulator, VehicleInputs
+
+def test_torque_model_drives_reverse():
+    inputs = VehicleInputs(gas=60, gear=-1)
+    default = VehicleSimulator(torque=False)
+    torque = VehicleSimulator(torque=True)
+    default.run(inputs, 1.0)
+    torque.run(inputs, 1.0)
+    assert torque.engine.velocity < 0 and torque.engine.velocity != default.engine.velocity
+
+    fleet = FleetSimulator(2, torque=True)
+    fleet.run(VehicleInputs(*(np.array([value] * 2) for value in inputs)), 1.0)
+    assert np.all(fleet.velocity == torque.engine.velocity)
@@ -0,0 +1,178 @@
+import argparse
+import csv
+import itertools
+import json
+import random
+import sys
+from config import PHYSICS_UPDATE_RATE, TORQUE_MODEL_ENABLED
+from physics.profile import DEFAULT_PROFILE, make_profile
+from physics.simulator import VehicleSimulator, VehicleInputs, SAFETY_SYSTEM_NAMES
+
+# Launch through the gears, cruise with a steering manoeuvre, then brake to
+# a stop. Each segment is (duration in seconds, inputs).
+DEFAULT_SCRIPT = (
+    (3.0, VehicleInputs(gas=100.0, gear=1)),
+    (4.0, VehicleInputs(gas=100.0, gear=2)),
+    (6.0, VehicleInputs(gas=100.0, gear=3)),
+    (8.0, VehicleInputs(gas=100.0, gear=4)),
+    (10.0, VehicleInputs(gas=60.0, gear=5, steering_angle=250.0)),
+    (10.0, VehicleInputs(gas=60.0, gear=6)),
+    (8.0, VehicleInputs(brake=100.0, gear=6)),
+)
+
+RESULT_FIELDS = (
+    ['run'] + list(DEFAULT_PROFILE._fields)
+    + ['zero_to_100', 'top_speed', 'distance'] + [f'{name}_interventions' for name in SAFETY_SYSTEM_NAMES]
+)
+
+def grid(**values):
+    """Yield every combination of the given parameter values as overrides"""
+    names = list(values)
+    for combination in itertools.product(*(values[name] for name in names)):
+        yield dict(zip(names, combination))
+
+def random_sample(count, seed=None, **ranges):
+    """Yield count overrides drawn uniformly from (low, high) ranges
+
+    gear_ratios may be given as a (low, high) range of a factor applied to
+    every default gear ratio.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        overrides = {}
+        for name, (low, high) in ranges.items():
+            value = rng.uniform(low, high)
+            if name == 'gear_ratios':
+                value = tuple(ratio * value for ratio in DEFAULT_PROFILE.gear_ratios)
+            overrides[name] = value
+        yield overrides
+
+def load_script(path):
+    """Load a JSON driving script: a list of [duration, {input: value}] pairs"""
+    with open(path) as f:
+        return tuple((duration, VehicleInputs(**inputs)) for duration, inputs in json.load(f))
+
+def simulate(profile, script=DEFAULT_SCRIPT, dt=PHYSICS_UPDATE_RATE, enabled_systems=(),
+             torque=TORQUE_MODEL_ENABLED):
+    """Drive one vehicle profile through a script and return its metrics"""
+    simulator = VehicleSimulator(profile=profile, torque=torque)
+    for name in enabled_systems:
+        setattr(simulator.safety_systems, f'{name}_enabled', True)
+    zero_to_100 = None
+    top_speed = 0.0
+    for duration, inputs in script:
+        for _ in range(int(round(duration / dt))):
+            simulator.step(inputs, dt)
+            speed = simulator.speed
+            if speed > top_speed:
+                top_speed = speed
+            if zero_to_100 is None and speed >= 100:
+                zero_to_100 = simulator.time
+    result = {
+        'zero_to_100': zero_to_100,
+        'top_speed': top_speed,
+        'distance': simulator.engine.odometer,
+    }
+    for name, count in simulator.interventions.items():
+        result[f'{name}_interventions'] = count
+    return result
+
+# Per-worker state, set once by _init_worker so tasks only carry overrides
+_worker_script = DEFAULT_SCRIPT
+_worker_dt = PHYSICS_UPDATE_RATE
+_worker_systems = ()
+_worker_torque = TORQUE_MODEL_ENABLED
+
+def _init_worker(script, dt, enabled_systems, torque):
+    global _worker_script, _worker_dt, _worker_systems, _worker_torque
+    _worker_script = script
+    _worker_dt = dt
+    _worker_systems = enabled_systems
+    _worker_torque = torque
+
+def _run_configuration(job):
+    run, overrides = job
+    profile = make_profile(**overrides)
+    result = simulate(profile, _worker_script, _worker_dt, _worker_systems, _worker_torque)
+    result['run'] = run
+    result.update(profile._asdict())
+    return result
+
+def run_sweep(configurations, script=DEFAULT_SCRIPT, dt=PHYSICS_UPDATE_RATE, workers=None,
+              enabled_systems=(), chunksize=16, torque=TORQUE_MODEL_ENABLED):
+    """Run every configuration across a process pool, yielding results in order
+
+    The script, dt, enabled safety systems and engine model are shipped to each worker
+    once; the processes stay warm for the whole sweep and receive the
+    configurations in chunks.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = enumerate(configurations)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(script, dt, tuple(enabled_systems), torque)) as executor:
+        yield from executor.map(_run_configuration, jobs, chunksize=chunksize)
+
+def write_results(results, output):
+    """Stream results into a CSV table, returning the number of rows"""
+    writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    rows = 0
+    for result in results:
+        writer.writerow(result)
+        rows += 1
+    return rows
+
+def _parse_values(text):
+    """Parse a comma-separated list of numbers, or of ratio tuples separated by ';'"""
+    if ';' in text or '/' in text:
+        return [tuple(float(v) for v in group.split('/')) for group in text.split(';')]
+    return [float(v) for v in text.split(',')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sweep vehicle parameters across all cores",
+        epilog="Parameters: " + ', '.join(DEFAULT_PROFILE._fields)
+    )
+    parser.add_argument('--grid', action='append', default=[], metavar='NAME=V1,V2',
+                        help="grid values for a parameter; gear_ratios as R1/R2/.../R6;...")
+    parser.add_argument('--random', type=int, metavar='N', help="draw N random configurations")
+    parser.add_argument('--range', action='append', default=[], metavar='NAME=LOW,HIGH',
+                        help="range for --random sampling")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--script', help="JSON driving script (default: built-in launch)")
+    parser.add_argument('--enable', default='', metavar='abs,esp,...',
+                        help="safety systems switched on for every run")
+    parser.add_argument('--dt', type=float, default=PHYSICS_UPDATE_RATE)
+    parser.add_argument('--torque', action='store_true', help="use the torque-curve engine model")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help="CSV results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.random:
+        ranges = {}
+        for spec in args.range:
+            name, _, values = spec.partition('=')
+            low, high = (float(v) for v in values.split(','))
+            ranges[name] = (low, high)
+        configurations = random_sample(args.random, args.seed, **ranges)
+    else:
+        values = {}
+        for spec in args.grid:
+            name, _, text = spec.partition('=')
+            values[name] = _parse_values(text)
+        configurations = grid(**values)
+
+    script = load_script(args.script) if args.script else DEFAULT_SCRIPT
+    enabled_systems = [name for name in args.enable.split(',') if name]
+    results = run_sweep(configurations, script, args.dt, args.workers, enabled_systems,
+                        torque=args.torque or TORQUE_MODEL_ENABLED)
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            rows = write_results(results, f)
+        print(f"{rows} configurations written to {args.output}")
+    else:
+        write_results(results, sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
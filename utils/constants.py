@@ -5,6 +5,7 @@ GAUGE_CENTER_X = 150
 GAUGE_CENTER_Y = 150
 GAUGE_RADIUS = 120
 NEEDLE_LENGTH = 100
+GAUGE_SIZE = 300  # Canvas size the gauge geometry above is laid out for
 
 # Color constants
 GAUGE_OUTLINE_COLOR = 'white'
@@ -14,6 +15,13 @@ BACKGROUND_COLOR = '#2c2c2c'
 BUTTON_COLOR = '#4a4a4a'
 ACTIVE_COLOR = 'green'
 
-# Animation constants
+# Animation constants. The needles used to cover these fractions of the
+# distance to their target every 50 ms frame; the equivalent smoothing time
+# constants give that same response at any frame rate.
 SPEED_ANIMATION_FACTOR = 0.1
 RPM_ANIMATION_FACTOR = 0.15
+ANIMATION_FRAME_TIME = 0.05
+SPEED_SMOOTHING_TIME = -ANIMATION_FRAME_TIME / math.log(1 - SPEED_ANIMATION_FACTOR)  # ~0.47 s
+RPM_SMOOTHING_TIME = -ANIMATION_FRAME_TIME / math.log(1 - RPM_ANIMATION_FACTOR)  # ~0.31 s
+SPEED_SNAP = 0.1  # km/h from the target at which the speed needle lands on it
+RPM_SNAP = 10     # RPM from the target at which the RPM needle lands on it